@@ -5,12 +5,31 @@ from django.shortcuts import render
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django import forms
+from django.conf import settings
+from django.utils.http import urlencode
 from bson import ObjectId
+from functools import wraps
+from pymongo import UpdateOne
+import copy
+
+from rest_framework.exceptions import APIException
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from .models import (
     TipoIngrediente, TipoUtensilio, UnidadeMedida,
-    PerfilSabor, Ingrediente, Utensilio, Drink
+    PerfilSabor, Ingrediente, Utensilio, Drink, PT_COLLATION, mongo_options
+)
+from .choices import (
+    tipo_ingrediente_choices, tipo_utensilio_choices, unidade_medida_choices,
+    ingrediente_choices, utensilio_choices
 )
+from .classification import ingredient_classification
+from .pagination import MongoCursorPagination
+from .signals import document_deleted, document_saved
+from .templatetags.drinks_tags import format_list
+
+# Marcador trocado pelo id ao montar as URLs de cada linha da listagem
+OBJECT_ID_PLACEHOLDER = '__object_id__'
 
 class MongoModelForm(forms.Form):
     """Form base para modelos MongoDB"""
@@ -71,15 +90,9 @@ class IngredienteForm(MongoModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Buscar tipos de ingrediente e unidades de medida do MongoDB
-        tipos = TipoIngrediente.find()
-        unidades = UnidadeMedida.find()
-        self.fields['tipo'].choices = [
-            (t['nome'], t['nome']) for t in tipos
-        ]
-        self.fields['unidades_permitidas'].choices = [
-            (u['nome'], u['nome']) for u in unidades
-        ]
+        # Opções mantidas em memória, refeitas quando as coleções mudam
+        self.fields['tipo'].choices = tipo_ingrediente_choices.get_choices()
+        self.fields['unidades_permitidas'].choices = unidade_medida_choices.get_choices()
 
 class UtensilioForm(MongoModelForm):
     """Form para utensílios"""
@@ -100,11 +113,8 @@ class UtensilioForm(MongoModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Buscar tipos de utensílio do MongoDB
-        tipos = TipoUtensilio.find()
-        self.fields['tipo'].choices = [
-            (t['nome'], t['nome']) for t in tipos
-        ]
+        # Opções mantidas em memória, refeitas quando a coleção muda
+        self.fields['tipo'].choices = tipo_utensilio_choices.get_choices()
 
 class DrinkForm(MongoModelForm):
     """Form para drinks"""
@@ -161,23 +171,11 @@ class DrinkForm(MongoModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Buscar ingredientes e utensílios do MongoDB
-        ingredientes = list(Ingrediente.find())
-        utensilios = list(Utensilio.find())
-
-        # Separar ingredientes por tipo
-        spirits = [i for i in ingredientes if 'Destilado' in i.get('tipo', []) or 'Licor' in i.get('tipo', [])]
-        outros = [i for i in ingredientes if 'Destilado' not in i.get('tipo', []) and 'Licor' not in i.get('tipo', [])]
-
-        self.fields['spirits'].choices = [
-            (i['nome'], i['nome']) for i in spirits
-        ]
-        self.fields['outros_ingredientes'].choices = [
-            (i['nome'], i['nome']) for i in outros
-        ]
-        self.fields['utensilios'].choices = [
-            (u['nome'], u['nome']) for u in utensilios
-        ]
+        # Ingredientes já separados por tipo e utensílios, mantidos em memória
+        spirits, outros = ingrediente_choices.get_partition()
+        self.fields['spirits'].choices = spirits
+        self.fields['outros_ingredientes'].choices = outros
+        self.fields['utensilios'].choices = utensilio_choices.get_choices()
 
     def clean(self):
         cleaned_data = super().clean()
@@ -191,11 +189,23 @@ class MongoModelAdmin:
     """Admin base para modelos MongoDB"""
     form_class = MongoModelForm
     list_display = ['nome']
+    ordering = 'nome'
+    ordering_fields = ['nome']  # Apenas campos com índice, além de _id
+    search_fields = ['nome', 'nome_en']
+    search_query_param = 'q'
+    search_count_limit = 1000  # Com busca, conta até aqui e mostra "1000+"
+    search_collation = PT_COLLATION  # A mesma dos índices nome_pt e nome_en_pt
+    list_per_page = 50
+    bulk_update_fields = []  # Campos do form que podem ser alterados em massa
+    pagination_class = MongoCursorPagination
     template_dir = 'admin/drinks'
     has_order = False  # Flag para indicar se o modelo usa ordem automática
+    # Escritas do admin só retornam depois de confirmadas pela maioria do replica set
+    mongo_options = {'write_concern': settings.MONGODB_ADMIN_WRITE_CONCERN}
 
-    def __init__(self, model_class):
+    def __init__(self, model_class, admin_site):
         self.model = model_class
+        self.admin_site = admin_site
         self.model_name = model_class.__name__.lower()
         self.opts = type('Options', (), {
             'app_label': 'drinks',
@@ -208,12 +218,24 @@ class MongoModelAdmin:
         """Retorna as URLs do admin"""
         info = self.opts.app_label, self.model_name
         return [
-            path('', self.list_view, name='%s_%s_list' % info),
-            path('add/', self.add_view, name='%s_%s_add' % info),
-            path('<str:object_id>/change/', self.change_view, name='%s_%s_change' % info),
-            path('<str:object_id>/delete/', self.delete_view, name='%s_%s_delete' % info),
+            path('', self.wrap(self.list_view), name='%s_%s_list' % info),
+            path('add/', self.wrap(self.add_view), name='%s_%s_add' % info),
+            path('actions/', self.wrap(self.action_view), name='%s_%s_actions' % info),
+            path('<str:object_id>/change/', self.wrap(self.change_view), name='%s_%s_change' % info),
+            path('<str:object_id>/delete/', self.wrap(self.delete_view), name='%s_%s_delete' % info),
         ]
 
+    def wrap(self, view):
+        """
+        Protege a view como as do admin do Django (login de staff, CSRF, sem
+        cache) e aplica as opções do MongoDB do admin às operações dela
+        """
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with mongo_options(**self.mongo_options):
+                return view(*args, **kwargs)
+        return self.admin_site.admin_view(wrapper)
+
     @property
     def urls(self):
         return self.get_urls()
@@ -231,29 +253,207 @@ class MongoModelAdmin:
             context.update(extra_context)
         return context
 
+    def get_search_filter(self, query):
+        """
+        Filtro da caixa de busca: campos que começam com o texto. É um
+        intervalo de strings avaliado com search_collation (sem diferenciar
+        maiúsculas e acentos), que usa os índices nome_pt e nome_en_pt
+        """
+        if not query or not self.search_fields:
+            return {}
+        # Nas collations do ICU, U+FFFF pesa mais que qualquer caractere: o
+        # intervalo [texto, texto + U+FFFF) tem as strings que começam com o texto
+        bounds = {'$gte': query, '$lt': query + '\uffff'}
+        return {'$or': [{field: bounds} for field in self.search_fields]}
+
+    def get_result_count(self, filter):
+        """
+        Retorna (total, se foi limitado). Sem busca o total vem dos metadados
+        da coleção; com busca a contagem para em search_count_limit
+        """
+        if not filter:
+            return self.model.count_documents(), False
+        count = self.model.count_documents(filter, limit=self.search_count_limit)
+        return count, count >= self.search_count_limit
+
+    def get_projection(self):
+        """Lê só as colunas da listagem e os campos de ordenação"""
+        fields = list(self.list_display) + list(self.ordering_fields)
+        return dict.fromkeys(fields, 1)
+
+    def get_object_url_pattern(self, view_name):
+        """Retorna (prefixo, sufixo) da URL por objeto, com um único reverse()"""
+        url = reverse(
+            'admin:%s_%s_%s' % (self.opts.app_label, self.model_name, view_name),
+            args=[OBJECT_ID_PLACEHOLDER]
+        )
+        return tuple(url.split(OBJECT_ID_PLACEHOLDER))
+
+    def get_list_headers(self, request, field, direction):
+        """Cabeçalhos com link de ordenação para os campos indexados"""
+        url = remove_query_param(request.get_full_path(), MongoCursorPagination.cursor_query_param)
+        param = MongoCursorPagination.ordering_query_param
+        headers = []
+        for name in self.list_display:
+            header = {'label': name.replace('_', ' ').title(), 'url': None, 'sorted': None}
+            if name in self.ordering_fields:
+                if name == field:
+                    header['sorted'] = 'ascending' if direction == 1 else 'descending'
+                # Clicar na coluna já ordenada inverte a direção
+                value = '-' + name if name == field and direction == 1 else name
+                header['url'] = replace_query_param(url, param, value)
+            headers.append(header)
+        return headers
+
     def list_view(self, request):
-        """View para listar objetos"""
-        objects = list(self.model.find())
-        headers = [field.replace('_', ' ').title() for field in self.list_display]
-        
+        """View para listar objetos, paginada e ordenada no servidor"""
+        # Mesmo nome de atributo do Request do DRF, usado pela paginação
+        request.query_params = request.GET
+        query = request.GET.get(self.search_query_param, '').strip()
+        filter = self.get_search_filter(query)
+
+        paginator = self.pagination_class()
+        paginator.default_limit = self.list_per_page
+        # A busca (e a ordenação e o cursor junto com ela) é avaliada na collation dos índices
+        collation = self.search_collation if filter else None
+        try:
+            with mongo_options(collation=collation):
+                objects = paginator.paginate(
+                    self.model, request, self, filter=filter, projection=self.get_projection()
+                )
+        except APIException:
+            # Cursor, limite ou ordenação inválidos: volta para a primeira
+            # página, mantendo a busca
+            url = request.path
+            if query:
+                url += '?' + urlencode({self.search_query_param: query})
+            return HttpResponseRedirect(url)
+
+        change_prefix, change_suffix = self.get_object_url_pattern('change')
+        delete_prefix, delete_suffix = self.get_object_url_pattern('delete')
         results = []
         for obj in objects:
-            items = [obj.get(field) for field in self.list_display]
             obj_id = str(obj['_id'])
             results.append({
-                'items': items,
-                'change_url': reverse('admin:%s_%s_change' % (self.opts.app_label, self.model_name), args=[obj_id]),
-                'delete_url': reverse('admin:%s_%s_delete' % (self.opts.app_label, self.model_name), args=[obj_id])
+                'id': obj_id,
+                'items': [format_list(obj.get(field)) for field in self.list_display],
+                'change_url': change_prefix + obj_id + change_suffix,
+                'delete_url': delete_prefix + obj_id + delete_suffix,
             })
 
+        with mongo_options(collation=collation):
+            result_count, result_count_capped = self.get_result_count(filter)
         context = self.get_context(request, {
             'results': results,
-            'list_headers': headers,
+            'list_headers': self.get_list_headers(request, paginator.field, paginator.direction),
+            'result_count': result_count,
+            'result_count_capped': result_count_capped,
+            'search_query': query,
+            'search_query_param': self.search_query_param,
+            'has_search': bool(self.search_fields),
+            'ordering_query_param': paginator.ordering_query_param,
+            'ordering': request.GET.get(paginator.ordering_query_param, ''),
+            'actions': self.get_actions(),
+            'actions_url': reverse('admin:%s_%s_actions' % (self.opts.app_label, self.model_name)),
+            'next_url': paginator.get_next_link(),
+            'previous_url': paginator.get_previous_link(),
             'add_url': reverse('admin:%s_%s_add' % (self.opts.app_label, self.model_name)),
         })
-        
+
         return render(request, f'{self.template_dir}/list.html', context)
 
+    def get_actions(self):
+        """Ações em massa disponíveis na listagem: [(nome, rótulo)]"""
+        actions = [('delete_selected', 'Excluir selecionados')]
+        form = self.form_class()
+        for field in self.bulk_update_fields:
+            actions.append((f'update:{field}', f'Alterar "{form.fields[field].label}" dos selecionados'))
+        if self.has_order:
+            actions.append(('reorder_selected', 'Reordenar selecionados'))
+        return actions
+
+    def get_action_form(self, action, objects, data=None):
+        """Form da página de confirmação, com os valores que a ação precisa"""
+        form = forms.Form(data)
+        if action.startswith('update:'):
+            field = action.split(':', 1)[1]
+            # Mesmo campo (e validação) do form de edição do modelo
+            form.fields[field] = copy.deepcopy(self.form_class().fields[field])
+        elif action == 'reorder_selected':
+            for obj in objects:
+                form.fields[f'ordem_{obj["_id"]}'] = forms.IntegerField(
+                    label=obj.get('nome'), min_value=1, initial=obj.get('ordem')
+                )
+        return form
+
+    def action_view(self, request):
+        """Ações em massa sobre os itens marcados na listagem, com confirmação"""
+        list_url = reverse('admin:%s_%s_list' % (self.opts.app_label, self.model_name))
+        actions = dict(self.get_actions())
+        action = request.POST.get('action')
+        if request.method != 'POST' or action not in actions:
+            return HttpResponseRedirect(list_url)
+
+        # Uma única consulta para todos os selecionados
+        objects, _ = self.model.find_by_ids(request.POST.getlist('_selected_action'))
+        if not objects:
+            return HttpResponseRedirect(list_url)
+
+        confirmed = 'confirm' in request.POST
+        form = self.get_action_form(action, objects, request.POST if confirmed else None)
+        if confirmed and form.is_valid():
+            if action.startswith('update:'):
+                field = action.split(':', 1)[1]
+                self.update_selected(objects, field, form.cleaned_data[field])
+            elif action == 'reorder_selected':
+                self.reorder_selected(objects, form.cleaned_data)
+            else:
+                self.delete_selected(objects)
+            return HttpResponseRedirect(list_url)
+
+        context = self.get_context(request, {
+            'action': action,
+            'action_label': actions[action],
+            'objects': objects,
+            'count': len(objects),
+            'form': form,
+            'cancel_url': list_url,
+        })
+        return render(request, f'{self.template_dir}/actions.html', context)
+
+    def delete_selected(self, objects):
+        """Remove os documentos com um único delete_many"""
+        self.model.delete_many({'_id': {'$in': [obj['_id'] for obj in objects]}})
+        for obj in objects:
+            document_deleted.send(sender=self.model, document=obj)
+
+    def update_selected(self, objects, field, value):
+        """Grava o mesmo valor do campo em todos os documentos com um único update_many"""
+        self.model.update_many(
+            {'_id': {'$in': [obj['_id'] for obj in objects]}},
+            {'$set': {field: value}}
+        )
+        for obj in objects:
+            document_saved.send(
+                sender=self.model, document={**obj, field: value}, previous=obj, created=False
+            )
+
+    def reorder_selected(self, objects, data):
+        """Grava as novas ordens com um único bulk_write (só as que mudaram)"""
+        changed = [
+            (obj, data[f'ordem_{obj["_id"]}']) for obj in objects
+            if data[f'ordem_{obj["_id"]}'] != obj.get('ordem')
+        ]
+        if not changed:
+            return
+        self.model.bulk_write([
+            UpdateOne({'_id': obj['_id']}, {'$set': {'ordem': ordem}}) for obj, ordem in changed
+        ])
+        for obj, ordem in changed:
+            document_saved.send(
+                sender=self.model, document={**obj, 'ordem': ordem}, previous=obj, created=False
+            )
+
     def add_view(self, request):
         """View para adicionar objetos"""
         if request.method == 'POST':
@@ -269,6 +469,7 @@ class MongoModelAdmin:
                     data.pop('spirits', None)
                     data.pop('outros_ingredientes', None)
                 self.model.insert_one(data)
+                document_saved.send(sender=self.model, document=data, previous=None, created=True)
                 return HttpResponseRedirect(reverse('admin:%s_%s_list' % (self.opts.app_label, self.model_name)))
         else:
             form = self.form_class()
@@ -304,22 +505,12 @@ class MongoModelAdmin:
                     {'_id': ObjectId(object_id)},
                     {'$set': data}
                 )
+                document_saved.send(sender=self.model, document={**obj, **data}, previous=obj, created=False)
                 return HttpResponseRedirect(reverse('admin:%s_%s_list' % (self.opts.app_label, self.model_name)))
         else:
             # Se for um drink, separar os ingredientes em spirits e outros
-            if isinstance(self.form_class, type(DrinkForm)):
-                ingredientes = obj.get('ingredientes', [])
-                # Buscar todos os ingredientes para verificar seus tipos
-                todos_ingredientes = {i['nome']: i for i in Ingrediente.find()}
-                spirits = []
-                outros = []
-                for ing in ingredientes:
-                    if ing in todos_ingredientes:
-                        tipos = todos_ingredientes[ing].get('tipo', [])
-                        if 'Destilado' in tipos or 'Licor' in tipos:
-                            spirits.append(ing)
-                        else:
-                            outros.append(ing)
+            if issubclass(self.form_class, DrinkForm):
+                spirits, outros = ingredient_classification.split(obj.get('ingredientes', []))
                 obj['spirits'] = spirits
                 obj['outros_ingredientes'] = outros
             form = self.form_class(instance=obj)
@@ -346,6 +537,7 @@ class MongoModelAdmin:
         obj = self.model.find_one({'_id': ObjectId(object_id)})
         if request.method == 'POST':
             self.model.delete_one({'_id': ObjectId(object_id)})
+            document_deleted.send(sender=self.model, document=obj)
             return HttpResponseRedirect(reverse('admin:%s_%s_list' % (self.opts.app_label, self.model_name)))
 
         context = self.get_context(request, {
@@ -366,36 +558,46 @@ class DrinksAdminSite(admin.AdminSite):
         urls = super().get_urls()
         
         # Criar instâncias dos admins
-        tipo_ingrediente_admin = MongoModelAdmin(TipoIngrediente)
+        tipo_ingrediente_admin = MongoModelAdmin(TipoIngrediente, self)
         tipo_ingrediente_admin.form_class = TipoReferenciaForm
         tipo_ingrediente_admin.list_display = ['nome', 'nome_en', 'ordem']
         tipo_ingrediente_admin.has_order = True
+        tipo_ingrediente_admin.ordering = 'ordem'
+        tipo_ingrediente_admin.ordering_fields = ['nome', 'ordem']
 
-        tipo_utensilio_admin = MongoModelAdmin(TipoUtensilio)
+        tipo_utensilio_admin = MongoModelAdmin(TipoUtensilio, self)
         tipo_utensilio_admin.form_class = TipoReferenciaForm
         tipo_utensilio_admin.list_display = ['nome', 'nome_en', 'ordem']
         tipo_utensilio_admin.has_order = True
+        tipo_utensilio_admin.ordering = 'ordem'
+        tipo_utensilio_admin.ordering_fields = ['nome', 'ordem']
 
-        unidade_medida_admin = MongoModelAdmin(UnidadeMedida)
+        unidade_medida_admin = MongoModelAdmin(UnidadeMedida, self)
         unidade_medida_admin.form_class = UnidadeMedidaForm
         unidade_medida_admin.list_display = ['nome', 'nome_en', 'tipo', 'conversao_ml']
+        unidade_medida_admin.bulk_update_fields = ['tipo']
 
-        perfil_sabor_admin = MongoModelAdmin(PerfilSabor)
+        perfil_sabor_admin = MongoModelAdmin(PerfilSabor, self)
         perfil_sabor_admin.form_class = TipoReferenciaForm
         perfil_sabor_admin.list_display = ['nome', 'nome_en', 'ordem']
         perfil_sabor_admin.has_order = True
+        perfil_sabor_admin.ordering = 'ordem'
+        perfil_sabor_admin.ordering_fields = ['nome', 'ordem']
 
-        ingrediente_admin = MongoModelAdmin(Ingrediente)
+        ingrediente_admin = MongoModelAdmin(Ingrediente, self)
         ingrediente_admin.form_class = IngredienteForm
         ingrediente_admin.list_display = ['nome', 'nome_en', 'tipo']
+        ingrediente_admin.bulk_update_fields = ['tipo', 'unidades_permitidas']
 
-        utensilio_admin = MongoModelAdmin(Utensilio)
+        utensilio_admin = MongoModelAdmin(Utensilio, self)
         utensilio_admin.form_class = UtensilioForm
         utensilio_admin.list_display = ['nome', 'nome_en', 'tipo']
+        utensilio_admin.bulk_update_fields = ['tipo']
 
-        drink_admin = MongoModelAdmin(Drink)
+        drink_admin = MongoModelAdmin(Drink, self)
         drink_admin.form_class = DrinkForm
         drink_admin.list_display = ['nome', 'nome_en', 'nivel_dificuldade', 'teor_alcoolico']
+        drink_admin.bulk_update_fields = ['nivel_dificuldade', 'teor_alcoolico']
         
         # Adicionar URLs dos admins
         drinks_urls = [
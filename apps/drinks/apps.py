@@ -5,3 +5,13 @@ class DrinksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.drinks'
     verbose_name = 'Drinks'
+
+    def ready(self):
+        from django.core import checks
+        from .checks import check_mongo_indexes
+        # Só em check --deploy: consulta o MongoDB, o que não cabe em todo
+        # comando nem na inicialização do runserver
+        checks.register(check_mongo_indexes, 'mongodb', deploy=True)
+
+        # Conecta os receptores que mantêm os índices em memória atualizados
+        from . import autocomplete, classification, pantry, similarity, usage  # noqa
@@ -0,0 +1,23 @@
+from django.urls import path
+from . import async_views
+
+# Mesmos prefixos das rotas de apps.drinks.urls, somente leitura
+VIEWS = [
+    ('tipos-ingrediente', async_views.AsyncTipoIngredienteView, 'tipo-ingrediente'),
+    ('tipos-utensilio', async_views.AsyncTipoUtensilioView, 'tipo-utensilio'),
+    ('unidades-medida', async_views.AsyncUnidadeMedidaView, 'unidade-medida'),
+    ('perfis-sabor', async_views.AsyncPerfilSaborView, 'perfil-sabor'),
+    ('ingredientes', async_views.AsyncIngredienteView, 'ingrediente'),
+    ('utensilios', async_views.AsyncUtensilioView, 'utensilio'),
+    ('drinks', async_views.AsyncDrinkView, 'drink'),
+]
+
+urlpatterns = [
+    path('drinks/search/', async_views.AsyncDrinkSearchView.as_view(), name='async-drink-search'),
+]
+
+for prefix, view, basename in VIEWS:
+    urlpatterns += [
+        path(f'{prefix}/', view.as_view(), name=f'async-{basename}-list'),
+        path(f'{prefix}/<str:pk>/', view.as_view(), name=f'async-{basename}-detail'),
+    ]
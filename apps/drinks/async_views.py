@@ -0,0 +1,171 @@
+"""Views assíncronas (ASGI) de leitura para as coleções MongoDB."""
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+
+from config.renderers import MongoJSONRenderer
+
+from .conditional import aget_validators, not_modified_response, set_validators
+from .filters import DrinkFilter
+from .models import (
+    TipoIngrediente, TipoUtensilio, UnidadeMedida,
+    PerfilSabor, Ingrediente, Utensilio, Drink, mongo_options
+)
+from .pagination import MongoCursorPagination, MongoSearchPagination
+from .search import atext_search
+from .views import CATALOG_READ_OPTIONS
+from .serializers import (
+    TipoIngredienteSerializer, TipoUtensilioSerializer, UnidadeMedidaSerializer,
+    PerfilSaborSerializer, IngredienteSerializer, UtensilioSerializer, DrinkSerializer
+)
+
+
+class AsyncMongoView(View):
+    """
+    View assíncrona base (somente leitura) para modelos MongoDB. Espelha
+    list/retrieve dos ViewSets consultando com o AsyncMongoClient, sem
+    bloquear o event loop; as escritas continuam nos ViewSets (api/drinks/).
+    """
+    http_method_names = ['get', 'options']
+    model_class = None
+    serializer_class = None
+    pagination_class = MongoCursorPagination
+    ordering = '_id'
+    ordering_fields = []  # Apenas campos com índice, além de _id
+    renderer = MongoJSONRenderer()
+    mongo_options = {}  # Opções do MongoDB por ação ('list' ou 'retrieve')
+
+    def render(self, data, status=200):
+        return HttpResponse(
+            self.renderer.render(data), status=status, content_type='application/json'
+        )
+
+    def get_filter(self, request):
+        """Filtro MongoDB aplicado à listagem (sem filtro por padrão)"""
+        return {}
+
+    async def get(self, request, pk=None):
+        # Mesmo nome de atributo do Request do DRF, usado por paginação e filtros
+        request.query_params = request.GET
+        action = 'list' if pk is None else 'retrieve'
+        try:
+            with mongo_options(**self.mongo_options.get(action, {})):
+                if pk is None:
+                    return await self.list(request)
+                return await self.retrieve(request, pk)
+        except APIException as exc:
+            return self.render(exc.detail, status=exc.status_code)
+
+    async def get_object(self, pk):
+        try:
+            return await self.model_class.afind_one({'_id': ObjectId(pk)})
+        except InvalidId:
+            return None
+
+    async def list(self, request):
+        etag, last_modified = await aget_validators(self.model_class, request)
+        response = not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = await self.list_documents(request)
+        return set_validators(response, etag, last_modified)
+
+    async def list_documents(self, request):
+        filter = self.get_filter(request)
+        paginator = self.pagination_class()
+        if paginator.is_requested(request):
+            objects = await paginator.apaginate(self.model_class, request, self, filter=filter)
+            serializer = self.serializer_class(objects, many=True)
+            return self.render(paginator.get_paginated_response(serializer.data).data)
+
+        objects = await self.model_class.afind(filter)
+        if paginator.ordering_query_param in request.query_params:
+            field, direction = paginator.get_ordering(request, self)
+            objects = objects.sort([(field, direction), ('_id', direction)])
+        serializer = self.serializer_class(await objects.to_list(), many=True)
+        return self.render(serializer.data)
+
+    async def retrieve(self, request, pk):
+        etag, last_modified = await aget_validators(self.model_class, request)
+        response = not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return set_validators(response, etag, last_modified)
+
+        obj = await self.get_object(pk)
+        if not obj:
+            return HttpResponse(status=404)
+        serializer = self.serializer_class(obj)
+        return set_validators(self.render(serializer.data), etag, last_modified)
+
+
+class AsyncTipoIngredienteView(AsyncMongoView):
+    serializer_class = TipoIngredienteSerializer
+    model_class = TipoIngrediente
+    ordering_fields = ['nome', 'ordem']
+
+
+class AsyncTipoUtensilioView(AsyncMongoView):
+    serializer_class = TipoUtensilioSerializer
+    model_class = TipoUtensilio
+    ordering_fields = ['nome', 'ordem']
+
+
+class AsyncUnidadeMedidaView(AsyncMongoView):
+    serializer_class = UnidadeMedidaSerializer
+    model_class = UnidadeMedida
+    ordering_fields = ['nome']
+
+
+class AsyncPerfilSaborView(AsyncMongoView):
+    serializer_class = PerfilSaborSerializer
+    model_class = PerfilSabor
+    ordering_fields = ['nome', 'ordem']
+
+
+class AsyncIngredienteView(AsyncMongoView):
+    serializer_class = IngredienteSerializer
+    model_class = Ingrediente
+    ordering_fields = ['nome']
+    mongo_options = {'list': CATALOG_READ_OPTIONS, 'retrieve': CATALOG_READ_OPTIONS}
+
+
+class AsyncUtensilioView(AsyncMongoView):
+    serializer_class = UtensilioSerializer
+    model_class = Utensilio
+    ordering_fields = ['nome']
+    mongo_options = {'list': CATALOG_READ_OPTIONS, 'retrieve': CATALOG_READ_OPTIONS}
+
+
+class AsyncDrinkView(AsyncMongoView):
+    serializer_class = DrinkSerializer
+    model_class = Drink
+    ordering_fields = ['nome']
+    mongo_options = {'list': CATALOG_READ_OPTIONS, 'retrieve': CATALOG_READ_OPTIONS}
+
+    def get_filter(self, request):
+        """Filtra drinks por dificuldade, teor alcoólico, ingredientes e utensílios"""
+        return DrinkFilter(request.query_params).get_filter()
+
+
+class AsyncDrinkSearchView(AsyncMongoView):
+    """Busca textual de drinks, ordenada por relevância"""
+    serializer_class = DrinkSerializer
+    model_class = Drink
+    mongo_options = {'list': CATALOG_READ_OPTIONS, 'retrieve': CATALOG_READ_OPTIONS}
+
+    async def list(self, request):
+        query = request.query_params.get('q', '')
+        if not query:
+            return self.render([])
+
+        drinks = await atext_search(self.model_class, query)
+
+        paginator = MongoSearchPagination()
+        if paginator.is_requested(request):
+            objects = await paginator.apaginate(drinks, request)
+            serializer = self.serializer_class(objects, many=True)
+            return self.render(paginator.get_paginated_response(serializer.data).data)
+
+        serializer = self.serializer_class(await drinks.limit(10).to_list(), many=True)
+        return self.render(serializer.data)
@@ -0,0 +1,145 @@
+"""Índice de autocomplete em memória para ingredientes e utensílios."""
+from bisect import bisect_left, insort
+
+from .memory import VersionedIndex
+from .models import Drink, Ingrediente, Utensilio
+from .text import fold
+
+# Níveis de relevância (menor é melhor)
+EXACT, PREFIX, WORD_PREFIX, INFIX = range(4)
+
+
+def ngrams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class AutocompleteIndex(VersionedIndex):
+    """Busca por prefixo e por trecho sobre nome/nome_en, ponderada por popularidade"""
+    fields = ('nome', 'nome_en')
+    ngram_size = 3
+
+    def __init__(self, model_class, popularity_field):
+        super().__init__()
+        self.model_class = model_class
+        self.models = (model_class, Drink)
+        # Campo de Drink que referencia os itens pelo nome (popularidade)
+        self.popularity_field = popularity_field
+
+    def _reset(self):
+        self.documents = {}   # id -> documento
+        self.keys = {}        # id -> nomes normalizados
+        self.prefixes = []    # lista ordenada de (chave, id), inclui o início de cada palavra
+        self.grams = {}       # trigrama -> ids
+        self.popularity = {}  # nome normalizado -> número de drinks
+
+    def _build(self):
+        self._reset()
+        pipeline = [
+            {'$unwind': f'${self.popularity_field}'},
+            {'$group': {'_id': f'${self.popularity_field}', 'count': {'$sum': 1}}},
+        ]
+        for row in Drink.get_collection().aggregate(pipeline):
+            key = fold(row['_id'])
+            self.popularity[key] = self.popularity.get(key, 0) + row['count']
+        for document in self.model_class.find():
+            self._add(document)
+
+    def _add(self, document):
+        obj_id = str(document['_id'])
+        keys = {fold(document.get(field)) for field in self.fields} - {''}
+        self.documents[obj_id] = document
+        self.keys[obj_id] = keys
+        for key in keys:
+            for start in self._word_starts(key):
+                insort(self.prefixes, (key[start:], obj_id))
+            for gram in ngrams(key, self.ngram_size):
+                self.grams.setdefault(gram, set()).add(obj_id)
+
+    def _remove(self, obj_id):
+        keys = self.keys.pop(obj_id, set())
+        self.documents.pop(obj_id, None)
+        for key in keys:
+            for start in self._word_starts(key):
+                entry = (key[start:], obj_id)
+                position = bisect_left(self.prefixes, entry)
+                if position < len(self.prefixes) and self.prefixes[position] == entry:
+                    del self.prefixes[position]
+            for gram in ngrams(key, self.ngram_size):
+                ids = self.grams.get(gram)
+                if ids is not None:
+                    ids.discard(obj_id)
+                    if not ids:
+                        del self.grams[gram]
+
+    @staticmethod
+    def _word_starts(key):
+        return [0] + [i + 1 for i, c in enumerate(key) if c == ' ']
+
+    def apply_saved(self, model, document, previous):
+        if model is Drink:
+            # Um drink passou a usar (ou deixou de usar) itens: muda a popularidade
+            old = set((previous or {}).get(self.popularity_field, []))
+            new = set(document.get(self.popularity_field, []))
+            self._adjust_popularity(new - old, 1)
+            self._adjust_popularity(old - new, -1)
+        else:
+            self._remove(str(document['_id']))
+            self._add(document)
+
+    def apply_deleted(self, model, document):
+        if model is Drink:
+            self._adjust_popularity(set(document.get(self.popularity_field, [])), -1)
+        else:
+            self._remove(str(document['_id']))
+
+    def _adjust_popularity(self, names, delta):
+        for name in names:
+            key = fold(name)
+            self.popularity[key] = max(self.popularity.get(key, 0) + delta, 0)
+
+    def _rank(self, obj_id, query):
+        keys = self.keys[obj_id]
+        if query in keys:
+            level = EXACT
+        elif any(key.startswith(query) for key in keys):
+            level = PREFIX
+        elif any(' ' + query in key for key in keys):
+            level = WORD_PREFIX
+        else:
+            level = INFIX
+        document = self.documents[obj_id]
+        popularity = max(self.popularity.get(key, 0) for key in keys)
+        return (level, -popularity, len(fold(document.get('nome'))), fold(document.get('nome')))
+
+    def search(self, query, limit=10):
+        """Retorna os documentos que contêm o texto, do mais relevante ao menos"""
+        query = fold(query)
+        if not query:
+            return []
+        self.ensure_built()
+        with self._lock:
+            # Prefixo do nome ou de qualquer palavra do nome
+            matches = set()
+            position = bisect_left(self.prefixes, (query, ''))
+            while position < len(self.prefixes) and self.prefixes[position][0].startswith(query):
+                matches.add(self.prefixes[position][1])
+                position += 1
+
+            # Trecho no meio da palavra: interseção dos trigramas e conferência
+            if len(query) >= self.ngram_size:
+                candidates = None
+                for gram in ngrams(query, self.ngram_size):
+                    ids = self.grams.get(gram, set())
+                    candidates = ids if candidates is None else candidates & ids
+                    if not candidates:
+                        break
+                for obj_id in candidates or ():
+                    if any(query in key for key in self.keys[obj_id]):
+                        matches.add(obj_id)
+
+            ranked = sorted(matches, key=lambda obj_id: self._rank(obj_id, query))
+            return [self.documents[obj_id] for obj_id in ranked[:limit]]
+
+
+ingredientes_index = AutocompleteIndex(Ingrediente, popularity_field='ingredientes')
+utensilios_index = AutocompleteIndex(Utensilio, popularity_field='utensilios')
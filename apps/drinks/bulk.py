@@ -0,0 +1,117 @@
+"""Criação / atualização em lote para os ViewSets MongoDB."""
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .signals import document_saved
+
+DUPLICATE_KEY_CODE = 11000
+
+CREATED = 'criado'
+UPDATED = 'atualizado'
+ERROR = 'erro'
+
+
+class BulkOperation:
+    """
+    Valida e grava uma lista de documentos com uma ida ao banco. Os itens
+    válidos vão em um único bulk_write não ordenado: um item com erro
+    (validação ou índice único) não impede a gravação dos demais, e cada um
+    recebe o próprio resultado.
+    """
+
+    def __init__(self, model_class, serializer_class, upsert=False):
+        self.model_class = model_class
+        self.serializer_class = serializer_class
+        # Com upsert, itens com o nome de um documento existente o atualizam
+        self.upsert = upsert
+
+    def run(self, items):
+        """Retorna um resultado por item, na ordem recebida"""
+        self.results = [None] * len(items)
+        valid = self.validate(items)
+        existing = self.get_existing(valid) if self.upsert else {}
+
+        operations, pending = [], []  # pending: (índice do item, documento, anterior)
+        names = set()
+        for index, data in valid:
+            previous = None
+            if self.upsert:
+                data.pop('_id', None)
+                if data['nome'] in names:
+                    self.set_error(index, {'nome': ['Nome repetido no lote.']})
+                    continue
+                names.add(data['nome'])
+                previous = existing.get(data['nome'])
+            if previous is not None:
+                operations.append(UpdateOne({'_id': previous['_id']}, {'$set': data}))
+                document = {**previous, **data}
+            elif self.upsert:
+                # Upsert pelo nome: outro processo pode ter criado o item desde a consulta
+                operations.append(UpdateOne({'nome': data['nome']}, {'$set': data}, upsert=True))
+                document = data
+            else:
+                # O InsertOne preenche o _id do próprio documento
+                operations.append(InsertOne(data))
+                document = data
+            pending.append((index, document, previous))
+
+        if operations:
+            self.write(operations, pending)
+        return self.results
+
+    def validate(self, items):
+        """Retorna (índice, validated_data) dos itens válidos"""
+        valid = []
+        for index, item in enumerate(items):
+            serializer = self.serializer_class(data=item)
+            if serializer.is_valid():
+                valid.append((index, dict(serializer.validated_data)))
+            else:
+                self.set_error(index, serializer.errors)
+        return valid
+
+    def get_existing(self, valid):
+        """Documentos existentes com os nomes do lote, em uma única consulta"""
+        names = list({data['nome'] for _, data in valid})
+        if not names:
+            return {}
+        return {
+            document['nome']: document
+            for document in self.model_class.find({'nome': {'$in': names}})
+        }
+
+    def write(self, operations, pending):
+        failed = {}
+        upserted_ids = {}
+        try:
+            result = self.model_class.bulk_write(operations, ordered=False)
+            upserted_ids = result.upserted_ids
+        except BulkWriteError as e:
+            upserted_ids = {item['index']: item['_id'] for item in e.details.get('upserted', [])}
+            for error in e.details.get('writeErrors', []):
+                failed[error['index']] = error
+
+        for position, (index, document, previous) in enumerate(pending):
+            error = failed.get(position)
+            if error is not None:
+                if error.get('code') == DUPLICATE_KEY_CODE:
+                    self.set_error(index, {'nome': ['Já existe um registro com este nome.']})
+                else:
+                    self.set_error(index, {'non_field_errors': [error.get('errmsg', 'Erro ao gravar')]})
+                continue
+            if position in upserted_ids:
+                document['_id'] = upserted_ids[position]
+            elif '_id' not in document:
+                # Upsert que encontrou um documento criado depois da consulta
+                document = self.model_class.find_one({'nome': document['nome']}) or document
+            created = previous is None and (not self.upsert or position in upserted_ids)
+            document_saved.send(
+                sender=self.model_class, document=document, previous=previous, created=created
+            )
+            self.results[index] = {
+                'status': CREATED if created else UPDATED,
+                'data': self.serializer_class(document).data,
+            }
+
+    def set_error(self, index, errors):
+        self.results[index] = {'status': ERROR, 'erros': errors}
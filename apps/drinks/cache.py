@@ -0,0 +1,312 @@
+"""Versões das coleções e cache em memória das coleções de referência."""
+import contextvars
+import copy
+import json
+import logging
+import os
+import threading
+import time
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo import ReadPreference, ReturnDocument
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from config.mongodb import get_async_db, get_db
+from .text import fold
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_COLLECTION = 'colecao_versoes'
+
+# Última escrita feita no contexto atual (thread/tarefa): coleção -> (antes, depois)
+_local_writes = contextvars.ContextVar('local_writes', default={})
+
+
+class LocalInvalidationChannel:
+    """Canal sem comunicação entre processos: cada worker depende do TTL"""
+
+    def publish(self, collection_name, version):
+        pass
+
+    def listen(self, callback):
+        pass
+
+
+class RedisInvalidationChannel:
+    """Anuncia novas versões via Redis pub/sub para todos os workers"""
+    channel_name = 'mixmaster:colecao_versoes'
+    retry_seconds = 5
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('RedisInvalidationChannel requer o pacote redis')
+        self._redis_module = redis
+        self._redis = redis.Redis.from_url(settings.REDIS_URL)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def publish(self, collection_name, version):
+        message = json.dumps({'collection': collection_name, 'version': str(version)})
+        try:
+            self._redis.publish(self.channel_name, message)
+        except self._redis_module.RedisError as e:
+            logger.warning('Falha ao publicar invalidação de %s: %s', collection_name, e)
+
+    def listen(self, callback):
+        """Inicia (uma vez por processo) a thread que recebe as invalidações"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            thread = threading.Thread(target=self._listen, args=(callback,), daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def _listen(self, callback):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel_name)
+                for message in pubsub.listen():
+                    data = json.loads(message['data'])
+                    callback(data['collection'], ObjectId(data['version']))
+            except Exception as e:
+                logger.warning('Canal de invalidação interrompido: %s', e)
+                time.sleep(self.retry_seconds)
+
+
+class CollectionVersions:
+    """
+    Versão atual de cada coleção, compartilhada entre os workers.
+
+    Cada escrita grava uma nova versão (um ObjectId) em colecao_versoes e a
+    anuncia no canal; sem o canal, cada worker relê a versão depois de
+    MONGODB_CACHE_TTL segundos.
+    """
+
+    def __init__(self):
+        self._versions = {}  # coleção -> (versão, instante em que foi confirmada)
+        self._channel = None
+
+    @property
+    def channel(self):
+        if self._channel is None:
+            self._channel = import_string(settings.MONGODB_CACHE_INVALIDATION_CHANNEL)()
+        self._channel.listen(self.set)
+        return self._channel
+
+    def get(self, collection_name):
+        """Retorna a versão da coleção, relendo do MongoDB depois do TTL"""
+        entry = self._versions.get(collection_name)
+        if entry is not None and time.monotonic() - entry[1] < settings.MONGODB_CACHE_TTL:
+            return entry[0]
+        self.channel
+        versions = get_db()[VERSIONS_COLLECTION]
+        document = versions.find_one({'_id': collection_name})
+        if document is None:
+            # Primeira leitura da coleção: cria uma versão inicial
+            versions.update_one(
+                {'_id': collection_name},
+                {'$setOnInsert': {'version': ObjectId()}},
+                upsert=True
+            )
+            document = versions.find_one({'_id': collection_name})
+        self.set(collection_name, document['version'])
+        return document['version']
+
+    async def aget(self, collection_name):
+        """Versão assíncrona de get(), para as views ASGI"""
+        entry = self._versions.get(collection_name)
+        if entry is not None and time.monotonic() - entry[1] < settings.MONGODB_CACHE_TTL:
+            return entry[0]
+        self.channel
+        versions = get_async_db()[VERSIONS_COLLECTION]
+        document = await versions.find_one({'_id': collection_name})
+        if document is None:
+            await versions.update_one(
+                {'_id': collection_name},
+                {'$setOnInsert': {'version': ObjectId()}},
+                upsert=True
+            )
+            document = await versions.find_one({'_id': collection_name})
+        self.set(collection_name, document['version'])
+        return document['version']
+
+    def current(self, collection_name):
+        """Retorna a última versão conhecida pelo processo, sem consultar o banco"""
+        entry = self._versions.get(collection_name)
+        return entry[0] if entry else None
+
+    def get_local_write(self, collection_name):
+        """
+        Retorna (versão no banco antes, versão depois) da última escrita feita
+        na coleção pelo contexto atual, ou (None, None)
+        """
+        return _local_writes.get().get(collection_name, (None, None))
+
+    def set(self, collection_name, version):
+        self._versions[collection_name] = (version, time.monotonic())
+
+    def bump(self, collection_name):
+        """Registra uma escrita na coleção e avisa os outros workers"""
+        version = ObjectId()
+        # A versão anterior vem do banco, não do cache local (que pode estar
+        # atrasado em até MONGODB_CACHE_TTL se outro worker escreveu antes)
+        before = get_db()[VERSIONS_COLLECTION].find_one_and_update(
+            {'_id': collection_name},
+            {'$set': {'version': version}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        _local_writes.set({
+            **_local_writes.get(),
+            collection_name: (before['version'] if before else None, version),
+        })
+        self.set(collection_name, version)
+        self.channel.publish(collection_name, version)
+        return version
+
+
+collection_versions = CollectionVersions()
+
+
+def is_simple_filter(filter):
+    """Filtros de igualdade simples podem ser resolvidos em memória"""
+    if not filter:
+        return True
+    return all(
+        not key.startswith('$') and not isinstance(value, (dict, list))
+        for key, value in filter.items()
+    )
+
+
+def matches(document, filter):
+    for key, value in (filter or {}).items():
+        current = document.get(key)
+        if current != value and not (isinstance(current, list) and value in current):
+            return False
+    return True
+
+
+def _sort_key(value, collation):
+    if collation and isinstance(value, str):
+        value = fold(value)
+    # Valores ausentes/nulos vêm primeiro, como no MongoDB
+    return (value is not None, value if value is not None else 0)
+
+
+class SnapshotCursor:
+    """Imita a parte do Cursor do pymongo usada pela aplicação, sobre uma lista"""
+
+    def __init__(self, documents):
+        self._documents = documents
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+        self._collation = None
+        self._iterator = None
+
+    def sort(self, key_or_list, direction=1):
+        if isinstance(key_or_list, str):
+            key_or_list = [(key_or_list, direction)]
+        self._sort = list(key_or_list)
+        return self
+
+    def skip(self, skip):
+        self._skip = skip
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    def collation(self, collation):
+        self._collation = collation
+        return self
+
+    def batch_size(self, batch_size):
+        return self
+
+    def _evaluate(self):
+        documents = list(self._documents)
+        for field, direction in reversed(self._sort):
+            documents.sort(
+                key=lambda d: _sort_key(d.get(field), self._collation),
+                reverse=direction == -1
+            )
+        documents = documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        # Cópias: quem chama pode alterar o documento livremente
+        return iter([copy.deepcopy(d) for d in documents])
+
+    async def to_list(self, length=None):
+        """Mesma interface do AsyncCursor do pymongo"""
+        documents = list(self)
+        return documents[:length] if length else documents
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = self._evaluate()
+        return next(self._iterator)
+
+
+def primary(collection):
+    """
+    As cópias ficam associadas à versão lida do primário, então os dados
+    também vêm dele (um secundário atrasado poderia ter dados anteriores)
+    """
+    return collection.with_options(read_preference=ReadPreference.PRIMARY)
+
+
+class SnapshotCache:
+    """Guarda a coleção inteira em memória enquanto a versão não mudar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}  # coleção -> (versão, documentos)
+
+    def get_documents(self, model_class):
+        name = model_class.collection_name
+        version = collection_versions.get(name)
+        snapshot = self._snapshots.get(name)
+        if snapshot is None or snapshot[0] != version:
+            with self._lock:
+                snapshot = self._snapshots.get(name)
+                if snapshot is None or snapshot[0] != version:
+                    snapshot = (version, list(primary(model_class.get_collection()).find()))
+                    self._snapshots[name] = snapshot
+        return snapshot[1]
+
+    def find(self, model_class, filter=None):
+        documents = self.get_documents(model_class)
+        return SnapshotCursor([d for d in documents if matches(d, filter)])
+
+    async def aget_documents(self, model_class):
+        name = model_class.collection_name
+        version = await collection_versions.aget(name)
+        snapshot = self._snapshots.get(name)
+        if snapshot is None or snapshot[0] != version:
+            # Sem lock: no pior caso dois carregamentos concorrentes no mesmo loop
+            documents = await primary(model_class.get_async_collection()).find().to_list()
+            snapshot = (version, documents)
+            self._snapshots[name] = snapshot
+        return snapshot[1]
+
+    async def afind(self, model_class, filter=None):
+        documents = await self.aget_documents(model_class)
+        return SnapshotCursor([d for d in documents if matches(d, filter)])
+
+    def clear(self):
+        self._snapshots = {}
+
+
+snapshot_cache = SnapshotCache()
@@ -0,0 +1,33 @@
+import pymongo
+from django.conf import settings
+from django.core import checks
+from pymongo.errors import PyMongoError
+
+from .models import MONGO_MODELS
+
+
+def check_mongo_indexes(app_configs, **kwargs):
+    """Avisa quando algum índice declarado nos modelos não existe no MongoDB"""
+    if not settings.MONGODB_CHECK_INDEXES:
+        return []
+
+    errors = []
+    try:
+        # Não deixa a checagem travar a inicialização se o banco estiver fora
+        with pymongo.timeout(settings.MONGODB_CHECK_TIMEOUT):
+            for model in MONGO_MODELS:
+                missing, changed, _ = model.get_index_diff()
+                for index in missing + changed:
+                    errors.append(checks.Warning(
+                        f'Índice "{index.document["name"]}" ausente ou divergente '
+                        f'na coleção "{model.collection_name}".',
+                        hint='Execute "python manage.py ensure_indexes".',
+                        obj=model.__name__,
+                        id='drinks.W001',
+                    ))
+    except PyMongoError as e:
+        errors.append(checks.Warning(
+            f'Não foi possível verificar os índices do MongoDB: {e}',
+            id='drinks.W002',
+        ))
+    return errors
@@ -0,0 +1,69 @@
+"""Opções (choices) dos forms do admin, montadas a partir das coleções MongoDB."""
+from .classification import ingredient_classification
+from .memory import VersionedIndex
+from .models import (
+    TipoIngrediente, TipoUtensilio, UnidadeMedida, Ingrediente, Utensilio
+)
+from .text import fold
+
+
+def make_choices(documents, ordering='nome'):
+    """Tuplas (valor, rótulo) pelo nome, ordenadas pelo campo informado"""
+    def key(document):
+        name = fold(document['nome'])
+        if ordering == 'nome':
+            return (name,)
+        # Documentos sem o campo de ordenação vão para o fim, por nome
+        value = document.get(ordering)
+        return (value is None, value or 0, name)
+
+    documents = sorted(documents, key=key)
+    return tuple((document['nome'], document['nome']) for document in documents)
+
+
+class ChoicesIndex(VersionedIndex):
+    """Opções de um campo de form a partir dos nomes de uma coleção"""
+    incremental = False  # Remontada (barata) quando a versão da coleção muda
+
+    def __init__(self, model_class, ordering='nome'):
+        super().__init__()
+        self.models = (model_class,)
+        self.ordering = ordering
+        self.choices = ()
+
+    def _build(self):
+        model_class = self.models[0]
+        self.choices = make_choices(model_class.find({}, {'nome': 1, self.ordering: 1}), self.ordering)
+
+    def get_choices(self):
+        self.ensure_built()
+        return self.choices
+
+
+class IngredienteChoicesIndex(ChoicesIndex):
+    """Opções de ingredientes já separadas em spirits e demais ingredientes"""
+
+    def __init__(self):
+        super().__init__(Ingrediente)
+        self.spirits = ()
+        self.outros = ()
+
+    def _build(self):
+        # A separação por tipo vem do índice de classificação, já em memória
+        spirits, outros = ingredient_classification.get_names()
+        self.spirits = make_choices({'nome': name} for name in spirits)
+        self.outros = make_choices({'nome': name} for name in outros)
+        self.choices = tuple(sorted(self.spirits + self.outros, key=lambda choice: fold(choice[0])))
+
+    def get_partition(self):
+        """Retorna (spirits, outros ingredientes)"""
+        self.ensure_built()
+        with self._lock:
+            return self.spirits, self.outros
+
+
+tipo_ingrediente_choices = ChoicesIndex(TipoIngrediente, ordering='ordem')
+tipo_utensilio_choices = ChoicesIndex(TipoUtensilio, ordering='ordem')
+unidade_medida_choices = ChoicesIndex(UnidadeMedida)
+ingrediente_choices = IngredienteChoicesIndex()
+utensilio_choices = ChoicesIndex(Utensilio)
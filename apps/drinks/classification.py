@@ -0,0 +1,69 @@
+"""Classificação dos ingredientes em memória: nome -> spirit ou não."""
+from .memory import VersionedIndex
+from .models import Ingrediente
+from .text import fold
+
+# Tipos de ingrediente tratados como spirits (destilados e licores)
+SPIRIT_TYPES = frozenset(['Destilado', 'Licor'])
+
+
+class IngredientClassificationIndex(VersionedIndex):
+    """Se cada ingrediente é spirit (pelos tipos), pelo nome normalizado"""
+    models = (Ingrediente,)
+
+    def _reset(self):
+        self.entries = {}  # nome normalizado -> (nome, é spirit)
+        self.keys = {}     # id do ingrediente -> nome normalizado
+
+    def _build(self):
+        self._reset()
+        for ingrediente in Ingrediente.find({}, {'nome': 1, 'tipo': 1}):
+            self._add(ingrediente)
+
+    def _add(self, ingrediente):
+        obj_id = str(ingrediente['_id'])
+        self._remove(obj_id)
+        key = fold(ingrediente.get('nome'))
+        if not key:
+            return
+        tipos = ingrediente.get('tipo') or ()
+        if isinstance(tipos, str):
+            # A API grava um único tipo como string; o admin grava uma lista
+            tipos = [tipos]
+        self.entries[key] = (ingrediente['nome'], not SPIRIT_TYPES.isdisjoint(tipos))
+        self.keys[obj_id] = key
+
+    def _remove(self, obj_id):
+        key = self.keys.pop(obj_id, None)
+        if key is not None:
+            self.entries.pop(key, None)
+
+    def apply_saved(self, model, ingrediente, previous):
+        self._add(ingrediente)
+
+    def apply_deleted(self, model, ingrediente):
+        self._remove(str(ingrediente['_id']))
+
+    def split(self, names):
+        """
+        Separa os nomes em (spirits, outros), mantendo a ordem. Nomes não
+        cadastrados ficam em outros.
+        """
+        self.ensure_built()
+        spirits, outros = [], []
+        with self._lock:
+            for name in names:
+                entry = self.entries.get(fold(name))
+                (spirits if entry and entry[1] else outros).append(name)
+        return spirits, outros
+
+    def get_names(self):
+        """Retorna (nomes dos spirits, nomes dos demais) cadastrados"""
+        self.ensure_built()
+        with self._lock:
+            spirits = [name for name, spirit in self.entries.values() if spirit]
+            outros = [name for name, spirit in self.entries.values() if not spirit]
+        return spirits, outros
+
+
+ingredient_classification = IngredientClassificationIndex()
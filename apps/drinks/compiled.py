@@ -0,0 +1,101 @@
+"""Leitura rápida para os serializers dos documentos MongoDB."""
+from bson import ObjectId
+from rest_framework import serializers
+
+from .fields import ObjectIdField
+
+SKIP = object()      # Campo opcional ausente: fica fora da resposta
+REQUIRED = object()  # Campo obrigatório ausente: o DRF decide (levanta erro)
+
+
+def _to_str(value):
+    return value if type(value) is str else str(value)
+
+
+def _to_int(value):
+    return value if type(value) is int else int(value)
+
+
+def get_converter(field):
+    """Função equivalente ao to_representation do campo (valor não nulo)"""
+    # A ordem importa: ChoiceField e ObjectIdField não herdam de CharField,
+    # mas campos personalizados podem herdar dos tipos abaixo
+    if type(field) is ObjectIdField:
+        return lambda value: str(value) if type(value) is ObjectId else field.to_representation(value)
+    if type(field) is serializers.ChoiceField:
+        choices = field.choice_strings_to_values
+        return lambda value: (
+            choices.get(value, value) if type(value) is str else field.to_representation(value)
+        )
+    if type(field) is serializers.CharField:
+        return _to_str
+    if type(field) is serializers.IntegerField:
+        return _to_int
+    if type(field) is serializers.FloatField:
+        return float
+    if type(field) is serializers.ListField:
+        child = get_converter(field.child)
+        return lambda value: [child(item) if item is not None else None for item in value]
+    return field.to_representation
+
+
+def get_missing_policy(field):
+    """O que o DRF faz quando a chave não existe no documento"""
+    if field.default is not serializers.empty:
+        return field.get_default
+    if field.allow_null:
+        return lambda: None
+    if not field.required:
+        return SKIP
+    return REQUIRED
+
+
+def compile_read_plan(serializer):
+    """
+    Retorna [(nome, chave, conversão, ausente)] para os campos legíveis, ou
+    None quando algum campo depende do serializer (ex.: SerializerMethodField)
+    ou lê de uma origem aninhada.
+    """
+    plan = []
+    for field in serializer._readable_fields:
+        if isinstance(field, serializers.SerializerMethodField) or len(field.source_attrs) != 1:
+            return None
+        plan.append((
+            field.field_name, field.source_attrs[0],
+            get_converter(field), get_missing_policy(field)
+        ))
+    return plan
+
+
+class CompiledReadMixin:
+    """
+    Serializa documentos (dicts) com um plano pré-calculado por classe: chave
+    de origem e conversão por campo, aplicadas em um único laço. O resultado
+    é o mesmo do DRF; casos fora do plano usam o caminho padrão.
+    Deve vir antes de serializers.Serializer na herança.
+    """
+
+    @classmethod
+    def get_read_plan(cls):
+        # Guardado no __dict__ da própria classe: subclasses têm o seu plano
+        if '_read_plan' not in cls.__dict__:
+            cls._read_plan = compile_read_plan(cls())
+        return cls._read_plan
+
+    def to_representation(self, instance):
+        plan = self.get_read_plan()
+        if plan is None or not isinstance(instance, dict):
+            return super().to_representation(instance)
+
+        ret = {}
+        for name, key, convert, missing in plan:
+            if key in instance:
+                value = instance[key]
+            elif missing is SKIP:
+                continue
+            elif missing is REQUIRED:
+                return super().to_representation(instance)
+            else:
+                value = missing()
+            ret[name] = None if value is None else convert(value)
+        return ret
@@ -0,0 +1,60 @@
+"""Requisições condicionais (ETag / Last-Modified) para os ViewSets MongoDB."""
+import calendar
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from pymongo import ReadPreference
+
+
+def reads_from_primary(model_class):
+    """
+    A versão da coleção vem do primário; um secundário atrasado pode devolver
+    dados anteriores a ela, então leituras fora do primário ficam sem validadores
+    """
+    read_preference = model_class.get_option('read_preference')
+    return read_preference is None or read_preference.mode == ReadPreference.PRIMARY.mode
+
+
+def get_validators(model_class, request, *parts):
+    """
+    Retorna (etag, last_modified) da representação pedida, ou (None, None).
+    Vêm da versão da coleção, que o processo já conhece na maioria das vezes:
+    o 304 sai sem consulta ao banco e sem passar pelo serializer.
+    """
+    if not reads_from_primary(model_class):
+        return None, None
+    return make_validators(model_class, model_class.get_version(), request, *parts)
+
+
+async def aget_validators(model_class, request, *parts):
+    """Versão assíncrona de get_validators(), para as views ASGI"""
+    if not reads_from_primary(model_class):
+        return None, None
+    return make_validators(model_class, await model_class.aget_version(), request, *parts)
+
+
+def make_validators(model_class, version, request, *parts):
+    # A mesma versão gera respostas diferentes por URL e por formato
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = ':'.join(str(part) for part in (
+        model_class.collection_name, version, request.get_full_path(),
+        getattr(renderer, 'format', ''), *parts
+    ))
+    etag = quote_etag(hashlib.sha1(key.encode('utf-8')).hexdigest())
+    last_modified = calendar.timegm(version.generation_time.utctimetuple())
+    return etag, last_modified
+
+
+def not_modified_response(request, etag, last_modified):
+    """Retorna a resposta 304/412 quando o cliente já tem a versão atual"""
+    if etag is None:
+        return None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    if etag is not None and response.status_code in (200, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    return response
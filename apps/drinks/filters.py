@@ -0,0 +1,64 @@
+from rest_framework.exceptions import ValidationError
+
+from .serializers import DrinkSerializer
+
+
+class DrinkFilter:
+    """
+    Converte os parâmetros da listagem de drinks em um único filtro MongoDB.
+
+    Só aceita campos que têm índice e valores conhecidos, para que nenhuma
+    combinação de parâmetros vire uma varredura da coleção inteira.
+    """
+    # Os valores válidos são os mesmos aceitos na gravação pelo DrinkSerializer
+    choice_fields = {
+        field: list(DrinkSerializer._declared_fields[field].choices)
+        for field in ('nivel_dificuldade', 'teor_alcoolico')
+    }
+    aliases = {
+        'dificuldade': 'nivel_dificuldade',
+    }
+    list_fields = ['ingredientes', 'utensilios']
+    modes = {'any': '$in', 'all': '$all'}
+    max_values = 10
+
+    def __init__(self, query_params):
+        self.query_params = query_params
+
+    def get_values(self, name):
+        values = []
+        for raw in self.query_params.getlist(name):
+            values.extend(value.strip() for value in raw.split(',') if value.strip())
+        if len(values) > self.max_values:
+            raise ValidationError({name: f'Informe no máximo {self.max_values} valores'})
+        return values
+
+    def get_filter(self):
+        """Retorna o filtro MongoDB ou levanta ValidationError"""
+        conditions = {}
+
+        for alias, field in self.aliases.items():
+            if alias in self.query_params and field not in self.query_params:
+                self.query_params = self.query_params.copy()
+                self.query_params.setlist(field, self.query_params.getlist(alias))
+
+        for field, choices in self.choice_fields.items():
+            values = self.get_values(field)
+            if not values:
+                continue
+            invalid = [value for value in values if value not in choices]
+            if invalid:
+                raise ValidationError({field: f'Valores válidos: {", ".join(choices)}'})
+            conditions[field] = values[0] if len(values) == 1 else {'$in': values}
+
+        for field in self.list_fields:
+            values = self.get_values(field)
+            if not values:
+                continue
+            mode_param = f'{field}_modo'
+            mode = self.query_params.get(mode_param, 'any')
+            if mode not in self.modes:
+                raise ValidationError({mode_param: 'Use any ou all'})
+            conditions[field] = {self.modes[mode]: values}
+
+        return conditions
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from pymongo.errors import PyMongoError
+
+from apps.drinks.models import MONGO_MODELS
+
+
+class Command(BaseCommand):
+    help = 'Cria ou compara os índices declarados nos modelos MongoDB'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostra as diferenças, sem alterar o banco'
+        )
+        parser.add_argument(
+            '--drop-extra',
+            action='store_true',
+            help='Remove índices existentes que não estão declarados'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        failed = False
+
+        for model in MONGO_MODELS:
+            try:
+                if dry_run:
+                    missing, changed, extra = model.get_index_diff()
+                else:
+                    missing, changed, extra = model.ensure_indexes(drop_extra=options['drop_extra'])
+            except PyMongoError as e:
+                failed = True
+                self.stdout.write(self.style.ERROR(f'{model.collection_name}: erro - {e}'))
+                continue
+
+            if not (missing or changed or extra):
+                self.stdout.write(f'{model.collection_name}: índices em dia')
+                continue
+
+            prefix = 'faltando' if dry_run else 'criado'
+            for index in missing:
+                self.stdout.write(f'{model.collection_name}: {prefix} {index.document["name"]}')
+            prefix = 'divergente' if dry_run else 'recriado'
+            for index in changed:
+                self.stdout.write(f'{model.collection_name}: {prefix} {index.document["name"]}')
+            prefix = 'removido' if options['drop_extra'] and not dry_run else 'não declarado'
+            for name in extra:
+                self.stdout.write(f'{model.collection_name}: {prefix} {name}')
+
+        if failed:
+            self.stdout.write(self.style.ERROR('Alguns índices não puderam ser verificados.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Verificação de índices concluída.'))
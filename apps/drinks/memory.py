@@ -0,0 +1,86 @@
+"""Base dos índices mantidos em memória a partir das coleções MongoDB."""
+import threading
+
+from .cache import collection_versions
+from .models import mongo_options
+from .signals import document_deleted, document_saved
+
+
+class VersionedIndex:
+    """
+    Índice em memória invalidado pelas versões das coleções de origem.
+
+    Escritas do próprio processo chegam por document_saved/document_deleted
+    e são aplicadas por apply_saved/apply_deleted; escritas de outros workers
+    mudam a versão no banco e o índice é remontado na próxima consulta.
+    """
+    models = ()  # Modelos cujas escritas afetam o índice
+    incremental = True  # False: toda escrita local também força a remontagem
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None  # Versões das coleções usadas na montagem
+        if self.incremental:
+            document_saved.connect(self._on_saved)
+            document_deleted.connect(self._on_deleted)
+
+    def get_versions(self):
+        return tuple(model.get_version() for model in self.models)
+
+    def is_built(self):
+        return self._built_at is not None
+
+    def is_stale(self):
+        return self._built_at != self.get_versions()
+
+    def ensure_built(self):
+        if self.is_stale():
+            self.build()
+
+    def build(self):
+        """Monta o índice a partir do MongoDB"""
+        with self._lock:
+            versions = self.get_versions()
+            # Lê do primário: um secundário atrasado poderia ter dados anteriores
+            # às versões, e o índice ficaria marcado como atual com eles
+            with mongo_options(read_preference='primary'):
+                self._build()
+            self._built_at = versions
+
+    def _build(self):
+        raise NotImplementedError
+
+    def apply_saved(self, model, document, previous):
+        """Aplica ao índice montado um documento gravado (previous: None na criação)"""
+        raise NotImplementedError
+
+    def apply_deleted(self, model, document):
+        """Retira do índice montado um documento removido"""
+        raise NotImplementedError
+
+    def _on_saved(self, sender, document, previous=None, **kwargs):
+        if sender in self.models:
+            with self._lock:
+                if self.is_built():
+                    self.apply_saved(sender, document, previous)
+                    self.mark_current(sender)
+
+    def _on_deleted(self, sender, document, **kwargs):
+        if sender in self.models:
+            with self._lock:
+                if self.is_built():
+                    self.apply_deleted(sender, document)
+                    self.mark_current(sender)
+
+    def mark_current(self, written_model):
+        """
+        Depois de aplicar uma escrita local, avança a versão do índice para a
+        gravada por ela, desde que o índice estivesse na versão que o banco
+        tinha logo antes da escrita (senão houve escritas de outros workers e
+        ele será reconstruído).
+        """
+        before, after = collection_versions.get_local_write(written_model.collection_name)
+        self._built_at = tuple(
+            after if model is written_model and built == before and after is not None else built
+            for model, built in zip(self.models, self._built_at)
+        )
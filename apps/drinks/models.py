@@ -1,67 +1,385 @@
-from django.conf import settings
-from pymongo import MongoClient
+import contextvars
+from contextlib import contextmanager
+
+from bson import ObjectId
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+from pymongo.write_concern import WriteConcern
+
+from config.mongodb import get_async_db, get_db
+from .cache import collection_versions, is_simple_filter, snapshot_cache
+
+# Ordenação alfabética em português, sem diferenciar maiúsculas e acentos
+PT_COLLATION = {'locale': 'pt', 'strength': 1}
+
+
+# Opções aplicadas às operações feitas dentro de mongo_options()
+_options_override = contextvars.ContextVar('mongo_options', default={})
+
+
+def coerce_option(name, value):
+    """Aceita as opções como objetos do pymongo ou na forma curta (strings)"""
+    if name == 'read_preference' and isinstance(value, str):
+        return make_read_preference(read_pref_mode_from_name(value), None)
+    if name == 'read_concern' and isinstance(value, str):
+        return ReadConcern(value)
+    if name == 'write_concern':
+        if isinstance(value, dict):
+            return WriteConcern(**value)
+        if isinstance(value, (str, int)):
+            return WriteConcern(w=int(value) if str(value).isdigit() else value)
+    return value
+
+
+@contextmanager
+def mongo_options(**options):
+    """
+    Define read_preference, read_concern, write_concern, max_time_ms e/ou
+    collation para
+    as operações dos modelos feitas dentro do bloco (ex.: uma ação do ViewSet),
+    sobrepondo os valores declarados nas classes.
+    """
+    current = _options_override.get()
+    token = _options_override.set({
+        **current, **{key: value for key, value in options.items() if value is not None}
+    })
+    try:
+        yield
+    finally:
+        _options_override.reset(token)
+
+
+def nome_indexes(unique=True):
+    """Índices padrão sobre o campo nome"""
+    indexes = [
+        # Paginação por cursor ordenada por nome (desempate por _id)
+        IndexModel([('nome', ASCENDING), ('_id', ASCENDING)], name='nome_id'),
+        # Ordenação alfabética em português e busca do admin (consultas com PT_COLLATION)
+        IndexModel([('nome', ASCENDING)], name='nome_pt', collation=PT_COLLATION),
+        IndexModel([('nome_en', ASCENDING)], name='nome_en_pt', collation=PT_COLLATION),
+    ]
+    if unique:
+        indexes.insert(0, IndexModel([('nome', ASCENDING)], name='nome_unique', unique=True))
+    return indexes
 
-# Conectar ao MongoDB Atlas usando variáveis de ambiente
-client = MongoClient(settings.MONGODB_URI)
-db = settings.MONGODB_DB
 
 class MongoModel:
     """Classe base para modelos MongoDB"""
     collection_name = None
+    indexes = []  # Lista de pymongo.IndexModel declarados para a coleção
+    # Serve find/find_one de uma cópia da coleção em memória (coleções pequenas
+    # e que quase não mudam); a cópia é descartada quando a versão muda
+    cache_enabled = False
+    # Opções do MongoDB para a coleção (None usa o padrão do cliente).
+    # Aceitam objetos do pymongo ou strings: read_preference='secondaryPreferred',
+    # read_concern='majority', write_concern='majority'
+    read_preference = None
+    read_concern = None
+    write_concern = None
+    max_time_ms = None  # Tempo máximo de execução das leituras (find/find_one)
+    collation = None  # Collation das leituras (find/find_one/count_documents)
+
+    @classmethod
+    def get_option(cls, name):
+        value = _options_override.get().get(name, getattr(cls, name))
+        return None if value is None else coerce_option(name, value)
+
+    @classmethod
+    def get_collection_options(cls):
+        options = {
+            name: cls.get_option(name)
+            for name in ('read_preference', 'read_concern', 'write_concern')
+        }
+        return {name: value for name, value in options.items() if value is not None}
 
     @classmethod
     def get_collection(cls):
-        return db[cls.collection_name]
+        collection = get_db()[cls.collection_name]
+        options = cls.get_collection_options()
+        return collection.with_options(**options) if options else collection
+
+    @classmethod
+    def get_version(cls):
+        """Versão atual da coleção (muda a cada escrita feita pelo modelo)"""
+        return collection_versions.get(cls.collection_name)
 
     @classmethod
-    def find(cls, filter=None):
+    def find(cls, filter=None, projection=None):
         """Retorna todos os documentos que correspondem ao filtro"""
-        return cls.get_collection().find(filter or {})
+        if projection is None and cls.can_use_cache(filter):
+            return snapshot_cache.find(cls, filter)
+        return cls.get_collection().find(filter or {}, projection, **cls.get_read_options())
+
+    @classmethod
+    def count_documents(cls, filter=None, limit=None):
+        """
+        Conta os documentos do filtro (sem filtro usa os metadados da coleção).
+        Com limit a contagem para ao chegar nele.
+        """
+        collection = cls.get_collection()
+        max_time_ms = cls.get_option('max_time_ms')
+        options = {'maxTimeMS': max_time_ms} if max_time_ms else {}
+        if not filter:
+            return collection.estimated_document_count(**options)
+        if limit:
+            options['limit'] = limit
+        collation = cls.get_option('collation')
+        if collation:
+            options['collation'] = collation
+        return collection.count_documents(filter, **options)
 
     @classmethod
     def find_one(cls, filter):
         """Retorna um documento que corresponde ao filtro"""
-        return cls.get_collection().find_one(filter)
+        if cls.can_use_cache(filter):
+            return next(snapshot_cache.find(cls, filter).limit(1), None)
+        return cls.get_collection().find_one(filter, **cls.get_read_options())
+
+    @classmethod
+    def get_read_options(cls):
+        options = {'max_time_ms': cls.get_option('max_time_ms'), 'collation': cls.get_option('collation')}
+        return {name: value for name, value in options.items() if value}
+
+    @classmethod
+    def can_use_cache(cls, filter):
+        """A cópia em memória compara valores exatos: não serve consultas com collation"""
+        return cls.cache_enabled and is_simple_filter(filter) and not cls.get_option('collation')
+
+    @classmethod
+    def find_by_ids(cls, ids):
+        """
+        Busca vários documentos pelo _id com uma única consulta.
+        Retorna (documentos na ordem pedida, ids não encontrados).
+        """
+        object_ids = {obj_id: ObjectId(obj_id) for obj_id in ids if ObjectId.is_valid(obj_id)}
+        found = {}
+        if object_ids:
+            for document in cls.find({'_id': {'$in': list(object_ids.values())}}):
+                found[document['_id']] = document
+        documents, missing = [], []
+        for obj_id in ids:
+            document = found.get(object_ids.get(obj_id))
+            if document is None:
+                missing.append(obj_id)
+            else:
+                documents.append(document)
+        return documents, missing
+
+    # Variantes assíncronas (AsyncMongoClient), usadas pelas views ASGI.
+    # Os cursores retornados são consumidos com ``await cursor.to_list()``.
+
+    @classmethod
+    def get_async_collection(cls):
+        collection = get_async_db()[cls.collection_name]
+        options = cls.get_collection_options()
+        return collection.with_options(**options) if options else collection
+
+    @classmethod
+    async def aget_version(cls):
+        return await collection_versions.aget(cls.collection_name)
+
+    @classmethod
+    async def afind(cls, filter=None, projection=None):
+        """Versão assíncrona de find(): retorna um cursor assíncrono"""
+        if projection is None and cls.can_use_cache(filter):
+            return await snapshot_cache.afind(cls, filter)
+        return cls.get_async_collection().find(filter or {}, projection, **cls.get_read_options())
+
+    @classmethod
+    async def afind_one(cls, filter):
+        """Versão assíncrona de find_one()"""
+        if cls.can_use_cache(filter):
+            return next((await snapshot_cache.afind(cls, filter)).limit(1), None)
+        return await cls.get_async_collection().find_one(filter, **cls.get_read_options())
 
     @classmethod
     def insert_one(cls, document):
         """Insere um documento na coleção"""
-        return cls.get_collection().insert_one(document)
+        result = cls.get_collection().insert_one(document)
+        collection_versions.bump(cls.collection_name)
+        return result
 
     @classmethod
     def update_one(cls, filter, update):
         """Atualiza um documento na coleção"""
-        return cls.get_collection().update_one(filter, update)
+        result = cls.get_collection().update_one(filter, update)
+        collection_versions.bump(cls.collection_name)
+        return result
+
+    @classmethod
+    def update_many(cls, filter, update):
+        """Atualiza todos os documentos do filtro com uma única operação"""
+        result = cls.get_collection().update_many(filter, update)
+        collection_versions.bump(cls.collection_name)
+        return result
+
+    @classmethod
+    def find_one_and_update(cls, filter, update, **kwargs):
+        """Atualiza um documento e o retorna (antes ou depois, via return_document)"""
+        document = cls.get_collection().find_one_and_update(filter, update, **kwargs)
+        if document is not None:
+            collection_versions.bump(cls.collection_name)
+        return document
 
     @classmethod
     def delete_one(cls, filter):
         """Remove um documento da coleção"""
-        return cls.get_collection().delete_one(filter)
+        result = cls.get_collection().delete_one(filter)
+        collection_versions.bump(cls.collection_name)
+        return result
+
+    @classmethod
+    def delete_many(cls, filter):
+        """Remove todos os documentos do filtro com uma única operação"""
+        result = cls.get_collection().delete_many(filter)
+        collection_versions.bump(cls.collection_name)
+        return result
+
+    @classmethod
+    def bulk_write(cls, requests, ordered=False):
+        """Executa várias escritas em uma única chamada ao banco"""
+        try:
+            return cls.get_collection().bulk_write(requests, ordered=ordered)
+        finally:
+            # Mesmo com erros parciais parte das escritas pode ter sido aplicada
+            collection_versions.bump(cls.collection_name)
+
+    @classmethod
+    def get_index_diff(cls):
+        """
+        Compara os índices declarados com os existentes no banco.
+        Retorna (faltando, divergentes, extras): os dois primeiros são
+        IndexModel declarados e o último, nomes de índices não declarados.
+        """
+        existing = cls.get_collection().index_information()
+        missing, changed = [], []
+        for index in cls.indexes:
+            spec = index.document
+            current = existing.get(spec['name'])
+            if current is None:
+                missing.append(index)
+            elif not _index_matches(spec, current):
+                changed.append(index)
+        declared = {index.document['name'] for index in cls.indexes}
+        extra = [name for name in existing if name != '_id_' and name not in declared]
+        return missing, changed, extra
+
+    @classmethod
+    def ensure_indexes(cls, drop_extra=False):
+        """Cria os índices que faltam e recria os divergentes (idempotente)"""
+        missing, changed, extra = cls.get_index_diff()
+        collection = cls.get_collection()
+        for index in changed:
+            collection.drop_index(index.document['name'])
+        if missing or changed:
+            collection.create_indexes(missing + changed)
+        if drop_extra:
+            for name in extra:
+                collection.drop_index(name)
+        return missing, changed, extra
+
+
+def _index_matches(spec, current):
+    """Verifica se um índice existente corresponde à declaração"""
+    text_fields = [field for field, kind in spec['key'].items() if kind == TEXT]
+    if text_fields:
+        # Índices de texto aparecem como _fts/_ftsx; os campos ficam em weights
+        weights = spec.get('weights', {})
+        expected = {field: weights.get(field, 1) for field in text_fields}
+        if current.get('weights') != expected:
+            return False
+    elif list(spec['key'].items()) != [tuple(k) for k in current['key']]:
+        return False
+    for option, value in spec.items():
+        if option in ('key', 'name', 'background', 'weights'):
+            continue
+        if option == 'collation':
+            # O servidor devolve a collation com todos os valores padrão
+            existing = current.get('collation', {})
+            if any(existing.get(k) != v for k, v in value.items()):
+                return False
+        elif current.get(option) != value:
+            return False
+    return True
+
 
 class TipoIngrediente(MongoModel):
     """Modelo para tipos de ingrediente"""
     collection_name = 'tipos_ingrediente'
+    cache_enabled = True
+    indexes = nome_indexes() + [
+        IndexModel([('ordem', ASCENDING), ('_id', ASCENDING)], name='ordem_id'),
+    ]
 
 class TipoUtensilio(MongoModel):
     """Modelo para tipos de utensílio"""
     collection_name = 'tipos_utensilio'
+    cache_enabled = True
+    indexes = nome_indexes() + [
+        IndexModel([('ordem', ASCENDING), ('_id', ASCENDING)], name='ordem_id'),
+    ]
 
 class UnidadeMedida(MongoModel):
     """Modelo para unidades de medida"""
     collection_name = 'unidades_medida'
+    cache_enabled = True
+    indexes = nome_indexes() + [
+        IndexModel([('tipo', ASCENDING), ('nome', ASCENDING)], name='tipo_nome'),
+    ]
 
 class PerfilSabor(MongoModel):
     """Modelo para perfis de sabor"""
     collection_name = 'perfis_sabor'
+    cache_enabled = True
+    indexes = nome_indexes() + [
+        IndexModel([('ordem', ASCENDING), ('_id', ASCENDING)], name='ordem_id'),
+    ]
 
 class Ingrediente(MongoModel):
     """Modelo para ingredientes"""
     collection_name = 'ingredientes'
+    indexes = nome_indexes() + [
+        IndexModel([('tipo', ASCENDING), ('nome', ASCENDING)], name='tipo_nome'),
+    ]
 
 class Utensilio(MongoModel):
     """Modelo para utensílios"""
     collection_name = 'utensilios'
+    indexes = nome_indexes() + [
+        IndexModel([('tipo', ASCENDING), ('nome', ASCENDING)], name='tipo_nome'),
+    ]
 
 class Drink(MongoModel):
     """Modelo para drinks"""
     collection_name = 'drinks'
+    # O nome não é único: a ação duplicate pode gerar nomes repetidos
+    indexes = nome_indexes(unique=False) + [
+        # Filtros da listagem (DrinkFilter) com a ordenação da paginação
+        IndexModel(
+            [('nivel_dificuldade', ASCENDING), ('teor_alcoolico', ASCENDING),
+             ('nome', ASCENDING), ('_id', ASCENDING)],
+            name='dificuldade_teor_nome'
+        ),
+        IndexModel(
+            [('teor_alcoolico', ASCENDING), ('nome', ASCENDING), ('_id', ASCENDING)],
+            name='teor_nome'
+        ),
+        IndexModel([('ingredientes', ASCENDING)], name='ingredientes'),
+        IndexModel([('utensilios', ASCENDING)], name='utensilios'),
+        # Busca textual: ignora acentos/maiúsculas e ordena por relevância.
+        # Sem idioma (search.TEXT_LANGUAGE): nome_en é inglês e os demais, português
+        IndexModel(
+            [('nome', TEXT), ('nome_en', TEXT), ('descricao', TEXT), ('modo_preparo', TEXT)],
+            name='busca_texto',
+            weights={'nome': 10, 'nome_en': 8, 'descricao': 3, 'modo_preparo': 1},
+            default_language='none'
+        ),
+    ]
+
+
+# Modelos cujas coleções são gerenciadas pela aplicação (índices, checagens)
+MONGO_MODELS = [
+    TipoIngrediente, TipoUtensilio, UnidadeMedida,
+    PerfilSabor, Ingrediente, Utensilio, Drink
+]
@@ -0,0 +1,251 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from bson import json_util
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class MongoCursorPagination:
+    """
+    Paginação por cursor (keyset) para coleções MongoDB.
+
+    A posição é guardada em um cursor opaco com o valor da chave de ordenação
+    e o ``_id`` do último item, então qualquer página custa o mesmo que a
+    primeira: a consulta parte do índice, sem ``skip``.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    ordering_query_param = 'ordering'
+    default_limit = 20
+    max_limit = 100
+    invalid_cursor_message = 'Cursor inválido'
+
+    def is_requested(self, request):
+        """A paginação é opcional: só é usada quando o cliente pede"""
+        params = request.query_params
+        return self.limit_query_param in params or self.cursor_query_param in params
+
+    def get_limit(self, request):
+        value = request.query_params.get(self.limit_query_param)
+        if value is None:
+            return self.default_limit
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError({self.limit_query_param: 'Informe um número inteiro'})
+        if limit < 1:
+            raise ValidationError({self.limit_query_param: 'Informe um número positivo'})
+        return min(limit, self.max_limit)
+
+    def get_ordering(self, request, view):
+        """Retorna (campo, direção) a partir de ?ordering=, limitado aos campos indexados"""
+        default = getattr(view, 'ordering', '_id')
+        value = request.query_params.get(self.ordering_query_param, default)
+        field = value.lstrip('-')
+        allowed = ['_id'] + list(getattr(view, 'ordering_fields', []))
+        if field not in allowed:
+            raise ValidationError({
+                self.ordering_query_param: f'Ordenação permitida apenas por: {", ".join(allowed)}'
+            })
+        return field, -1 if value.startswith('-') else 1
+
+    def encode_cursor(self, position):
+        data = json_util.dumps(position).encode('utf-8')
+        return urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            position = json_util.loads(urlsafe_b64decode(encoded + padding))
+            if not isinstance(position, dict) or '_id' not in position:
+                raise ValueError
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_keyset_filter(self, field, direction, position):
+        """Monta o filtro que retoma a listagem depois da posição informada"""
+        op = '$gt' if direction == 1 else '$lt'
+        if field == '_id':
+            return {'_id': {op: position['_id']}}
+
+        value = position.get('value')
+        tie = {field: value, '_id': {op: position['_id']}}
+        if value is None:
+            # Valores nulos/ausentes ficam antes de todos os outros na ordenação
+            if direction == 1:
+                return {'$or': [{field: {'$ne': None}}, tie]}
+            return tie
+        if direction == -1:
+            # Em ordem decrescente os nulos/ausentes vêm depois de qualquer valor
+            return {'$or': [{field: {op: value}}, {field: None}, tie]}
+        return {'$or': [{field: {op: value}}, tie]}
+
+    def paginate(self, model_class, request, view, filter=None, projection=None):
+        """Retorna os documentos da página atual"""
+        query, sort = self.get_query(request, view, filter)
+        documents = list(model_class.find(query, projection).sort(sort).limit(self.limit + 1))
+        return self.set_page(documents)
+
+    async def apaginate(self, model_class, request, view, filter=None):
+        """Versão assíncrona de paginate(), para as views ASGI"""
+        query, sort = self.get_query(request, view, filter)
+        cursor = await model_class.afind(query)
+        documents = await cursor.sort(sort).limit(self.limit + 1).to_list()
+        return self.set_page(documents)
+
+    def get_query(self, request, view, filter=None):
+        """Retorna o filtro e a ordenação da página pedida"""
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.field, self.direction = self.get_ordering(request, view)
+        self.position = self.decode_cursor(request)
+
+        self.reverse = False
+        query = dict(filter or {})
+        if self.position is not None:
+            if self.position.get('ordering') != [self.field, self.direction]:
+                raise NotFound(self.invalid_cursor_message)
+            self.reverse = bool(self.position.get('reverse'))
+            direction = -self.direction if self.reverse else self.direction
+            keyset = self.get_keyset_filter(self.field, direction, self.position)
+            query = {'$and': [query, keyset]} if query else keyset
+        else:
+            direction = self.direction
+
+        sort = [('_id', direction)]
+        if self.field != '_id':
+            sort.insert(0, (self.field, direction))
+        return query, sort
+
+    def set_page(self, documents):
+        """Recebe até limit + 1 documentos e calcula os links"""
+        has_more = len(documents) > self.limit
+        documents = documents[:self.limit]
+
+        if self.reverse:
+            documents.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = documents
+        return documents
+
+    def get_position(self, document, reverse):
+        position = {
+            'ordering': [self.field, self.direction],
+            '_id': document['_id'],
+        }
+        if self.field != '_id':
+            position['value'] = document.get(self.field)
+        if reverse:
+            position['reverse'] = True
+        return position
+
+    def get_link(self, document, reverse):
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.get_position(document, reverse))
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Página vazia vinda de um cursor reverso: volta para o início
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.get_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.get_link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class MongoSearchPagination:
+    """
+    Paginação por página para resultados de busca ordenados por relevância.
+
+    A relevância só existe dentro da consulta, então não dá para retomar a
+    partir de um cursor; por isso a profundidade é limitada por max_page.
+    """
+    page_query_param = 'page'
+    limit_query_param = 'limit'
+    default_limit = 10
+    max_limit = 50
+    max_page = 20
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.page_query_param in params or self.limit_query_param in params
+
+    def get_int_param(self, request, name, default, maximum):
+        value = request.query_params.get(name)
+        if value is None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValidationError({name: 'Informe um número inteiro'})
+        if number < 1:
+            raise ValidationError({name: 'Informe um número positivo'})
+        if number > maximum:
+            raise ValidationError({name: f'O valor máximo é {maximum}'})
+        return number
+
+    def paginate(self, cursor, request):
+        """Retorna os documentos da página atual"""
+        limit = self.get_page(request)
+        documents = list(cursor.skip((self.page - 1) * limit).limit(limit + 1))
+        return self.set_page(documents, limit)
+
+    async def apaginate(self, cursor, request):
+        """Versão assíncrona de paginate(), para cursores do AsyncMongoClient"""
+        limit = self.get_page(request)
+        documents = await cursor.skip((self.page - 1) * limit).limit(limit + 1).to_list()
+        return self.set_page(documents, limit)
+
+    def get_page(self, request):
+        """Lê a página e retorna o tamanho dela"""
+        self.request = request
+        self.page = self.get_int_param(request, self.page_query_param, 1, self.max_page)
+        return self.get_int_param(request, self.limit_query_param, self.default_limit, self.max_limit)
+
+    def set_page(self, documents, limit):
+        self.has_next = len(documents) > limit and self.page < self.max_page
+        return documents[:limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page + 1)
+
+    def get_previous_link(self):
+        if self.page == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page - 1)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
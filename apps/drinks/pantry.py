@@ -0,0 +1,163 @@
+"""
+Índice "o que dá para fazer?": drinks como conjuntos de bits de ingredientes.
+
+Cada ingrediente recebe um bit e cada drink vira um inteiro com os bits dos
+seus ingredientes. Com a despensa do usuário também como inteiro, os
+ingredientes que faltam para um drink são ``drink & ~despensa``, e o catálogo
+inteiro é avaliado em uma passada com operações de bits, sem ir ao MongoDB.
+"""
+from .memory import VersionedIndex
+from .models import Drink, Ingrediente
+from .text import fold
+
+
+def popcount(value):
+    # int.bit_count só existe a partir do Python 3.10
+    return bin(value).count('1')
+
+
+def iter_bits(mask):
+    """Posições dos bits ligados, da menor para a maior"""
+    bit = 0
+    while mask:
+        if mask & 1:
+            yield bit
+        mask >>= 1
+        bit += 1
+
+
+class PantryIndex(VersionedIndex):
+    """Bitset de ingredientes por drink, com sinônimos vindos dos ingredientes"""
+    models = (Drink, Ingrediente)
+
+    def _reset(self):
+        self.bits = {}         # nome canônico -> bit
+        self.names = []        # bit -> nome como aparece nos drinks
+        self.uses = []         # bit -> quantos drinks o usam
+        self.rows = {}         # id do drink -> inteiro com os bits dos ingredientes
+        self.drink_names = {}  # id do drink -> ingredientes como aparecem no drink
+        self.sort_keys = {}    # id do drink -> nome normalizado (desempate)
+        self.aliases = {}      # nome/nome_en normalizado do ingrediente -> nome normalizado
+        self.ingredient_keys = {}  # id do ingrediente -> nomes normalizados
+
+    def _build(self):
+        self._reset()
+        for ingrediente in Ingrediente.find({}, {'nome': 1, 'nome_en': 1}):
+            self._add_ingredient(ingrediente)
+        for drink in Drink.find({}, {'nome': 1, 'ingredientes': 1}):
+            self._add_drink(drink)
+
+    def _key(self, name):
+        """Nome canônico: o nome ou nome_en de um ingrediente cadastrado vira o nome dele"""
+        key = fold(name)
+        return self.aliases.get(key, key)
+
+    def _bit(self, name):
+        key = self._key(name)
+        if key not in self.bits:
+            self.bits[key] = len(self.names)
+            self.names.append(name)
+            self.uses.append(0)
+        return self.bits[key]
+
+    def _add_drink(self, drink):
+        obj_id = str(drink['_id'])
+        self._remove_drink(obj_id)
+        self.drink_names[obj_id] = list(drink.get('ingredientes', []))
+        self.sort_keys[obj_id] = fold(drink.get('nome'))
+        self._set_row(obj_id)
+
+    def _set_row(self, obj_id):
+        row = 0
+        for name in self.drink_names[obj_id]:
+            row |= 1 << self._bit(name)
+        for bit in iter_bits(row):
+            self.uses[bit] += 1
+        self.rows[obj_id] = row
+
+    def _remove_drink(self, obj_id):
+        for bit in iter_bits(self.rows.pop(obj_id, 0)):
+            self.uses[bit] -= 1
+        self.drink_names.pop(obj_id, None)
+        self.sort_keys.pop(obj_id, None)
+
+    def _remap(self):
+        """
+        Refaz os bits a partir dos ingredientes guardados dos drinks: aplica
+        sinônimos novos e libera os bits que nenhum drink usa mais
+        """
+        self.bits, self.names, self.uses, self.rows = {}, [], [], {}
+        for obj_id in self.drink_names:
+            self._set_row(obj_id)
+
+    def _add_ingredient(self, ingrediente):
+        obj_id = str(ingrediente['_id'])
+        canonical = fold(ingrediente.get('nome'))
+        keys = {fold(ingrediente.get(field)) for field in ('nome', 'nome_en')} - {''}
+        self._remove_ingredient(obj_id)
+        for key in keys:
+            self.aliases[key] = canonical
+        self.ingredient_keys[obj_id] = keys
+
+    def _remove_ingredient(self, obj_id):
+        for key in self.ingredient_keys.pop(obj_id, ()):
+            self.aliases.pop(key, None)
+
+    def apply_saved(self, model, document, previous):
+        if model is Drink:
+            self._add_drink(document)
+            self._remap_if_sparse()
+        else:
+            aliases = dict(self.aliases)
+            self._add_ingredient(document)
+            if self.aliases != aliases:
+                self._remap()
+
+    def apply_deleted(self, model, document):
+        obj_id = str(document['_id'])
+        if model is Drink:
+            self._remove_drink(obj_id)
+            self._remap_if_sparse()
+        else:
+            aliases = dict(self.aliases)
+            self._remove_ingredient(obj_id)
+            if self.aliases != aliases:
+                self._remap()
+
+    def _remap_if_sparse(self):
+        # Ingredientes que saíram de todos os drinks deixam bits livres; quando
+        # passam da metade, os inteiros são refeitos menores
+        if self.uses.count(0) * 2 > len(self.uses):
+            self._remap()
+
+    def get_pantry_mask(self, names):
+        """Converte os ingredientes informados (nome ou nome_en) em bits"""
+        mask = 0
+        for name in names:
+            key = self._key(name)
+            if key in self.bits:
+                mask |= 1 << self.bits[key]
+        return mask
+
+    def match(self, names, max_missing=0, limit=50):
+        """
+        Retorna (id do drink, ingredientes que faltam) para os drinks que faltam
+        no máximo max_missing ingredientes, dos mais completos aos menos.
+        """
+        self.ensure_built()
+        with self._lock:
+            missing_mask = ~self.get_pantry_mask(names)
+            results = []
+            for obj_id, row in self.rows.items():
+                missing = row & missing_mask
+                count = popcount(missing)
+                if count <= max_missing:
+                    results.append((count, self.sort_keys[obj_id], obj_id, missing))
+            results.sort()
+            return [(obj_id, self._decode(missing)) for _, _, obj_id, missing in results[:limit]]
+
+    def _decode(self, mask):
+        return [self.names[bit] for bit in iter_bits(mask)]
+
+
+pantry_index = PantryIndex()
@@ -0,0 +1,36 @@
+from pymongo import ASCENDING
+
+from .text import fold
+
+# O índice de texto não usa idioma: os campos em português e em inglês ficam
+# no mesmo índice, e o stemming de um idioma estragaria os termos do outro
+TEXT_LANGUAGE = 'none'
+
+
+def text_search(model_class, query):
+    """
+    Busca usando o índice de texto da coleção.
+
+    O índice separa as palavras e ignora acentos e maiúsculas ("limao"
+    encontra "limão"), sem stemming. O cursor vem ordenado por relevância,
+    com o _id como desempate para a paginação ser estável.
+    """
+    filter, projection, sort = get_text_query(query)
+    return model_class.find(filter, projection).sort(sort)
+
+
+async def atext_search(model_class, query):
+    """Versão assíncrona de text_search(), para as views ASGI"""
+    filter, projection, sort = get_text_query(query)
+    cursor = await model_class.afind(filter, projection)
+    return cursor.sort(sort)
+
+
+def get_text_query(query):
+    """Retorna (filtro, projeção, ordenação) da busca textual"""
+    score = {'$meta': 'textScore'}
+    return (
+        {'$text': {'$search': fold(query), '$language': TEXT_LANGUAGE}},
+        {'score': score},
+        [('score', score), ('_id', ASCENDING)]
+    )
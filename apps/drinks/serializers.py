@@ -1,12 +1,49 @@
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 from bson import ObjectId
+from pymongo import ReturnDocument
 from .models import (
     TipoIngrediente, TipoUtensilio, UnidadeMedida,
     PerfilSabor, Ingrediente, Utensilio, Drink
 )
+from .compiled import CompiledReadMixin
 from .fields import ObjectIdField
+from .signals import document_saved
 from drf_spectacular.utils import extend_schema_serializer, OpenApiExample
 
+class MongoDocumentSerializer(CompiledReadMixin, serializers.Serializer):
+    """
+    Base dos serializers de documentos MongoDB (modelo em Meta.model).
+    Cada escrita é uma única ida ao banco: o documento devolvido é montado
+    localmente a partir do que foi gravado.
+    """
+
+    def create(self, validated_data):
+        model = self.Meta.model
+        document = dict(validated_data)
+        # O insert_one preenche o _id do próprio dicionário
+        model.insert_one(document)
+        document_saved.send(sender=model, document=document, previous=None, created=True)
+        return document
+
+    def update(self, instance, validated_data):
+        """Grava só os campos recebidos ($set); com partial=True, os enviados no PATCH"""
+        model = self.Meta.model
+        data = {key: value for key, value in validated_data.items() if key != '_id'}
+        filter = {'_id': instance['_id']}
+        if data:
+            # Devolve o documento anterior (para os sinais) na mesma operação
+            previous = model.find_one_and_update(
+                filter, {'$set': data}, return_document=ReturnDocument.BEFORE
+            )
+        else:
+            previous = model.find_one(filter)
+        if previous is None:
+            raise NotFound()
+        document = {**previous, **data}
+        document_saved.send(sender=model, document=document, previous=previous, created=False)
+        return document
+
 @extend_schema_serializer(
     examples=[
         OpenApiExample(
@@ -19,23 +56,12 @@ from drf_spectacular.utils import extend_schema_serializer, OpenApiExample
         )
     ]
 )
-class TipoReferenciaSerializer(serializers.Serializer):
+class TipoReferenciaSerializer(MongoDocumentSerializer):
     _id = ObjectIdField(required=False)
     nome = serializers.CharField(max_length=100)
     nome_en = serializers.CharField(max_length=100)
     ordem = serializers.IntegerField(required=False)
 
-    def create(self, validated_data):
-        result = self.Meta.model.insert_one(validated_data)
-        return self.Meta.model.find_one({'_id': result.inserted_id})
-
-    def update(self, instance, validated_data):
-        self.Meta.model.update_one(
-            {'_id': instance['_id']},
-            {'$set': validated_data}
-        )
-        return {**instance, **validated_data}
-
 class TipoIngredienteSerializer(TipoReferenciaSerializer):
     class Meta:
         model = TipoIngrediente
@@ -61,23 +87,15 @@ class PerfilSaborSerializer(TipoReferenciaSerializer):
         )
     ]
 )
-class UnidadeMedidaSerializer(serializers.Serializer):
+class UnidadeMedidaSerializer(MongoDocumentSerializer):
     _id = ObjectIdField(required=False)
     nome = serializers.CharField(max_length=100)
     nome_en = serializers.CharField(max_length=100)
     tipo = serializers.ChoiceField(choices=['volume', 'peso', 'unidade'])
     conversao_ml = serializers.FloatField(required=False)
 
-    def create(self, validated_data):
-        result = UnidadeMedida.insert_one(validated_data)
-        return UnidadeMedida.find_one({'_id': result.inserted_id})
-
-    def update(self, instance, validated_data):
-        UnidadeMedida.update_one(
-            {'_id': instance['_id']},
-            {'$set': validated_data}
-        )
-        return {**instance, **validated_data}
+    class Meta:
+        model = UnidadeMedida
 
 @extend_schema_serializer(
     examples=[
@@ -93,7 +111,7 @@ class UnidadeMedidaSerializer(serializers.Serializer):
         )
     ]
 )
-class IngredienteSerializer(serializers.Serializer):
+class IngredienteSerializer(MongoDocumentSerializer):
     _id = ObjectIdField(required=False)
     nome = serializers.CharField(max_length=100)
     nome_en = serializers.CharField(max_length=100)
@@ -101,16 +119,8 @@ class IngredienteSerializer(serializers.Serializer):
     descricao = serializers.CharField(required=False, allow_blank=True)
     unidades_permitidas = serializers.ListField(child=serializers.CharField())
 
-    def create(self, validated_data):
-        result = Ingrediente.insert_one(validated_data)
-        return Ingrediente.find_one({'_id': result.inserted_id})
-
-    def update(self, instance, validated_data):
-        Ingrediente.update_one(
-            {'_id': instance['_id']},
-            {'$set': validated_data}
-        )
-        return {**instance, **validated_data}
+    class Meta:
+        model = Ingrediente
 
 @extend_schema_serializer(
     examples=[
@@ -125,23 +135,15 @@ class IngredienteSerializer(serializers.Serializer):
         )
     ]
 )
-class UtensilioSerializer(serializers.Serializer):
+class UtensilioSerializer(MongoDocumentSerializer):
     _id = ObjectIdField(required=False)
     nome = serializers.CharField(max_length=100)
     nome_en = serializers.CharField(max_length=100)
     tipo = serializers.CharField(max_length=100)
     descricao = serializers.CharField(required=False, allow_blank=True)
 
-    def create(self, validated_data):
-        result = Utensilio.insert_one(validated_data)
-        return Utensilio.find_one({'_id': result.inserted_id})
-
-    def update(self, instance, validated_data):
-        Utensilio.update_one(
-            {'_id': instance['_id']},
-            {'$set': validated_data}
-        )
-        return {**instance, **validated_data}
+    class Meta:
+        model = Utensilio
 
 @extend_schema_serializer(
     examples=[
@@ -160,7 +162,7 @@ class UtensilioSerializer(serializers.Serializer):
         )
     ]
 )
-class DrinkSerializer(serializers.Serializer):
+class DrinkSerializer(MongoDocumentSerializer):
     _id = ObjectIdField(required=False)
     nome = serializers.CharField(max_length=100)
     nome_en = serializers.CharField(max_length=100)
@@ -171,13 +173,27 @@ class DrinkSerializer(serializers.Serializer):
     ingredientes = serializers.ListField(child=serializers.CharField())
     utensilios = serializers.ListField(child=serializers.CharField())
 
-    def create(self, validated_data):
-        result = Drink.insert_one(validated_data)
-        return Drink.find_one({'_id': result.inserted_id})
-
-    def update(self, instance, validated_data):
-        Drink.update_one(
-            {'_id': instance['_id']},
-            {'$set': validated_data}
-        )
-        return {**instance, **validated_data} 
\ No newline at end of file
+    class Meta:
+        model = Drink
+
+class PantryQuerySerializer(serializers.Serializer):
+    """Parâmetros da busca de drinks pelos ingredientes disponíveis"""
+    ingredientes = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        max_length=200,
+        help_text='Ingredientes disponíveis (nome ou nome em inglês)'
+    )
+    max_missing = serializers.IntegerField(
+        min_value=0, max_value=5, default=0,
+        help_text='Quantidade máxima de ingredientes faltando'
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=200, default=50)
+
+
+class SimilarQuerySerializer(serializers.Serializer):
+    """Parâmetros da busca de drinks parecidos"""
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    min_similarity = serializers.FloatField(
+        min_value=0, max_value=1, default=0,
+        help_text='Similaridade mínima (Jaccard entre ingredientes e utensílios)'
+    )
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Enviados depois de escritas feitas pela API e pelo admin.
+# document_saved: sender=modelo, document, previous (None na criação), created
+# document_deleted: sender=modelo, document
+document_saved = Signal()
+document_deleted = Signal()
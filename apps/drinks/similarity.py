@@ -0,0 +1,130 @@
+"""Drinks parecidos por MinHash/LSH sobre ingredientes e utensílios."""
+import hashlib
+import random
+
+from django.conf import settings
+
+from .memory import VersionedIndex
+from .models import Drink
+from .text import fold
+
+# Primo de Mersenne usado nas permutações (a * x + b) mod p
+PRIME = (1 << 61) - 1
+
+
+def token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def get_tokens(drink):
+    """Conjunto que representa o drink: ingredientes e utensílios normalizados"""
+    tokens = {'i:' + fold(name) for name in drink.get('ingredientes', [])}
+    tokens |= {'u:' + fold(name) for name in drink.get('utensilios', [])}
+    return tokens
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class SimilarityIndex(VersionedIndex):
+    """
+    Vizinhos aproximados (Jaccard) entre drinks. A assinatura MinHash de cada
+    drink é dividida em faixas; só drinks com alguma faixa idêntica têm o
+    Jaccard calculado. Mais faixas encontram mais vizinhos, com mais candidatos.
+    """
+    models = (Drink,)
+    seed = 42
+
+    def __init__(self, num_perm=None, bands=None):
+        super().__init__()
+        self.num_perm = num_perm or settings.SIMILAR_DRINKS_NUM_PERM
+        self.bands = bands or settings.SIMILAR_DRINKS_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError('SIMILAR_DRINKS_NUM_PERM deve ser múltiplo de SIMILAR_DRINKS_BANDS')
+        self.rows_per_band = self.num_perm // self.bands
+        rng = random.Random(self.seed)
+        self.permutations = [
+            (rng.randrange(1, PRIME), rng.randrange(0, PRIME)) for _ in range(self.num_perm)
+        ]
+
+    def _reset(self):
+        self.sort_keys = {}  # id -> nome normalizado (desempate)
+        self.tokens = {}     # id -> conjunto de tokens
+        self.keys = {}       # id -> chaves das faixas
+        self.buckets = {}    # chave da faixa -> ids
+
+    def _build(self):
+        self._reset()
+        for drink in Drink.find({}, {'nome': 1, 'ingredientes': 1, 'utensilios': 1}):
+            self._add(drink)
+
+    def signature(self, tokens):
+        hashes = [token_hash(token) for token in tokens]
+        return [min((a * h + b) % PRIME for h in hashes) for a, b in self.permutations]
+
+    def band_keys(self, tokens):
+        if not tokens:
+            return []
+        signature = self.signature(tokens)
+        size = self.rows_per_band
+        return [
+            (band, tuple(signature[band * size:(band + 1) * size]))
+            for band in range(self.bands)
+        ]
+
+    def _add(self, drink):
+        obj_id = str(drink['_id'])
+        tokens = get_tokens(drink)
+        keys = self.band_keys(tokens)
+        self.sort_keys[obj_id] = fold(drink.get('nome'))
+        self.tokens[obj_id] = tokens
+        self.keys[obj_id] = keys
+        for key in keys:
+            self.buckets.setdefault(key, set()).add(obj_id)
+
+    def _remove(self, obj_id):
+        self.sort_keys.pop(obj_id, None)
+        self.tokens.pop(obj_id, None)
+        for key in self.keys.pop(obj_id, ()):
+            ids = self.buckets.get(key)
+            if ids is not None:
+                ids.discard(obj_id)
+                if not ids:
+                    del self.buckets[key]
+
+    def apply_saved(self, model, drink, previous):
+        self._remove(str(drink['_id']))
+        self._add(drink)
+
+    def apply_deleted(self, model, drink):
+        self._remove(str(drink['_id']))
+
+    def similar(self, drink, limit=10, min_similarity=0.0):
+        """Retorna (id, similaridade) dos drinks mais parecidos com o informado"""
+        self.ensure_built()
+        obj_id = str(drink['_id'])
+        with self._lock:
+            tokens = self.tokens.get(obj_id)
+            keys = self.keys.get(obj_id)
+            if tokens is None:
+                tokens = get_tokens(drink)
+                keys = self.band_keys(tokens)
+
+            candidates = set()
+            for key in keys:
+                candidates |= self.buckets.get(key, set())
+            candidates.discard(obj_id)
+
+            results = []
+            for candidate in candidates:
+                score = jaccard(tokens, self.tokens[candidate])
+                if score >= min_similarity:
+                    results.append((-score, self.sort_keys[candidate], candidate))
+            results.sort()
+            return [(candidate, -score) for score, _, candidate in results[:limit]]
+
+
+similarity_index = SimilarityIndex()
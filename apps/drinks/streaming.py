@@ -0,0 +1,76 @@
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+from config.renderers import dumps as json_dumps
+
+STREAM_QUERY_PARAM = 'stream'
+STREAM_FORMATS = {
+    '1': 'json',
+    'true': 'json',
+    'json': 'json',
+    'ndjson': 'ndjson',
+}
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_stream_format(request):
+    """Retorna o formato pedido em ?stream= ('json' ou 'ndjson') ou None"""
+    value = request.query_params.get(STREAM_QUERY_PARAM)
+    if value in (None, '', '0', 'false'):
+        return None
+    try:
+        return STREAM_FORMATS[value.lower()]
+    except KeyError:
+        raise ValidationError({STREAM_QUERY_PARAM: 'Use 1, json ou ndjson'})
+
+
+def dumps(data):
+    """Serializa um item com as mesmas opções do renderer JSON da API"""
+    return json_dumps(data).decode('utf-8')
+
+
+def iter_json_array(documents, serializer, chunk_size):
+    """Gera um array JSON em blocos, um documento por vez"""
+    yield '['
+    separator = ''
+    buffer = []
+    for document in documents:
+        buffer.append(dumps(serializer.to_representation(document)))
+        if len(buffer) >= chunk_size:
+            yield separator + ','.join(buffer)
+            separator = ','
+            buffer = []
+    if buffer:
+        yield separator + ','.join(buffer)
+    yield ']'
+
+
+def iter_ndjson(documents, serializer, chunk_size):
+    """Gera um documento JSON por linha (NDJSON), em blocos"""
+    buffer = []
+    for document in documents:
+        buffer.append(dumps(serializer.to_representation(document)))
+        if len(buffer) >= chunk_size:
+            yield '\n'.join(buffer) + '\n'
+            buffer = []
+    if buffer:
+        yield '\n'.join(buffer) + '\n'
+
+
+def streaming_response(cursor, serializer_class, format='json', chunk_size=200):
+    """
+    Transforma um cursor do pymongo em uma resposta HTTP em streaming.
+
+    Os documentos são lidos do cursor em lotes e serializados um a um, então
+    o consumo de memória não depende do tamanho da coleção.
+    """
+    cursor = cursor.batch_size(chunk_size)
+    serializer = serializer_class()
+    generator = iter_ndjson if format == 'ndjson' else iter_json_array
+    return StreamingHttpResponse(
+        generator(cursor, serializer, chunk_size),
+        content_type=CONTENT_TYPES[format]
+    )
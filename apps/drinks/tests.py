@@ -1,3 +1,1168 @@
-from django.test import TestCase
+import io
+import json
+from urllib.parse import parse_qs, urlparse
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from django.http import QueryDict
+from django.core.checks.registry import registry
+from django.test import SimpleTestCase, override_settings
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import BulkWriteError
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound, ParseError, ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from config.renderers import MongoJSONParser, MongoJSONRenderer
+
+from . import cache, memory, models
+from .admin import MongoModelAdmin, admin_site
+from .async_views import AsyncIngredienteView
+from .autocomplete import AutocompleteIndex
+from .bulk import CREATED, DUPLICATE_KEY_CODE, ERROR, UPDATED, BulkOperation
+from .cache import VERSIONS_COLLECTION, CollectionVersions
+from .compiled import CompiledReadMixin
+from .conditional import get_validators
+from .filters import DrinkFilter
+from .memory import VersionedIndex
+from .models import PT_COLLATION, Drink, Ingrediente, TipoIngrediente, _index_matches, mongo_options
+from .pagination import MongoCursorPagination
+from .pantry import PantryIndex
+from .search import TEXT_LANGUAGE, get_text_query
+from .signals import document_deleted, document_saved
+from .similarity import SimilarityIndex, get_tokens, jaccard
+from .streaming import get_stream_format, streaming_response
+from .usage import UsageIndex
+from .views import TipoIngredienteViewSet
+from .serializers import (
+    TipoIngredienteSerializer, TipoUtensilioSerializer, UnidadeMedidaSerializer,
+    PerfilSaborSerializer, IngredienteSerializer, UtensilioSerializer, DrinkSerializer
+)
+
+
+def drf_representation(serializer_class, document):
+    """Resultado do caminho padrão do DRF, sem o plano compilado"""
+    return serializers.Serializer.to_representation(serializer_class(), document)
+
+
+class CompiledReadParityTests(SimpleTestCase):
+    """O plano compilado deve produzir exatamente o mesmo que o DRF"""
+
+    drink = {
+        '_id': ObjectId(),
+        'nome': 'Mojito',
+        'nome_en': 'Mojito',
+        'nivel_dificuldade': 'facil',
+        'teor_alcoolico': 'medio',
+        'descricao': 'Drink cubano refrescante',
+        'modo_preparo': 'Amasse as folhas de hortelã...',
+        'ingredientes': ['Rum branco', 'Hortelã', 'Limão'],
+        'utensilios': ['Coqueteleira'],
+        'criado_em': '2024-01-01',
+    }
+
+    def assertParity(self, serializer_class, document):
+        expected = drf_representation(serializer_class, document)
+        self.assertEqual(serializer_class().to_representation(document), expected)
+        # Mesma ordem de chaves na resposta
+        self.assertEqual(list(serializer_class().to_representation(document)), list(expected))
+
+    def test_drink(self):
+        self.assertParity(DrinkSerializer, self.drink)
+
+    def test_optional_field_missing(self):
+        document = dict(self.drink)
+        del document['descricao']
+        del document['_id']
+        self.assertParity(DrinkSerializer, document)
+        self.assertNotIn('descricao', DrinkSerializer().to_representation(document))
+
+    def test_none_values(self):
+        document = {**self.drink, 'descricao': None, 'ingredientes': ['Rum', None], 'utensilios': None}
+        self.assertParity(DrinkSerializer, document)
+
+    def test_values_converted(self):
+        document = {
+            **self.drink,
+            '_id': 'não é um ObjectId',
+            'nome': 123,
+            'nivel_dificuldade': 'desconhecido',
+            'ingredientes': ['Rum', 2, 3.5],
+        }
+        self.assertParity(DrinkSerializer, document)
+
+    def test_string_object_id(self):
+        self.assertParity(DrinkSerializer, {**self.drink, '_id': str(ObjectId())})
+
+    def test_required_field_missing_raises(self):
+        document = dict(self.drink)
+        del document['modo_preparo']
+        with self.assertRaises(KeyError):
+            drf_representation(DrinkSerializer, document)
+        with self.assertRaises(KeyError):
+            DrinkSerializer().to_representation(document)
+
+    def test_reference_serializers(self):
+        tipo = {'_id': ObjectId(), 'nome': 'Destilado', 'nome_en': 'Spirit', 'ordem': '2'}
+        for serializer_class in (TipoIngredienteSerializer, TipoUtensilioSerializer, PerfilSaborSerializer):
+            self.assertParity(serializer_class, tipo)
+            self.assertParity(serializer_class, {'nome': 'Destilado', 'nome_en': 'Spirit'})
+
+        unidade = {'_id': ObjectId(), 'nome': 'ml', 'nome_en': 'ml', 'tipo': 'volume', 'conversao_ml': 1}
+        self.assertParity(UnidadeMedidaSerializer, unidade)
+
+        ingrediente = {
+            '_id': ObjectId(), 'nome': 'Rum', 'nome_en': 'Rum', 'tipo': 'destilado',
+            'unidades_permitidas': ['ml', 'oz']
+        }
+        self.assertParity(IngredienteSerializer, ingrediente)
+        self.assertParity(UtensilioSerializer, {**ingrediente, 'descricao': ''})
+
+    def test_many(self):
+        documents = [self.drink, {**self.drink, '_id': ObjectId(), 'nome': 'Caipirinha'}]
+        expected = [drf_representation(DrinkSerializer, document) for document in documents]
+        self.assertEqual(DrinkSerializer(documents, many=True).data, expected)
+
+    def test_plan_per_class(self):
+        self.assertIsNot(TipoIngredienteSerializer.get_read_plan(), DrinkSerializer.get_read_plan())
+
+    def test_method_field_uses_drf(self):
+        class ComMetodo(CompiledReadMixin, serializers.Serializer):
+            nome = serializers.CharField()
+            tamanho = serializers.SerializerMethodField()
+
+            def get_tamanho(self, obj):
+                return len(obj['nome'])
+
+        self.assertIsNone(ComMetodo.get_read_plan())
+        self.assertEqual(ComMetodo().to_representation({'nome': 'Gin'}), {'nome': 'Gin', 'tamanho': 3})
+
+
+class MongoJSONRendererTests(SimpleTestCase):
+
+    def test_same_output_as_drf(self):
+        data = DrinkSerializer([CompiledReadParityTests.drink], many=True).data
+        self.assertEqual(MongoJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_bson_types(self):
+        obj_id = ObjectId()
+        data = {
+            '_id': obj_id,
+            'criado_em': datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+            'preco': Decimal128('12.50'),
+            'nome': 'Limão',
+        }
+        rendered = MongoJSONParser().parse(io.BytesIO(MongoJSONRenderer().render(data)))
+        self.assertEqual(rendered['_id'], str(obj_id))
+        self.assertTrue(rendered['criado_em'].startswith('2024-05-01T12:30:00'))
+        self.assertEqual(Decimal(str(rendered['preco'])), Decimal('12.5'))
+        self.assertEqual(rendered['nome'], 'Limão')
+
+    def test_non_string_keys(self):
+        # Erros de validação de ListField usam o índice do item como chave
+        data = {'ingredientes': {0: ['Não é uma string válida.']}}
+        self.assertEqual(MongoJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_datetime_same_format_as_drf(self):
+        data = {
+            'utc': datetime(2024, 5, 1, 12, 30, 1, 123456, tzinfo=timezone.utc),
+            'naive': datetime(2024, 5, 1, 12, 30),
+        }
+        self.assertEqual(MongoJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_invalid_list_item_returns_400(self):
+        drink = {key: value for key, value in CompiledReadParityTests.drink.items() if key != '_id'}
+        client = APIClient()
+        response = client.post(
+            '/api/drinks/drinks/', {**drink, 'ingredientes': [{'a': 1}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('0', response.json()['ingredientes'])
+
+        response = client.post('/api/drinks/drinks/pantry/', {'ingredientes': [{'a': 1}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_parser_invalid_json(self):
+        with self.assertRaises(ParseError):
+            MongoJSONParser().parse(io.BytesIO(b'{"nome": '))
+
+
+def matches(document, filter):
+    """Avalia o subconjunto de filtros gerado pela paginação, como o MongoDB"""
+    for key, condition in filter.items():
+        if key == '$or':
+            if not any(matches(document, part) for part in condition):
+                return False
+        elif key == '$and':
+            if not all(matches(document, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = document.get(key)
+            for op, operand in condition.items():
+                if op == '$ne':
+                    ok = value != operand
+                elif op == '$in':
+                    ok = value in operand
+                elif value is None or operand is None:
+                    # $gt/$lt nunca casam com nulos/ausentes
+                    ok = False
+                else:
+                    ok = value > operand if op == '$gt' else value < operand
+                if not ok:
+                    return False
+        elif document.get(key) != condition:
+            # {campo: None} casa com nulo e com ausente
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            # Nulos/ausentes antes de qualquer valor, como no MongoDB
+            self.documents.sort(
+                key=lambda document: (document.get(field) is not None, document.get(field) or 0),
+                reverse=direction == -1
+            )
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self.documents)
+
+
+class FakeModel:
+    documents = []
+
+    @classmethod
+    def find(cls, filter=None, projection=None):
+        return FakeCursor([document for document in cls.documents if matches(document, filter or {})])
+
+
+class FakeView:
+    ordering = '_id'
+    ordering_fields = ['ordem']
+
+
+class CursorPaginationTests(SimpleTestCase):
+    """Percorre a listagem pelos links next/previous, com nulos e empates"""
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        ids = sorted(ObjectId() for _ in range(7))
+        values = [3, None, 1, 2, 2, None, 4]
+        FakeModel.documents = [
+            {'_id': obj_id, **({} if value is None and i == 5 else {'ordem': value})}
+            for i, (obj_id, value) in enumerate(zip(ids, values))
+        ]
+
+    def get_page(self, url):
+        paginator = MongoCursorPagination()
+        request = Request(self.factory.get(url))
+        page = paginator.paginate(FakeModel, request, FakeView())
+        return page, paginator.get_next_link(), paginator.get_previous_link()
+
+    def expected(self, direction):
+        documents = FakeCursor(list(FakeModel.documents)).sort([('ordem', direction), ('_id', direction)])
+        return [document['_id'] for document in documents]
+
+    def walk_forward(self, ordering):
+        """Segue os links next; retorna os ids vistos e a URL da última página"""
+        url, seen = f'/?ordering={ordering}&limit=2', []
+        while url:
+            page, next_url, _ = self.get_page(url)
+            seen += [document['_id'] for document in page]
+            last_url, url = url, next_url
+        return seen, last_url
+
+    def test_ascending_walk(self):
+        seen, _ = self.walk_forward('ordem')
+        self.assertEqual(seen, self.expected(1))
+
+    def test_descending_walk_reaches_nulls(self):
+        seen, _ = self.walk_forward('-ordem')
+        self.assertEqual(seen, self.expected(-1))
+        self.assertEqual(len(seen), 7)
+
+    def test_previous_walk(self):
+        for ordering, direction in (('ordem', 1), ('-ordem', -1)):
+            _, url = self.walk_forward(ordering)
+            # Volta da última página até a primeira pelos links previous
+            seen = []
+            while url:
+                page, _, url = self.get_page(url)
+                seen = [document['_id'] for document in page] + seen
+            self.assertEqual(seen, self.expected(direction), ordering)
+
+    def test_cursor_from_other_ordering_rejected(self):
+        _, next_url, _ = self.get_page('/?ordering=ordem&limit=2')
+        cursor = parse_qs(urlparse(next_url).query)['cursor'][0]
+        with self.assertRaises(NotFound):
+            self.get_page(f'/?ordering=-ordem&limit=2&cursor={cursor}')
+
+
+class TextSearchTests(SimpleTestCase):
+    def test_query_is_folded_without_language(self):
+        filter, _, _ = get_text_query('  Limão  TAHITI ')
+        self.assertEqual(filter, {'$text': {'$search': 'limao tahiti', '$language': 'none'}})
+
+    def test_index_matches_query_language(self):
+        # Com idiomas diferentes o stemming da consulta não bate com o do índice
+        index = next(i.document for i in Drink.indexes if i.document['name'] == 'busca_texto')
+        self.assertEqual(index['default_language'], TEXT_LANGUAGE)
+
+
+class MongoAdminSearchTests(SimpleTestCase):
+    def setUp(self):
+        self.admin = MongoModelAdmin(Drink, admin_site)
+
+    def test_search_is_a_prefix_range(self):
+        bounds = {'$gte': 'Gin (seco)', '$lt': 'Gin (seco)\uffff'}
+        self.assertEqual(self.admin.get_search_filter('Gin (seco)'), {'$or': [
+            {'nome': bounds}, {'nome_en': bounds},
+        ]})
+        self.assertEqual(self.admin.get_search_filter(''), {})
+
+    def test_search_runs_with_the_index_collation(self):
+        fields = {name for index in Drink.indexes for name in index.document['key']
+                  if index.document.get('collation') == self.admin.search_collation}
+        self.assertTrue(set(self.admin.search_fields) <= fields)
+
+        collection = mock.Mock()
+        collection.find.return_value = FakeCursor([])
+        collection.count_documents.return_value = 0
+        request = APIRequestFactory().get('/admin/drinks/drink/', {'q': 'lim'})
+        request.user = mock.Mock(is_active=True, is_staff=True)
+        with mock.patch.object(Drink, 'get_collection', return_value=collection):
+            self.admin.list_view(request)
+        self.assertEqual(collection.find.call_args.kwargs['collation'], PT_COLLATION)
+        self.assertEqual(collection.count_documents.call_args.kwargs['collation'], PT_COLLATION)
+
+    def test_collation_bypasses_snapshot_cache(self):
+        self.assertTrue(TipoIngrediente.can_use_cache({'nome': 'Gin'}))
+        with mongo_options(collation=PT_COLLATION):
+            self.assertFalse(TipoIngrediente.can_use_cache({'nome': 'Gin'}))
+
+    def test_invalid_cursor_keeps_the_search(self):
+        request = APIRequestFactory().get('/admin/drinks/drink/', {'q': 'limão', 'cursor': 'x'})
+        response = self.admin.list_view(request)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(parse_qs(urlparse(response['Location']).query), {'q': ['limão']})
+
+
+class MongoAdminAccessTests(SimpleTestCase):
+    def test_anonymous_user_is_sent_to_login(self):
+        client = APIClient()
+        for method, url in [
+            ('get', '/admin/drinks/drink/'),
+            ('get', '/admin/drinks/drink/add/'),
+            ('post', '/admin/drinks/drink/actions/'),
+            ('get', f'/admin/drinks/drink/{ObjectId()}/change/'),
+            ('post', f'/admin/drinks/drink/{ObjectId()}/delete/'),
+        ]:
+            with self.subTest(url=url):
+                response = getattr(client, method)(url, {'action': 'delete_selected'})
+                self.assertEqual(response.status_code, 302)
+                self.assertTrue(response['Location'].startswith('/admin/login/'))
+
+
+def loaded(index):
+    """Marca o índice como montado e em dia, sem consultar o MongoDB"""
+    index._built_at = tuple(None for _ in index.models)
+    index.ensure_built = lambda: None
+    return index
+
+
+class PantryIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = loaded(PantryIndex())
+        self.index._reset()
+        for ingrediente in [
+            {'_id': ObjectId(), 'nome': 'Limão', 'nome_en': 'Lime'},
+            {'_id': ObjectId(), 'nome': 'Cachaça', 'nome_en': 'Cachaca'},
+        ]:
+            self.index._add_ingredient(ingrediente)
+        self.caipirinha = {'_id': ObjectId(), 'nome': 'Caipirinha', 'ingredientes': ['Cachaça', 'Limão', 'Açúcar']}
+        self.mojito = {'_id': ObjectId(), 'nome': 'Mojito', 'ingredientes': ['Rum', 'Limão', 'Hortelã', 'Açúcar']}
+        self.gin = {'_id': ObjectId(), 'nome': 'Gin Tônica', 'ingredientes': ['Gin', 'Água Tônica']}
+        for drink in [self.caipirinha, self.mojito, self.gin]:
+            self.index._add_drink(drink)
+
+    def test_complete_drinks_only(self):
+        matches = self.index.match(['cachaca', 'LIMAO', 'açúcar'])
+        self.assertEqual(matches, [(str(self.caipirinha['_id']), [])])
+
+    def test_missing_ingredients_by_count(self):
+        # "Lime" é o nome_en de Limão
+        self.assertEqual(
+            self.index.match(['Lime', 'Açúcar'], max_missing=1),
+            [(str(self.caipirinha['_id']), ['Cachaça'])]
+        )
+        # Mesmo número de faltantes: desempate pelo nome
+        matches = self.index.match(['Lime', 'Açúcar'], max_missing=2)
+        self.assertEqual(matches, [
+            (str(self.caipirinha['_id']), ['Cachaça']),
+            (str(self.gin['_id']), ['Gin', 'Água Tônica']),
+            (str(self.mojito['_id']), ['Rum', 'Hortelã']),
+        ])
+
+    def test_unknown_ingredients_are_ignored(self):
+        self.assertEqual(self.index.get_pantry_mask(['Vodka']), 0)
+        self.assertEqual(self.index.match(['Vodka', 'Gin', 'Água tônica']), [(str(self.gin['_id']), [])])
+
+    def test_local_writes_update_the_index(self):
+        self.caipirinha['ingredientes'] = ['Cachaça', 'Limão']
+        document_saved.send(sender=Drink, document=self.caipirinha, previous=None, created=False)
+        self.assertEqual(self.index.match(['Cachaça', 'Limão']), [(str(self.caipirinha['_id']), [])])
+
+        document_deleted.send(sender=Drink, document=self.caipirinha)
+        self.assertEqual(self.index.match(['Cachaça', 'Limão']), [])
+
+        vodka = {'_id': ObjectId(), 'nome': 'Vodka', 'nome_en': 'Wodka'}
+        self.index._add_drink({'_id': ObjectId(), 'nome': 'Shot', 'ingredientes': ['Vodka']})
+        document_saved.send(sender=Ingrediente, document=vodka, previous=None, created=True)
+        self.assertEqual(len(self.index.match(['Wodka'])), 1)
+
+    def test_drink_names_use_the_aliases(self):
+        # O drink cita o nome_en; a despensa, o nome (e vice-versa)
+        bits = dict(self.index.bits)
+        batida = {'_id': ObjectId(), 'nome': 'Batida', 'ingredientes': ['Cachaca', 'Lime']}
+        document_saved.send(sender=Drink, document=batida, previous=None, created=True)
+        self.assertEqual(self.index.bits, bits)
+        self.assertIn((str(batida['_id']), []), self.index.match(['Cachaça', 'Limão']))
+
+        # Um sinônimo cadastrado depois refaz os bits dos drinks que já o citavam
+        mint = {'_id': ObjectId(), 'nome': 'Mint Julep', 'ingredientes': ['Bourbon', 'Mint']}
+        document_saved.send(sender=Drink, document=mint, previous=None, created=True)
+        hortela = {'_id': ObjectId(), 'nome': 'Hortelã', 'nome_en': 'Mint'}
+        document_saved.send(sender=Ingrediente, document=hortela, previous=None, created=True)
+        self.assertNotIn('mint', self.index.bits)
+        self.assertEqual(self.index.match(['Bourbon', 'hortelã']), [(str(mint['_id']), [])])
+
+    def test_unused_bits_are_reclaimed(self):
+        for drink in (self.mojito, self.gin):
+            document_deleted.send(sender=Drink, document=drink)
+        # Rum, Hortelã, Gin e Água Tônica saíram de todos os drinks
+        self.assertEqual(sorted(self.index.bits), ['acucar', 'cachaca', 'limao'])
+        self.assertEqual(len(self.index.names), 3)
+        self.assertEqual(self.index.match(['Cachaça', 'Limão', 'Açúcar']), [(str(self.caipirinha['_id']), [])])
+
+
+class SimilarityIndexTests(SimpleTestCase):
+    def setUp(self):
+        # Uma linha por faixa: qualquer hash mínimo em comum já gera candidato
+        self.index = loaded(SimilarityIndex(num_perm=32, bands=32))
+        self.index._reset()
+        self.caipirinha = {'_id': ObjectId(), 'nome': 'Caipirinha', 'ingredientes': ['Cachaça', 'Limão', 'Açúcar'], 'utensilios': ['Socador']}
+        self.caipiroska = {'_id': ObjectId(), 'nome': 'Caipiroska', 'ingredientes': ['Vodka', 'Limão', 'Açúcar'], 'utensilios': ['Socador']}
+        self.batida = {'_id': ObjectId(), 'nome': 'Batida', 'ingredientes': ['Cachaça', 'Limão'], 'utensilios': ['Liquidificador']}
+        self.gin = {'_id': ObjectId(), 'nome': 'Gin Tônica', 'ingredientes': ['Gin', 'Água Tônica'], 'utensilios': ['Copo']}
+        for drink in [self.caipirinha, self.caipiroska, self.batida, self.gin]:
+            self.index._add(drink)
+
+    def test_tokens_and_jaccard(self):
+        self.assertEqual(get_tokens(self.batida), {'i:cachaca', 'i:limao', 'u:liquidificador'})
+        self.assertEqual(jaccard(get_tokens(self.caipirinha), get_tokens(self.caipiroska)), 0.6)
+        self.assertEqual(jaccard(set(), {'i:gin'}), 0.0)
+
+    def test_bands_must_divide_permutations(self):
+        with self.assertRaises(ValueError):
+            SimilarityIndex(num_perm=10, bands=3)
+
+    def test_signature_estimates_jaccard(self):
+        index = SimilarityIndex(num_perm=256, bands=64)
+        a = {f'i:{n}' for n in range(30)}
+        b = {f'i:{n}' for n in range(10, 40)}
+        signature_a, signature_b = index.signature(a), index.signature(b)
+        estimate = sum(x == y for x, y in zip(signature_a, signature_b)) / index.num_perm
+        self.assertAlmostEqual(estimate, jaccard(a, b), delta=0.1)
+        # Determinística: a mesma semente gera as mesmas permutações
+        self.assertEqual(SimilarityIndex(num_perm=256, bands=64).signature(a), signature_a)
+
+    def test_similar_ranks_by_jaccard(self):
+        results = self.index.similar(self.caipirinha)
+        self.assertEqual(results, [
+            (str(self.caipiroska['_id']), 0.6),
+            (str(self.batida['_id']), 0.4),
+        ])
+        self.assertEqual(self.index.similar(self.caipirinha, min_similarity=0.5), results[:1])
+        self.assertEqual(self.index.similar(self.gin), [])
+
+    def test_unindexed_drink_and_local_writes(self):
+        novo = {'_id': ObjectId(), 'nome': 'Caipiríssima', 'ingredientes': ['Rum', 'Limão', 'Açúcar'], 'utensilios': ['Socador']}
+        self.assertEqual(self.index.similar(novo)[0], (str(self.caipirinha['_id']), 0.6))
+
+        document_saved.send(sender=Drink, document=novo, previous=None, created=True)
+        self.assertIn(str(novo['_id']), dict(self.index.similar(self.caipirinha)))
+        document_deleted.send(sender=Drink, document=self.caipiroska)
+        self.assertNotIn(str(self.caipiroska['_id']), dict(self.index.similar(self.caipirinha)))
+
+
+class AutocompleteIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = loaded(AutocompleteIndex(Ingrediente, popularity_field='ingredientes'))
+        self.index._reset()
+        for nome, nome_en in [
+            ('Limão', 'Lime'), ('Limão Siciliano', 'Lemon'), ('Suco de Limão', 'Lime Juice'),
+            ('Licor de Limão', 'Limoncello'), ('Melão', 'Melon'), ('Gin', 'Gin'),
+        ]:
+            self.index._add({'_id': ObjectId(), 'nome': nome, 'nome_en': nome_en})
+
+    def names(self, query, limit=10):
+        return [document['nome'] for document in self.index.search(query, limit)]
+
+    def test_exact_then_prefix_then_word_then_infix(self):
+        # Dentro do mesmo nível: nomes mais curtos primeiro
+        self.assertEqual(self.names('limao'), [
+            'Limão', 'Limão Siciliano', 'Suco de Limão', 'Licor de Limão'
+        ])
+        # "elo" só aparece no meio de palavras (Melão/Melon)
+        self.assertEqual(self.names('elo'), ['Melão'])
+        self.assertEqual(self.names('g'), ['Gin'])
+        self.assertEqual(self.names('  '), [])
+
+    def test_searches_nome_en_without_accents(self):
+        self.assertEqual(self.names('LEMON'), ['Limão Siciliano'])
+        # "Lime Juice" também é prefixo, e "Suco de Limão" é o nome mais curto
+        self.assertEqual(self.names('lim', limit=2), ['Limão', 'Suco de Limão'])
+
+    def test_popularity_breaks_ties_within_a_level(self):
+        drink = {'_id': ObjectId(), 'ingredientes': ['Licor de Limão']}
+        document_saved.send(sender=Drink, document=drink, previous=None, created=True)
+        self.assertEqual(self.names('limao')[2:], ['Licor de Limão', 'Suco de Limão'])
+
+        document_deleted.send(sender=Drink, document=drink)
+        self.assertEqual(self.names('limao')[2:], ['Suco de Limão', 'Licor de Limão'])
+
+    def test_local_writes_update_the_index(self):
+        tonica = {'_id': ObjectId(), 'nome': 'Água Tônica', 'nome_en': 'Tonic Water'}
+        document_saved.send(sender=Ingrediente, document=tonica, previous=None, created=True)
+        self.assertEqual(self.names('tonic'), ['Água Tônica'])
+
+        tonica['nome'] = 'Tônica'
+        document_saved.send(sender=Ingrediente, document=tonica, previous=None, created=False)
+        self.assertEqual(self.names('agua'), [])
+        document_deleted.send(sender=Ingrediente, document=tonica)
+        self.assertEqual(self.names('tonica'), [])
+
+
+class DrinkFilterTests(SimpleTestCase):
+    def get_filter(self, query):
+        return DrinkFilter(QueryDict(query)).get_filter()
+
+    def test_choices_come_from_the_serializer(self):
+        for field, choices in DrinkFilter.choice_fields.items():
+            self.assertEqual(choices, list(DrinkSerializer().fields[field].choices))
+
+    def test_choice_values(self):
+        self.assertEqual(
+            self.get_filter('dificuldade=facil,medio&teor_alcoolico=zero'),
+            {'nivel_dificuldade': {'$in': ['facil', 'medio']}, 'teor_alcoolico': 'zero'}
+        )
+        with self.assertRaises(ValidationError):
+            self.get_filter('teor_alcoolico=forte')
+
+
+class HealthCheckTests(SimpleTestCase):
+    @override_settings(DEBUG=False)
+    def test_pool_stats_hidden_from_anonymous_users(self):
+        data = APIClient().get('/health/').json()
+        self.assertEqual(data['status'], 'healthy')
+        self.assertNotIn('mongodb_pool', data)
+
+    @override_settings(DEBUG=True)
+    def test_pool_stats_in_debug(self):
+        self.assertIn('pid', APIClient().get('/health/').json()['mongodb_pool'])
+
+
+class FakeVersionsCollection:
+    """Coleção colecao_versoes em memória, compartilhada pelos workers do teste"""
+
+    def __init__(self):
+        self.documents = {}
+
+    def find_one(self, filter):
+        document = self.documents.get(filter['_id'])
+        return dict(document) if document else None
+
+    def update_one(self, filter, update, upsert=False):
+        if filter['_id'] not in self.documents:
+            self.documents[filter['_id']] = {'_id': filter['_id'], **update['$setOnInsert']}
+
+    def find_one_and_update(self, filter, update, upsert=False, return_document=None):
+        before = self.find_one(filter)
+        self.documents[filter['_id']] = {'_id': filter['_id'], **update['$set']}
+        return before
+
+
+@override_settings(MONGODB_CACHE_INVALIDATION_CHANNEL='apps.drinks.cache.LocalInvalidationChannel')
+class VersionedIndexWorkersTests(SimpleTestCase):
+    """Dois workers escrevendo na mesma coleção, sem canal de invalidação"""
+
+    def setUp(self):
+        db = {VERSIONS_COLLECTION: FakeVersionsCollection()}
+        # O índice deste processo usa o worker A; o worker B é outro processo
+        self.worker_a, self.worker_b = CollectionVersions(), CollectionVersions()
+        self.drinks = [{'_id': ObjectId(), 'ingredientes': ['Rum']}]
+        for patcher in [
+            mock.patch.object(cache, 'get_db', return_value=db),
+            mock.patch.object(models, 'collection_versions', self.worker_a),
+            mock.patch.object(memory, 'collection_versions', self.worker_a),
+            mock.patch.object(Drink, 'find', side_effect=lambda *args: [dict(d) for d in self.drinks]),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.index = UsageIndex('ingredientes')
+        self.index.ensure_built()
+
+    def write(self, worker, drink):
+        """Grava um drink como o MongoModel: nova versão e, no worker local, o sinal"""
+        self.drinks.append(drink)
+        worker.bump(Drink.collection_name)
+        if worker is self.worker_a:
+            document_saved.send(sender=Drink, document=drink, previous=None, created=True)
+
+    def test_local_write_keeps_index_current(self):
+        drink = {'_id': ObjectId(), 'ingredientes': ['Rum', 'Limão']}
+        self.write(self.worker_a, drink)
+        self.assertFalse(self.index.is_stale())
+        self.assertEqual(self.index.get_drink_ids('limao'), {str(drink['_id'])})
+
+    def test_write_from_other_worker_is_not_skipped(self):
+        other = {'_id': ObjectId(), 'ingredientes': ['Gin']}
+        self.write(self.worker_b, other)
+        # O worker A ainda tem a versão antiga em cache (TTL) e escreve em seguida
+        local = {'_id': ObjectId(), 'ingredientes': ['Rum', 'Limão']}
+        self.write(self.worker_a, local)
+
+        self.assertTrue(self.index.is_stale())
+        self.assertEqual(self.index.get_drink_ids('gin'), {str(other['_id'])})
+        self.assertEqual(self.index.get_drink_ids('limao'), {str(local['_id'])})
+
+
+class SecondaryReadTests(SimpleTestCase):
+    def test_no_validators_for_secondary_reads(self):
+        request = APIRequestFactory().get('/api/drinks/drinks/')
+        with mock.patch.object(Drink, 'get_version', side_effect=AssertionError):
+            with mongo_options(read_preference='secondaryPreferred'):
+                self.assertEqual(get_validators(Drink, request), (None, None))
+
+    def test_index_builds_read_from_primary(self):
+        seen = []
+
+        class Index(VersionedIndex):
+            def _build(self):
+                seen.append(Drink.get_option('read_preference').mongos_mode)
+
+        with mongo_options(read_preference='secondaryPreferred'):
+            Index().build()
+        self.assertEqual(seen, ['primary'])
+
+
+
+class ConditionalViewTests(SimpleTestCase):
+    url = '/api/drinks/tipos-ingrediente/'
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        self.version = ObjectId()
+        self.documents = [{'_id': ObjectId(), 'nome': 'Destilado', 'nome_en': 'Spirit', 'ordem': 1}]
+        patches = [
+            mock.patch.object(TipoIngrediente, 'get_version', side_effect=lambda: self.version),
+            mock.patch.object(TipoIngrediente, 'find', side_effect=lambda *args: FakeCursor(list(self.documents))),
+            mock.patch.object(TipoIngrediente, 'find_one', side_effect=lambda filter: self.documents[0]),
+        ]
+        _, self.find, _ = [patch.start() for patch in patches]
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+    def get(self, url, **headers):
+        """Chama o ViewSet direto (as rotas usam as cópias dos módulos em apps.drinks)"""
+        request = self.factory.get(url, **headers)
+        path = url.split('?')[0]
+        if path == self.url:
+            view, kwargs = TipoIngredienteViewSet.as_view({'get': 'list'}), {}
+        else:
+            view, kwargs = TipoIngredienteViewSet.as_view({'get': 'retrieve'}), {'pk': path.split('/')[-2]}
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_matching_etag_returns_304_without_reading(self):
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.find.reset_mock()
+
+        response = self.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Last-Modified'], last_modified)
+        self.assertEqual(response.content, b'')
+        self.find.assert_not_called()
+
+    def test_if_modified_since(self):
+        last_modified = self.get(self.url)['Last-Modified']
+        response = self.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        # Uma escrita troca a versão (ObjectId novo, com horário posterior)
+        self.version = ObjectId.from_datetime(datetime(2100, 1, 1, tzinfo=timezone.utc))
+        response = self.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_version_changes_etag(self):
+        etag = self.get(self.url)['ETag']
+        self.version = ObjectId()
+        response = self.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_path_and_query(self):
+        detail_url = f'{self.url}{self.documents[0]["_id"]}/'
+        responses = [
+            self.get(self.url),
+            self.get(self.url + '?ordering=ordem'),
+            self.get(detail_url),
+        ]
+        self.assertEqual([response.status_code for response in responses], [200] * 3)
+        self.assertEqual(len({response['ETag'] for response in responses}), 3)
+
+        # A ETag de uma URL não vale para a outra
+        response = self.get(self.url + '?ordering=ordem', HTTP_IF_NONE_MATCH=responses[0]['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_renderer(self):
+        request = Request(APIRequestFactory().get(self.url))
+        etags = set()
+        for renderer in (MongoJSONRenderer(), BrowsableAPIRenderer()):
+            request.accepted_renderer = renderer
+            etags.add(get_validators(TipoIngrediente, request)[0])
+        self.assertEqual(len(etags), 2)
+
+
+
+class UpdateViewTests(SimpleTestCase):
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        self.document = {'_id': ObjectId(), 'nome': 'Destilado', 'nome_en': 'Spirit', 'ordem': 1}
+        self.stored = {self.document['_id']: dict(self.document)}
+        self.updates = []
+
+        def find_one_and_update(filter, update, **kwargs):
+            self.updates.append(update)
+            previous = self.stored.get(filter['_id'])
+            if previous is not None:
+                self.stored[filter['_id']] = {**previous, **update['$set']}
+            return previous
+
+        patches = [
+            mock.patch.object(TipoIngrediente, 'find_one_and_update', side_effect=find_one_and_update),
+            mock.patch.object(TipoIngrediente, 'find_one', side_effect=lambda filter: self.stored.get(filter['_id'])),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def send(self, method, pk, data):
+        request = getattr(self.factory, method)(f'/api/drinks/tipos-ingrediente/{pk}/', data, format='json')
+        action = 'partial_update' if method == 'patch' else 'update'
+        return TipoIngredienteViewSet.as_view({method: action})(request, pk=str(pk))
+
+    def assert_matches_stored(self, response):
+        stored = TipoIngredienteSerializer(self.stored[self.document['_id']]).data
+        self.assertEqual(response.data, stored)
+
+    def test_patch_sets_only_sent_fields(self):
+        response = self.send('patch', self.document['_id'], {'ordem': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.updates, [{'$set': {'ordem': 5}}])
+        self.assertEqual(self.stored[self.document['_id']], {**self.document, 'ordem': 5})
+        self.assert_matches_stored(response)
+        self.assertEqual(response.data['nome'], 'Destilado')
+
+    def test_empty_patch_returns_stored_document(self):
+        response = self.send('patch', self.document['_id'], {})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.updates, [])
+        self.assert_matches_stored(response)
+
+    def test_put_requires_all_fields(self):
+        response = self.send('put', self.document['_id'], {'ordem': 5})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nome', response.data)
+        self.assertEqual(self.updates, [])
+
+        response = self.send('put', self.document['_id'], {'nome': 'Licor', 'nome_en': 'Liqueur'})
+        self.assertEqual(response.status_code, 200)
+        self.assert_matches_stored(response)
+        self.assertEqual(response.data['ordem'], 1)
+
+    def test_unknown_or_invalid_id_is_404(self):
+        for pk in ('nao-e-um-id', ObjectId()):
+            with self.subTest(pk=pk):
+                response = self.send('patch', pk, {'ordem': 5})
+                self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.stored, {self.document['_id']: self.document})
+
+
+
+class FindByIdsTests(SimpleTestCase):
+    def setUp(self):
+        self.documents = [
+            {'_id': ObjectId(), 'nome': nome, 'nome_en': nome, 'ordem': i}
+            for i, nome in enumerate(['Destilado', 'Licor', 'Bitters'])
+        ]
+        patch = mock.patch.object(
+            TipoIngrediente, 'find',
+            side_effect=lambda filter=None, *args: FakeCursor([
+                document for document in self.documents if matches(document, filter or {})
+            ]),
+        )
+        self.find = patch.start()
+        self.addCleanup(patch.stop)
+        patch = mock.patch.object(TipoIngrediente, 'get_version', return_value=ObjectId())
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_requested_order_and_missing_ids(self):
+        first, second, third = (str(document['_id']) for document in self.documents)
+        unknown = str(ObjectId())
+        documents, missing = TipoIngrediente.find_by_ids([third, unknown, first, 'x', second])
+
+        self.assertEqual(documents, [self.documents[2], self.documents[0], self.documents[1]])
+        # Ids inválidos e inexistentes voltam como não encontrados, na ordem pedida
+        self.assertEqual(missing, [unknown, 'x'])
+        self.find.assert_called_once()
+
+    def test_only_invalid_ids_skip_the_query(self):
+        self.assertEqual(TipoIngrediente.find_by_ids(['x', '']), ([], ['x', '']))
+        self.find.assert_not_called()
+
+    def test_list_by_ids_view(self):
+        first, second = (str(document['_id']) for document in self.documents[:2])
+        request = APIRequestFactory().get(
+            '/api/drinks/tipos-ingrediente/', {'ids': [f'{second}, x,{first}', second]}
+        )
+        response = TipoIngredienteViewSet.as_view({'get': 'list'})(request)
+
+        self.assertEqual(response.status_code, 200)
+        # Repetidos e espaços são descartados; a ordem é a da URL
+        self.assertEqual([item['nome'] for item in response.data['results']], ['Licor', 'Destilado'])
+        self.assertEqual(response.data['nao_encontrados'], ['x'])
+
+    def test_list_by_ids_limit(self):
+        ids = ','.join(str(ObjectId()) for _ in range(TipoIngredienteViewSet.ids_max_items + 1))
+        request = APIRequestFactory().get('/api/drinks/tipos-ingrediente/', {'ids': ids})
+        response = TipoIngredienteViewSet.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ids', response.data)
+
+
+
+class StreamingResponseTests(SimpleTestCase):
+    def stream(self, count, format, chunk_size=2):
+        documents = [{'_id': ObjectId(), 'nome': f'Item {i}'} for i in range(count)]
+        cursor = mock.Mock()
+        cursor.batch_size.return_value = iter(documents)
+        response = streaming_response(cursor, NomeSerializer, format, chunk_size=chunk_size)
+        cursor.batch_size.assert_called_once_with(chunk_size)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        expected = [{'id': str(document['_id']), 'nome': document['nome']} for document in documents]
+        return response, content, expected
+
+    def test_json_array(self):
+        # 0, 1, um bloco exato e um bloco incompleto no fim
+        for count in (0, 1, 2, 5):
+            with self.subTest(count=count):
+                response, content, expected = self.stream(count, 'json')
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(json.loads(content), expected)
+                self.assertNotIn(',,', content)
+                self.assertNotIn('[,', content)
+                self.assertNotIn(',]', content)
+
+    def test_ndjson(self):
+        for count in (0, 1, 2, 5):
+            with self.subTest(count=count):
+                response, content, expected = self.stream(count, 'ndjson')
+                self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+                self.assertEqual(content.count('\n'), count)
+                self.assertTrue(content == '' or content.endswith('}\n'))
+                self.assertEqual([json.loads(line) for line in content.splitlines()], expected)
+
+    def test_stream_format_param(self):
+        for value, expected in [(None, None), ('0', None), ('1', 'json'), ('NDJSON', 'ndjson')]:
+            with self.subTest(value=value):
+                params = {} if value is None else {'stream': value}
+                request = Request(APIRequestFactory().get('/', params))
+                self.assertEqual(get_stream_format(request), expected)
+        with self.assertRaises(ValidationError):
+            get_stream_format(Request(APIRequestFactory().get('/', {'stream': 'csv'})))
+
+
+
+class UsageIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = loaded(UsageIndex('ingredientes'))
+        self.index._reset()
+        self.caipirinha = {'_id': ObjectId(), 'ingredientes': ['Cachaça', 'Limão']}
+        self.mojito = {'_id': ObjectId(), 'ingredientes': ['Rum', 'Limão']}
+        for drink in (self.caipirinha, self.mojito):
+            self.index._add(drink)
+
+    def ids(self, *drinks):
+        return {str(drink['_id']) for drink in drinks}
+
+    def test_lookup_ignores_case_and_accents(self):
+        self.assertEqual(self.index.get_drink_ids('LIMAO'), self.ids(self.caipirinha, self.mojito))
+        self.assertEqual(self.index.get_drink_ids('gin'), set())
+
+    def test_save_updates_the_index(self):
+        gin = {'_id': ObjectId(), 'ingredientes': ['Gin', 'Limão']}
+        document_saved.send(sender=Drink, document=gin, previous=None)
+        self.assertEqual(self.index.get_drink_ids('gin'), self.ids(gin))
+
+        # O mojito deixa de usar limão e passa a usar hortelã
+        mojito = {**self.mojito, 'ingredientes': ['Rum', 'Hortelã']}
+        document_saved.send(sender=Drink, document=mojito, previous=self.mojito)
+        self.assertEqual(self.index.get_drink_ids('limão'), self.ids(self.caipirinha, gin))
+        self.assertEqual(self.index.get_drink_ids('hortela'), self.ids(mojito))
+
+    def test_delete_removes_empty_names(self):
+        document_deleted.send(sender=Drink, document=self.mojito)
+        self.assertEqual(self.index.get_drink_ids('limão'), self.ids(self.caipirinha))
+        self.assertNotIn('rum', self.index.drink_ids)
+        self.assertNotIn(str(self.mojito['_id']), self.index.names)
+
+    def test_other_models_are_ignored(self):
+        document_saved.send(sender=Ingrediente, document={'_id': ObjectId(), 'ingredientes': ['Gin']}, previous=None)
+        self.assertEqual(self.index.get_drink_ids('gin'), set())
+
+
+
+class FakeAsyncCursor(FakeCursor):
+    async def to_list(self, length=None):
+        return list(self.documents)
+
+
+class FakeAsyncCollection:
+    """Coleção do AsyncMongoClient em memória (find/find_one)"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.filters = []
+
+    def find(self, filter=None, projection=None, **kwargs):
+        self.filters.append(filter)
+        return FakeAsyncCursor([document for document in self.documents if matches(document, filter or {})])
+
+    async def find_one(self, filter, **kwargs):
+        return next(iter(self.find(filter)), None)
+
+
+class AsyncViewTests(SimpleTestCase):
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        self.documents = [
+            {'_id': ObjectId(), 'nome': nome, 'nome_en': nome, 'tipo': 'Destilado', 'unidades_permitidas': ['ml']}
+            for nome in ['Vodka', 'Gin', 'Rum']
+        ]
+        self.collection = FakeAsyncCollection(self.documents)
+        self.version = ObjectId()
+        patches = [
+            mock.patch.object(Ingrediente, 'get_async_collection', return_value=self.collection),
+            mock.patch.object(Ingrediente, 'aget_version', side_effect=self.aget_version),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def aget_version(self):
+        return self.version
+
+    async def get(self, path='', **params):
+        headers = params.pop('headers', {})
+        request = self.factory.get(f'/api/async/drinks/ingredientes/{path}', params, **headers)
+        pk = path.rstrip('/') or None
+        return await AsyncIngredienteView.as_view()(request, **({'pk': pk} if pk else {}))
+
+    async def test_list_with_ordering(self):
+        response = await self.get(ordering='nome')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual([item['nome'] for item in json.loads(response.content)], ['Gin', 'Rum', 'Vodka'])
+
+    async def test_paginated_list(self):
+        response = await self.get(limit=2, ordering='nome')
+        data = json.loads(response.content)
+        self.assertEqual([item['nome'] for item in data['results']], ['Gin', 'Rum'])
+        self.assertIsNotNone(data['next'])
+
+    async def test_retrieve_and_404(self):
+        response = await self.get(f'{self.documents[1]["_id"]}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['nome'], 'Gin')
+        for pk in (ObjectId(), 'nao-e-um-id'):
+            with self.subTest(pk=pk):
+                self.assertEqual((await self.get(f'{pk}/')).status_code, 404)
+
+    async def test_not_modified(self):
+        etag = (await self.get())['ETag']
+        self.collection.filters.clear()
+        response = await self.get(headers={'HTTP_IF_NONE_MATCH': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.collection.filters, [])
+
+    async def test_invalid_ordering_is_400(self):
+        response = await self.get(ordering='descricao')
+        self.assertEqual(response.status_code, 400)
+
+
+
+class IndexMatchTests(SimpleTestCase):
+    """current no formato de index_information()"""
+
+    def spec(self, *args, **kwargs):
+        return IndexModel(*args, **kwargs).document
+
+    def test_key_order_and_options(self):
+        spec = self.spec([('nome', ASCENDING), ('_id', ASCENDING)], name='nome_id')
+        self.assertTrue(_index_matches(spec, {'key': [('nome', 1), ('_id', 1)], 'v': 2}))
+        self.assertFalse(_index_matches(spec, {'key': [('_id', 1), ('nome', 1)], 'v': 2}))
+
+        unique = self.spec([('nome', ASCENDING)], name='nome_unique', unique=True)
+        self.assertTrue(_index_matches(unique, {'key': [('nome', 1)], 'unique': True}))
+        self.assertFalse(_index_matches(unique, {'key': [('nome', 1)]}))
+
+    def test_collation_ignores_server_defaults(self):
+        spec = self.spec([('nome', ASCENDING)], name='nome_pt', collation=PT_COLLATION)
+        server = {'locale': 'pt', 'caseLevel': False, 'caseFirst': 'off', 'strength': 1, 'version': '57.1'}
+        self.assertTrue(_index_matches(spec, {'key': [('nome', 1)], 'collation': server}))
+        self.assertFalse(_index_matches(spec, {'key': [('nome', 1)], 'collation': {**server, 'strength': 2}}))
+        self.assertFalse(_index_matches(spec, {'key': [('nome', 1)]}))
+
+    def test_text_index_compares_weights(self):
+        spec = next(index.document for index in Drink.indexes if 'weights' in index.document)
+        current = {
+            'key': [('_fts', 'text'), ('_ftsx', 1)],
+            'weights': dict(spec['weights']),
+            'default_language': spec['default_language'],
+            'language_override': 'language',
+            'textIndexVersion': 3,
+        }
+        self.assertTrue(_index_matches(spec, current))
+        self.assertFalse(_index_matches(spec, {**current, 'weights': {**spec['weights'], 'nome': 1}}))
+        self.assertFalse(_index_matches(spec, {**current, 'default_language': 'portuguese'}))
+
+    def test_check_runs_only_on_deploy(self):
+        def names(include_deployment_checks):
+            checks = registry.get_checks(include_deployment_checks=include_deployment_checks)
+            return {check.__name__ for check in checks}
+
+        self.assertNotIn('check_mongo_indexes', names(False))
+        self.assertIn('check_mongo_indexes', names(True))
+
+
+class NomeSerializer(serializers.Serializer):
+    id = serializers.CharField(source='_id', read_only=True)
+    nome = serializers.CharField()
+
+
+class FakeBulkModel(FakeModel):
+    """FakeModel que grava com bulk_write; o teste define o resultado"""
+    bulk_result = None
+    bulk_error = None
+
+    @classmethod
+    def bulk_write(cls, requests, ordered=False):
+        cls.requests = requests
+        if cls.bulk_error is not None:
+            raise cls.bulk_error
+        return mock.Mock(upserted_ids=cls.bulk_result or {})
+
+    @classmethod
+    def find_one(cls, filter):
+        return next(iter(cls.find(filter).documents), None)
+
+
+class BulkOperationTests(SimpleTestCase):
+    def setUp(self):
+        FakeBulkModel.documents = []
+        FakeBulkModel.bulk_result = FakeBulkModel.bulk_error = None
+
+    def run_bulk(self, items, upsert=False):
+        saved = []
+
+        def receiver(sender, document, previous=None, created=False, **kwargs):
+            saved.append((document['nome'], created))
+
+        document_saved.connect(receiver, sender=FakeBulkModel)
+        try:
+            results = BulkOperation(FakeBulkModel, NomeSerializer, upsert=upsert).run(items)
+        finally:
+            document_saved.disconnect(receiver, sender=FakeBulkModel)
+        return results, saved
+
+    def test_write_errors_map_back_to_input_items(self):
+        # O item 1 é inválido e não vira operação: o erro na operação 1 é o item 2
+        FakeBulkModel.bulk_error = BulkWriteError({'writeErrors': [
+            {'index': 1, 'code': DUPLICATE_KEY_CODE, 'errmsg': 'E11000'},
+            {'index': 2, 'code': 2, 'errmsg': 'valor inválido'},
+        ]})
+        results, saved = self.run_bulk([{'nome': 'Gin'}, {}, {'nome': 'Rum'}, {'nome': 'Vodka'}])
+
+        self.assertEqual([result['status'] for result in results], [CREATED, ERROR, ERROR, ERROR])
+        self.assertIn('nome', results[1]['erros'])
+        self.assertEqual(results[2]['erros'], {'nome': ['Já existe um registro com este nome.']})
+        self.assertEqual(results[3]['erros'], {'non_field_errors': ['valor inválido']})
+        self.assertEqual(results[0]['data']['nome'], 'Gin')
+        self.assertEqual(saved, [('Gin', True)])
+
+    def test_upsert_reports_created_and_updated(self):
+        gin = {'_id': ObjectId(), 'nome': 'Gin'}
+        FakeBulkModel.documents = [gin]
+        rum_id = ObjectId()
+        FakeBulkModel.bulk_result = {1: rum_id}
+        results, saved = self.run_bulk([{'nome': 'Gin'}, {'nome': 'Rum'}], upsert=True)
+
+        self.assertEqual([result['status'] for result in results], [UPDATED, CREATED])
+        self.assertEqual(results[0]['data']['id'], str(gin['_id']))
+        self.assertEqual(results[1]['data']['id'], str(rum_id))
+        self.assertEqual(FakeBulkModel.requests[0]._filter, {'_id': gin['_id']})
+        self.assertEqual(FakeBulkModel.requests[1]._filter, {'nome': 'Rum'})
+        self.assertEqual(saved, [('Gin', False), ('Rum', True)])
+
+    def test_repeated_name_in_batch_is_an_error(self):
+        FakeBulkModel.bulk_result = {0: ObjectId()}
+        results, _ = self.run_bulk([{'nome': 'Gin'}, {'nome': 'Gin'}], upsert=True)
+
+        self.assertEqual([result['status'] for result in results], [CREATED, ERROR])
+        self.assertEqual(results[1]['erros'], {'nome': ['Nome repetido no lote.']})
+        self.assertEqual(len(FakeBulkModel.requests), 1)
+
+    def test_upsert_race_reports_the_existing_document(self):
+        # A consulta não achou o nome, mas outro processo o criou antes do
+        # bulk_write: o upsert atualiza o documento dele em vez de criar
+        vodka = {'_id': ObjectId(), 'nome': 'Vodka'}
+        FakeBulkModel.documents = [vodka]
+        with mock.patch.object(BulkOperation, 'get_existing', return_value={}):
+            results, saved = self.run_bulk([{'nome': 'Vodka'}], upsert=True)
+
+        self.assertEqual(results[0]['status'], UPDATED)
+        self.assertEqual(results[0]['data']['id'], str(vodka['_id']))
+        self.assertEqual(saved, [('Vodka', False)])
@@ -0,0 +1,13 @@
+import unicodedata
+
+
+def fold(text):
+    """
+    Normaliza um texto para comparação: minúsculas, sem acentos e com
+    espaços simples ("  Limão Tahiti" -> "limao tahiti").
+    """
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
@@ -0,0 +1,54 @@
+"""Índice reverso de uso: nome do ingrediente/utensílio -> drinks que o usam."""
+from .memory import VersionedIndex
+from .models import Drink
+from .text import fold
+
+
+class UsageIndex(VersionedIndex):
+    """Drinks que usam cada item de um campo de lista de Drink"""
+    models = (Drink,)
+
+    def __init__(self, field):
+        super().__init__()
+        self.field = field  # Campo de Drink com a lista de nomes
+
+    def _reset(self):
+        self.drink_ids = {}  # nome normalizado -> ids dos drinks
+        self.names = {}      # id do drink -> nomes normalizados
+
+    def _build(self):
+        self._reset()
+        for drink in Drink.find({}, {self.field: 1}):
+            self._add(drink)
+
+    def _add(self, drink):
+        obj_id = str(drink['_id'])
+        names = {fold(name) for name in drink.get(self.field, [])} - {''}
+        self.names[obj_id] = names
+        for name in names:
+            self.drink_ids.setdefault(name, set()).add(obj_id)
+
+    def _remove(self, obj_id):
+        for name in self.names.pop(obj_id, ()):
+            ids = self.drink_ids.get(name)
+            if ids is not None:
+                ids.discard(obj_id)
+                if not ids:
+                    del self.drink_ids[name]
+
+    def apply_saved(self, model, drink, previous):
+        self._remove(str(drink['_id']))
+        self._add(drink)
+
+    def apply_deleted(self, model, drink):
+        self._remove(str(drink['_id']))
+
+    def get_drink_ids(self, name):
+        """Ids dos drinks que usam o item"""
+        self.ensure_built()
+        with self._lock:
+            return set(self.drink_ids.get(fold(name), ()))
+
+
+ingredientes_usage = UsageIndex('ingredientes')
+utensilios_usage = UsageIndex('utensilios')
@@ -1,21 +1,83 @@
+from django.conf import settings
 from django.shortcuts import render
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from .models import (
     TipoIngrediente, TipoUtensilio, UnidadeMedida,
-    PerfilSabor, Ingrediente, Utensilio, Drink
+    PerfilSabor, Ingrediente, Utensilio, Drink, mongo_options
 )
 from .serializers import (
     TipoIngredienteSerializer, TipoUtensilioSerializer, UnidadeMedidaSerializer,
-    PerfilSaborSerializer, IngredienteSerializer, UtensilioSerializer, DrinkSerializer
+    PerfilSaborSerializer, IngredienteSerializer, UtensilioSerializer, DrinkSerializer,
+    PantryQuerySerializer, SimilarQuerySerializer
 )
+from .pagination import MongoCursorPagination, MongoSearchPagination
+from .search import text_search
+from .similarity import similarity_index
+from .signals import document_deleted
+from .autocomplete import ingredientes_index, utensilios_index
+from .bulk import BulkOperation, CREATED, ERROR, UPDATED
+from .classification import ingredient_classification
+from .conditional import get_validators, not_modified_response, set_validators
+from .filters import DrinkFilter
+from .pantry import pantry_index
+from .streaming import get_stream_format, streaming_response
+from .usage import ingredientes_usage, utensilios_usage
+
+# Resposta para violações dos índices únicos (ex.: nome repetido)
+DUPLICATE_ERROR = {'nome': ['Já existe um registro com este nome.']}
+
+# Opções das leituras do catálogo, que podem ir para os secundários
+CATALOG_READ_OPTIONS = {
+    'read_preference': settings.MONGODB_CATALOG_READ_PREFERENCE,
+    'max_time_ms': settings.MONGODB_CATALOG_MAX_TIME_MS or None,
+}
 
 @extend_schema_view(
-    list=extend_schema(summary="Listar itens"),
+    list=extend_schema(
+        summary="Listar itens",
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Ativa a paginação por cursor com este tamanho de página"
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Cursor opaco retornado em next/previous"
+            ),
+            OpenApiParameter(
+                name="ordering",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Campo de ordenação da paginação (prefixo '-' para decrescente)"
+            ),
+            OpenApiParameter(
+                name="stream",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Retorna a coleção inteira em streaming: 1/json (array JSON) ou ndjson"
+            ),
+            OpenApiParameter(
+                name="ids",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "IDs separados por vírgula: retorna os itens na ordem pedida "
+                    "e os IDs não encontrados (máximo de 100)"
+                )
+            )
+        ]
+    ),
     create=extend_schema(summary="Criar item"),
     retrieve=extend_schema(
         summary="Detalhes do item",
@@ -39,6 +101,17 @@ from .serializers import (
             )
         ]
     ),
+    partial_update=extend_schema(
+        summary="Atualizar campos do item",
+        parameters=[
+            OpenApiParameter(
+                name="id",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.PATH,
+                description="ID do item (ObjectId)"
+            )
+        ]
+    ),
     destroy=extend_schema(
         summary="Remover item",
         parameters=[
@@ -49,11 +122,38 @@ from .serializers import (
                 description="ID do item (ObjectId)"
             )
         ]
+    ),
+    bulk=extend_schema(
+        summary="Criar ou atualizar vários itens",
+        description=(
+            "Recebe uma lista de itens ou {\"itens\": [...], \"upsert\": true}. "
+            "Com upsert, itens com o nome de um registro existente o atualizam. "
+            "Retorna um resultado por item (criado, atualizado ou erro)."
+        ),
+        request=OpenApiTypes.OBJECT,
+        responses=OpenApiTypes.OBJECT
     )
 )
 class MongoViewSet(viewsets.ViewSet):
     """ViewSet base para modelos MongoDB"""
-    
+    pagination_class = MongoCursorPagination
+    ordering = '_id'
+    ordering_fields = []  # Apenas campos com índice, além de _id
+    bulk_max_items = 500
+    ids_max_items = 100
+    # Opções do MongoDB por ação (read_preference, read_concern, write_concern,
+    # max_time_ms), ex.: {'list': {'read_preference': 'nearest'}}
+    mongo_options = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        with mongo_options(**self.mongo_options.get(action, {})):
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_filter(self, request):
+        """Filtro MongoDB aplicado à listagem (sem filtro por padrão)"""
+        return {}
+
     def get_object(self, pk):
         try:
             return self.model_class.find_one({'_id': ObjectId(pk)})
@@ -61,41 +161,162 @@ class MongoViewSet(viewsets.ViewSet):
             return None
 
     def list(self, request):
-        objects = list(self.model_class.find())
+        etag, last_modified = get_validators(self.model_class, request)
+        response = not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = self.list_documents(request)
+        return set_validators(response, etag, last_modified)
+
+    def list_documents(self, request):
+        if 'ids' in request.query_params:
+            return self.list_by_ids(request)
+
+        filter = self.get_filter(request)
+        stream_format = get_stream_format(request)
+        if stream_format:
+            return streaming_response(self.model_class.find(filter), self.serializer_class, stream_format)
+
+        paginator = self.pagination_class()
+        if paginator.is_requested(request):
+            objects = paginator.paginate(self.model_class, request, self, filter=filter)
+            serializer = self.serializer_class(objects, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        objects = self.model_class.find(filter)
+        if paginator.ordering_query_param in request.query_params:
+            field, direction = paginator.get_ordering(request, self)
+            objects = objects.sort([(field, direction), ('_id', direction)])
+        objects = list(objects)
         serializer = self.serializer_class(objects, many=True)
         return Response(serializer.data)
 
+    def list_by_ids(self, request):
+        """Vários itens pelo ID (?ids=a,b,c) com uma única consulta"""
+        ids = []
+        for raw in request.query_params.getlist('ids'):
+            for obj_id in raw.split(','):
+                obj_id = obj_id.strip()
+                if obj_id and obj_id not in ids:
+                    ids.append(obj_id)
+        if len(ids) > self.ids_max_items:
+            raise ValidationError({'ids': f'Informe no máximo {self.ids_max_items} IDs'})
+
+        objects, missing = self.model_class.find_by_ids(ids)
+        serializer = self.serializer_class(objects, many=True)
+        return Response({'results': serializer.data, 'nao_encontrados': missing})
+
     def create(self, request):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except DuplicateKeyError:
+                return Response(DUPLICATE_ERROR, status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def retrieve(self, request, pk=None):
+        etag, last_modified = get_validators(self.model_class, request)
+        response = not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return set_validators(response, etag, last_modified)
+
         obj = self.get_object(pk)
         if not obj:
             return Response(status=status.HTTP_404_NOT_FOUND)
         serializer = self.serializer_class(obj)
-        return Response(serializer.data)
+        return set_validators(Response(serializer.data), etag, last_modified)
 
-    def update(self, request, pk=None):
-        obj = self.get_object(pk)
-        if not obj:
+    def update(self, request, pk=None, partial=False):
+        if not ObjectId.is_valid(pk):
             return Response(status=status.HTTP_404_NOT_FOUND)
-        serializer = self.serializer_class(obj, data=request.data)
+        # Sem leitura prévia: o serializer atualiza e recebe o documento
+        # anterior na mesma operação (404 se ele não existir)
+        serializer = self.serializer_class({'_id': ObjectId(pk)}, data=request.data, partial=partial)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except DuplicateKeyError:
+                return Response(DUPLICATE_ERROR, status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def partial_update(self, request, pk=None):
+        """PATCH: grava apenas os campos enviados"""
+        return self.update(request, pk, partial=True)
+
     def destroy(self, request, pk=None):
         obj = self.get_object(pk)
         if not obj:
             return Response(status=status.HTTP_404_NOT_FOUND)
         self.model_class.delete_one({'_id': ObjectId(pk)})
+        document_deleted.send(sender=self.model_class, document=obj)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Cria (ou atualiza pelo nome) vários itens em uma única escrita"""
+        data = request.data
+        upsert = False
+        if isinstance(data, dict):
+            upsert = data.get('upsert') in (True, 'true', '1')
+            data = data.get('itens')
+        if not isinstance(data, list) or not data:
+            return Response(
+                {'itens': ['Informe uma lista de itens.']}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(data) > self.bulk_max_items:
+            return Response(
+                {'itens': [f'Informe no máximo {self.bulk_max_items} itens.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = BulkOperation(self.model_class, self.serializer_class, upsert=upsert).run(data)
+        summary = {CREATED: 0, UPDATED: 0, ERROR: 0}
+        for result in results:
+            summary[result['status']] += 1
+        return Response({
+            'criados': summary[CREATED],
+            'atualizados': summary[UPDATED],
+            'erros': summary[ERROR],
+            'resultados': results,
+        })
+
+class DrinkUsageMixin:
+    """Ação {id}/drinks/: drinks que usam o item, pelo índice reverso em memória"""
+    usage_index = None
+
+    @extend_schema(
+        summary="Drinks que usam o item",
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Ativa a paginação por cursor com o tamanho de página informado"
+            )
+        ]
+    )
+    @action(detail=True, methods=['get'])
+    def drinks(self, request, pk=None):
+        obj = self.get_object(pk)
+        if not obj:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        drink_ids = [ObjectId(obj_id) for obj_id in self.usage_index.get_drink_ids(obj['nome'])]
+        filter = {'_id': {'$in': drink_ids}}
+
+        paginator = self.pagination_class()
+        if paginator.is_requested(request):
+            objects = paginator.paginate(Drink, request, self, filter=filter)
+            response = paginator.get_paginated_response(DrinkSerializer(objects, many=True).data)
+            response.data['total'] = len(drink_ids)
+            return response
+
+        objects = Drink.find(filter).sort([('nome', 1), ('_id', 1)])
+        serializer = DrinkSerializer(list(objects), many=True)
+        return Response({'total': len(drink_ids), 'results': serializer.data})
+
 @extend_schema_view(
     list=extend_schema(summary="Listar tipos de ingrediente"),
     create=extend_schema(summary="Criar tipo de ingrediente"),
@@ -106,6 +327,7 @@ class MongoViewSet(viewsets.ViewSet):
 class TipoIngredienteViewSet(MongoViewSet):
     serializer_class = TipoIngredienteSerializer
     model_class = TipoIngrediente
+    ordering_fields = ['nome', 'ordem']
 
 @extend_schema_view(
     list=extend_schema(summary="Listar tipos de utensílio"),
@@ -117,6 +339,7 @@ class TipoIngredienteViewSet(MongoViewSet):
 class TipoUtensilioViewSet(MongoViewSet):
     serializer_class = TipoUtensilioSerializer
     model_class = TipoUtensilio
+    ordering_fields = ['nome', 'ordem']
 
 @extend_schema_view(
     list=extend_schema(summary="Listar unidades de medida"),
@@ -128,6 +351,7 @@ class TipoUtensilioViewSet(MongoViewSet):
 class UnidadeMedidaViewSet(MongoViewSet):
     serializer_class = UnidadeMedidaSerializer
     model_class = UnidadeMedida
+    ordering_fields = ['nome']
 
 @extend_schema_view(
     list=extend_schema(summary="Listar perfis de sabor"),
@@ -139,6 +363,7 @@ class UnidadeMedidaViewSet(MongoViewSet):
 class PerfilSaborViewSet(MongoViewSet):
     serializer_class = PerfilSaborSerializer
     model_class = PerfilSabor
+    ordering_fields = ['nome', 'ordem']
 
 @extend_schema_view(
     list=extend_schema(summary="Listar ingredientes"),
@@ -147,24 +372,25 @@ class PerfilSaborViewSet(MongoViewSet):
     update=extend_schema(summary="Atualizar ingrediente"),
     destroy=extend_schema(summary="Remover ingrediente")
 )
-class IngredienteViewSet(MongoViewSet):
+class IngredienteViewSet(DrinkUsageMixin, MongoViewSet):
     serializer_class = IngredienteSerializer
     model_class = Ingrediente
+    usage_index = ingredientes_usage
+    ordering_fields = ['nome']
+    mongo_options = {action: CATALOG_READ_OPTIONS for action in ('list', 'retrieve', 'drinks')}
 
     @extend_schema(summary="Buscar ingredientes por texto")
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Busca ingredientes por texto no nome"""
+        """Busca ingredientes por texto no nome (autocomplete)"""
         query = request.query_params.get('q', '')
         if not query:
             return Response([])
-        
-        # Busca case-insensitive no nome
-        ingredientes = self.model_class.get_collection().find({
-            "nome": {"$regex": query, "$options": "i"}
-        }).limit(10)
-        
-        serializer = self.serializer_class(list(ingredientes), many=True)
+
+        # Busca no índice em memória (prefixo ou trecho, sem acentos)
+        ingredientes = ingredientes_index.search(query, limit=10)
+
+        serializer = self.serializer_class(ingredientes, many=True)
         return Response(serializer.data)
 
 @extend_schema_view(
@@ -174,28 +400,69 @@ class IngredienteViewSet(MongoViewSet):
     update=extend_schema(summary="Atualizar utensílio"),
     destroy=extend_schema(summary="Remover utensílio")
 )
-class UtensilioViewSet(MongoViewSet):
+class UtensilioViewSet(DrinkUsageMixin, MongoViewSet):
     serializer_class = UtensilioSerializer
     model_class = Utensilio
+    usage_index = utensilios_usage
+    ordering_fields = ['nome']
+    mongo_options = {action: CATALOG_READ_OPTIONS for action in ('list', 'retrieve', 'drinks')}
 
     @extend_schema(summary="Buscar utensílios por texto")
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Busca utensílios por texto no nome"""
+        """Busca utensílios por texto no nome (autocomplete)"""
         query = request.query_params.get('q', '')
         if not query:
             return Response([])
-        
-        # Busca case-insensitive no nome
-        utensilios = self.model_class.get_collection().find({
-            "nome": {"$regex": query, "$options": "i"}
-        }).limit(10)
-        
-        serializer = self.serializer_class(list(utensilios), many=True)
+
+        # Busca no índice em memória (prefixo ou trecho, sem acentos)
+        utensilios = utensilios_index.search(query, limit=10)
+
+        serializer = self.serializer_class(utensilios, many=True)
         return Response(serializer.data)
 
 @extend_schema_view(
-    list=extend_schema(summary="Listar drinks"),
+    list=extend_schema(
+        summary="Listar drinks",
+        parameters=[
+            OpenApiParameter(
+                name="nivel_dificuldade",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Um ou mais níveis separados por vírgula (facil, medio, dificil)"
+            ),
+            OpenApiParameter(
+                name="teor_alcoolico",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Um ou mais teores separados por vírgula (zero, baixo, medio, alto)"
+            ),
+            OpenApiParameter(
+                name="ingredientes",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Nomes de ingredientes separados por vírgula"
+            ),
+            OpenApiParameter(
+                name="ingredientes_modo",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="any: contém algum dos ingredientes (padrão); all: contém todos"
+            ),
+            OpenApiParameter(
+                name="utensilios",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Nomes de utensílios separados por vírgula"
+            ),
+            OpenApiParameter(
+                name="utensilios_modo",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="any: contém algum dos utensílios (padrão); all: contém todos"
+            )
+        ]
+    ),
     create=extend_schema(summary="Criar drink"),
     retrieve=extend_schema(summary="Detalhes do drink"),
     update=extend_schema(summary="Atualizar drink"),
@@ -207,7 +474,83 @@ class UtensilioViewSet(MongoViewSet):
                 name="q",
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description="Texto para busca no nome ou descrição"
+                description="Texto buscado no nome, nome em inglês, descrição e modo de preparo (palavras inteiras, sem diferenciar acentos)"
+            ),
+            OpenApiParameter(
+                name="page",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Página dos resultados (ativa a resposta paginada)"
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Resultados por página (ativa a resposta paginada)"
+            ),
+            OpenApiParameter(
+                name="stream",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Retorna todos os resultados em streaming: 1/json ou ndjson"
+            )
+        ]
+    ),
+    pantry=extend_schema(
+        summary="Drinks que dá para fazer com os ingredientes disponíveis",
+        request=PantryQuerySerializer,
+        parameters=[
+            OpenApiParameter(
+                name="ingredientes",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Ingredientes disponíveis separados por vírgula (GET)"
+            ),
+            OpenApiParameter(
+                name="max_missing",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Quantidade máxima de ingredientes faltando (0 a 5)"
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Quantidade máxima de drinks retornados"
+            )
+        ]
+    ),
+    similar=extend_schema(
+        summary="Drinks parecidos (ingredientes e utensílios em comum)",
+        parameters=[
+            OpenApiParameter(
+                name="id",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.PATH,
+                description="ID do drink de referência"
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Quantidade máxima de drinks retornados (padrão 10)"
+            ),
+            OpenApiParameter(
+                name="min_similarity",
+                type=OpenApiTypes.FLOAT,
+                location=OpenApiParameter.QUERY,
+                description="Similaridade mínima, entre 0 e 1"
+            )
+        ]
+    ),
+    ingredientes=extend_schema(
+        summary="Ingredientes do drink separados em spirits e demais ingredientes",
+        parameters=[
+            OpenApiParameter(
+                name="id",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.PATH,
+                description="ID do drink"
             )
         ]
     ),
@@ -226,40 +569,100 @@ class UtensilioViewSet(MongoViewSet):
 class DrinkViewSet(MongoViewSet):
     serializer_class = DrinkSerializer
     model_class = Drink
+    ordering_fields = ['nome']
+    mongo_options = {
+        action: CATALOG_READ_OPTIONS for action in ('list', 'retrieve', 'search', 'ingredientes')
+    }
 
-    def get_queryset(self):
-        """Filtra drinks baseado em parâmetros"""
-        queryset = self.model_class.get_collection().find()
-        
-        # Filtros
-        categoria = self.request.query_params.get('categoria', None)
-        if categoria:
-            queryset = queryset.filter(categorias=categoria)
-        
-        dificuldade = self.request.query_params.get('dificuldade', None)
-        if dificuldade:
-            queryset = queryset.filter(nivel_dificuldade=dificuldade)
-        
-        return queryset
+    def get_filter(self, request):
+        """Filtra drinks por dificuldade, teor alcoólico, ingredientes e utensílios"""
+        return DrinkFilter(request.query_params).get_filter()
 
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Busca drinks por texto no nome ou descrição"""
+        """Busca drinks por texto, ordenados por relevância"""
         query = request.query_params.get('q', '')
         if not query:
             return Response([])
-        
-        # Busca case-insensitive no nome ou descrição
-        drinks = self.model_class.get_collection().find({
-            "$or": [
-                {"nome": {"$regex": query, "$options": "i"}},
-                {"descricao": {"$regex": query, "$options": "i"}}
-            ]
-        }).limit(10)
-        
+
+        # Busca no índice de texto (nome, nome_en, descrição e modo de preparo)
+        drinks = text_search(self.model_class, query)
+
+        # Em streaming todos os resultados são enviados, sem o limite padrão
+        stream_format = get_stream_format(request)
+        if stream_format:
+            return streaming_response(drinks, self.serializer_class, stream_format)
+
+        paginator = MongoSearchPagination()
+        if paginator.is_requested(request):
+            objects = paginator.paginate(drinks, request)
+            serializer = self.serializer_class(objects, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        drinks = drinks.limit(10)
+
         serializer = self.serializer_class(list(drinks), many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get', 'post'])
+    def pantry(self, request):
+        """Drinks que dá para fazer com os ingredientes informados"""
+        if request.method == 'POST':
+            data = request.data
+        else:
+            data = {
+                key: request.query_params[key]
+                for key in ('max_missing', 'limit') if key in request.query_params
+            }
+            data['ingredientes'] = [
+                name.strip()
+                for value in request.query_params.getlist('ingredientes')
+                for name in value.split(',') if name.strip()
+            ]
+        query = PantryQuerySerializer(data=data)
+        query.is_valid(raise_exception=True)
+
+        matches = pantry_index.match(
+            query.validated_data['ingredientes'],
+            max_missing=query.validated_data['max_missing'],
+            limit=query.validated_data['limit']
+        )
+        # O índice só guarda os ingredientes: os drinks da resposta vêm do banco
+        drinks, _ = self.model_class.find_by_ids([obj_id for obj_id, _ in matches])
+        missing = dict(matches)
+        serializer = self.serializer_class(drinks, many=True)
+        return Response([
+            {'drink': data, 'faltando': missing[str(drink['_id'])]}
+            for data, drink in zip(serializer.data, drinks)
+        ])
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """Drinks com mais ingredientes e utensílios em comum"""
+        drink = self.get_object(pk)
+        if not drink:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        query = SimilarQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        matches = similarity_index.similar(drink, **query.validated_data)
+        # O índice só guarda os tokens: os drinks da resposta vêm do banco
+        drinks, _ = self.model_class.find_by_ids([obj_id for obj_id, _ in matches])
+        scores = dict(matches)
+        serializer = self.serializer_class(drinks, many=True)
+        return Response([
+            {'drink': data, 'similaridade': round(scores[str(document['_id'])], 3)}
+            for data, document in zip(serializer.data, drinks)
+        ])
+
+    @action(detail=True, methods=['get'])
+    def ingredientes(self, request, pk=None):
+        """Ingredientes do drink separados em spirits (destilados e licores) e outros"""
+        drink = self.get_object(pk)
+        if not drink:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        spirits, outros = ingredient_classification.split(drink.get('ingredientes', []))
+        return Response({'spirits': spirits, 'outros_ingredientes': outros})
+
     @action(detail=True, methods=['post'])
     def duplicate(self, request, pk=None):
         """Duplica um drink existente"""
@@ -6,4 +6,13 @@ class UsersConfig(AppConfig):
     name = 'apps.users'
 
     def ready(self):
-        import apps.users.signals  # noqa 
\ No newline at end of file
+        import apps.users.signals  # noqa
+        from django.core.signals import request_started
+        from django.db import connection
+        from .outbox import start_worker
+
+        # A thread da outbox só roda onde há banco e em processos que atendem
+        # requisições (não em comandos como migrate); ao iniciar ela grava as
+        # linhas deixadas por init_admin, create_superuser ou processos que caíram
+        if connection.settings_dict['ENGINE'] != 'django.db.backends.dummy':
+            request_started.connect(start_worker, dispatch_uid='users_outbox_worker')
@@ -1,33 +1,60 @@
-from django.core.management.base import BaseCommand
-from django.conf import settings
 from django.contrib.auth.hashers import make_password
-from datetime import datetime
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from apps.users.models import User
+from apps.users.outbox import USERS_COLLECTION
+from config.mongodb import get_db
+
+EMAIL = 'admin@mixmaster.com'
+PASSWORD = 'admin123'
+NAME = 'Admin MixMaster'
+
 
 class Command(BaseCommand):
     help = 'Cria um superuser se não existir'
 
     def handle(self, *args, **kwargs):
         try:
-            # Pega a coleção de usuários
-            users = settings.MONGODB_DB['users']
-            
-            # Verifica se já existe um superuser
-            if not users.find_one({'email': 'admin@mixmaster.com'}):
-                # Cria o superuser
-                user = {
-                    'email': 'admin@mixmaster.com',
-                    'password': make_password('admin123'),
-                    'nome': 'Admin',
-                    'sobrenome': 'MixMaster',
-                    'is_active': True,
-                    'is_staff': True,
-                    'is_superuser': True,
-                    'date_joined': datetime.now(),
-                    'last_login': None
-                }
-                users.insert_one(user)
+            # Produção (Vercel) não configura DATABASES: lá só existe o MongoDB
+            if connection.settings_dict['ENGINE'] == 'django.db.backends.dummy':
+                created = self.create_mongo_user()
+            else:
+                created = self.create_django_user()
+            if created:
                 self.stdout.write(self.style.SUCCESS('Superuser criado com sucesso!'))
             else:
                 self.stdout.write(self.style.SUCCESS('Superuser já existe.'))
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Erro ao criar superuser: {str(e)}')) 
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Erro ao criar superuser: {str(e)}'))
+
+    def create_django_user(self):
+        """Cria o superuser no Django; a outbox o sincroniza com o MongoDB"""
+        if User.objects.filter(email=EMAIL).exists():
+            return False
+        User.objects.create_superuser(EMAIL, PASSWORD, name=NAME)
+        return True
+
+    def create_mongo_user(self):
+        """
+        Cria o superuser direto na coleção users, no formato de user_to_document.
+        Sem tabela de usuários não há id do Django, então o _id é um ObjectId
+        (sync_users só roda onde há banco e removeria este documento).
+        """
+        document = {
+            'email': EMAIL,
+            'name': NAME,
+            'password': make_password(PASSWORD),
+            'is_active': True,
+            'is_staff': True,
+            'is_superuser': True,
+            'is_admin': True,
+            'date_joined': timezone.now().isoformat(),
+            'last_login': None,
+        }
+        # $setOnInsert: não altera um superuser que já existe
+        result = get_db()[USERS_COLLECTION].update_one(
+            {'email': EMAIL}, {'$setOnInsert': document}, upsert=True
+        )
+        return result.upserted_id is not None
@@ -0,0 +1,122 @@
+import time
+
+from django.core.management.base import BaseCommand
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from apps.users.models import User
+from apps.users.outbox import USERS_COLLECTION, user_to_document
+from config.mongodb import get_db
+
+# Campos do User usados no documento do MongoDB
+USER_FIELDS = [
+    'id', 'email', 'name', 'is_active', 'is_staff', 'is_superuser',
+    'is_admin', 'date_joined', 'last_login',
+]
+
+
+class Command(BaseCommand):
+    help = 'Reconcilia a coleção users do MongoDB com a tabela de usuários do Django'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostra as diferenças, sem alterar o banco'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Usuários lidos e gravados por lote (padrão 1000)'
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.batch_size = max(options['batch_size'], 1)
+        self.collection = get_db()[USERS_COLLECTION]
+        self.counts = dict.fromkeys(
+            ['usuarios', 'documentos', 'inseridos', 'atualizados', 'removidos', 'iguais'], 0
+        )
+
+        start = time.perf_counter()
+        try:
+            self.sync_django_users()
+            self.remove_orphans()
+        except PyMongoError as e:
+            self.stdout.write(self.style.ERROR(f'Erro ao sincronizar usuários: {e}'))
+            return
+        elapsed = time.perf_counter() - start
+
+        counts = self.counts
+        prefix = 'A aplicar' if self.dry_run else 'Aplicado'
+        self.stdout.write(
+            f'{prefix}: {counts["inseridos"]} inserido(s), {counts["atualizados"]} atualizado(s), '
+            f'{counts["removidos"]} removido(s), {counts["iguais"]} igual(is)'
+        )
+        # Os dois lados contam: usuários do Django e documentos lidos do MongoDB
+        read = counts['usuarios'] + counts['documentos']
+        rate = read / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{counts["usuarios"]} usuário(s) e {counts["documentos"]} documento(s) '
+            f'lidos em {elapsed:.2f}s ({rate:,.0f}/s)'
+        ))
+
+    def iter_user_chunks(self):
+        """Usuários do Django em lotes, pela ordem do id (keyset, sem offset)"""
+        users = User.objects.only(*USER_FIELDS).order_by('id')
+        last_id = None
+        while True:
+            chunk = users if last_id is None else users.filter(id__gt=last_id)
+            chunk = list(chunk[:self.batch_size])
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1].id
+
+    def sync_django_users(self):
+        """Insere ou substitui os documentos que faltam ou diferem no MongoDB"""
+        for users in self.iter_user_chunks():
+            expected = {str(user.id): user_to_document(user) for user in users}
+            current = {
+                document['_id']: document
+                for document in self.collection.find({'_id': {'$in': list(expected)}})
+            }
+            self.counts['usuarios'] += len(expected)
+            self.counts['documentos'] += len(current)
+
+            requests = []
+            for key, document in expected.items():
+                existing = current.get(key)
+                if existing == document:
+                    self.counts['iguais'] += 1
+                    continue
+                self.counts['inseridos' if existing is None else 'atualizados'] += 1
+                # ReplaceOne também remove campos antigos (ex.: nome/sobrenome)
+                requests.append(ReplaceOne({'_id': key}, document, upsert=True))
+            self.write(requests)
+
+    def remove_orphans(self):
+        """Remove do MongoDB os documentos sem usuário correspondente no Django"""
+        cursor = self.collection.find({}, {'_id': 1}).sort('_id', 1).batch_size(self.batch_size)
+        chunk = []
+        for document in cursor:
+            chunk.append(document['_id'])
+            if len(chunk) == self.batch_size:
+                self.remove_orphan_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.remove_orphan_chunk(chunk)
+
+    def remove_orphan_chunk(self, keys):
+        # O _id é o id do Django como string; outros formatos não têm usuário
+        self.counts['documentos'] += len(keys)
+        ids = {key: int(key) for key in keys if isinstance(key, str) and key.isdigit()}
+        existing = set(User.objects.filter(id__in=ids.values()).values_list('id', flat=True))
+        orphans = [key for key in keys if ids.get(key) not in existing]
+        self.counts['removidos'] += len(orphans)
+        self.write([DeleteOne({'_id': key}) for key in orphans])
+
+    def write(self, requests):
+        if requests and not self.dry_run:
+            self.collection.bulk_write(requests, ordered=False)
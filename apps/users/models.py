@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password, **extra_fields):
@@ -41,4 +42,28 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.email
+
+    def save(self, *args, **kwargs):
+        # O post_save grava a outbox; a transação garante que as duas linhas
+        # são confirmadas juntas mesmo fora de um atomic() do chamador
+        with transaction.atomic():
+            super().save(*args, **kwargs)
     
+
+
+class UserSyncOutbox(models.Model):
+    """
+    Usuário com alteração ainda não gravada no MongoDB.
+
+    A linha é escrita na mesma transação do save do usuário, então nenhuma
+    alteração confirmada se perde se o processo cair antes da gravação.
+    """
+    # Sem ForeignKey: a linha precisa sobreviver à exclusão do usuário
+    user_id = models.BigIntegerField('Usuário', unique=True)
+    # Incrementada a cada save; a linha só sai da fila se não mudou durante a gravação
+    revision = models.PositiveIntegerField('Revisão', default=1)
+    attempts = models.PositiveIntegerField('Tentativas', default=0)
+    next_attempt_at = models.DateTimeField('Próxima tentativa', default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f'{self.user_id} (revisão {self.revision})'
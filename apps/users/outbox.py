@@ -0,0 +1,203 @@
+"""Fila write-behind (outbox) da sincronização de usuários Django -> MongoDB."""
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+from config.mongodb import get_db
+
+logger = logging.getLogger(__name__)
+
+USERS_COLLECTION = 'users'
+
+
+def user_to_document(user):
+    """Documento do usuário na coleção users (o _id é o id do Django)"""
+    return {
+        '_id': str(user.id),
+        'email': user.email,
+        'name': user.name,
+        'is_active': user.is_active,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'is_admin': user.is_admin,
+        'date_joined': user.date_joined.isoformat(),
+        'last_login': user.last_login.isoformat() if user.last_login else None,
+    }
+
+
+def write_users(requests):
+    """Aplica as escritas com um único bulk_write não ordenado"""
+    return get_db()[USERS_COLLECTION].bulk_write(requests, ordered=False)
+
+
+def enqueue(user_id):
+    """
+    Marca o usuário como pendente, na transação do save (a linha só existe
+    se o save for confirmado). Vários saves viram uma única linha.
+    """
+    from .models import UserSyncOutbox
+
+    updated = UserSyncOutbox.objects.filter(user_id=user_id).update(
+        revision=F('revision') + 1, next_attempt_at=timezone.now()
+    )
+    if not updated:
+        _, created = UserSyncOutbox.objects.get_or_create(user_id=user_id)
+        if not created:
+            # Outra transação criou a linha entre o update e o get_or_create
+            UserSyncOutbox.objects.filter(user_id=user_id).update(revision=F('revision') + 1)
+
+
+def retry_delay(attempts):
+    """Espera antes da tentativa seguinte: 1, 2, 4... até USERS_SYNC_MAX_RETRY_DELAY"""
+    return min(2 ** (attempts - 1), settings.USERS_SYNC_MAX_RETRY_DELAY)
+
+
+def postpone(rows, now):
+    """Adia a próxima tentativa das linhas, com espera crescente"""
+    from .models import UserSyncOutbox
+
+    attempts = max(row.attempts for row in rows) + 1
+    UserSyncOutbox.objects.filter(pk__in=[row.pk for row in rows]).update(
+        attempts=F('attempts') + 1,
+        next_attempt_at=now + timedelta(seconds=retry_delay(attempts)),
+    )
+
+
+def drain_batch():
+    """
+    Grava no MongoDB um lote de linhas vencidas da outbox e retorna quantas
+    foram processadas. Se a gravação falhar as linhas ficam na tabela, com a
+    próxima tentativa adiada, e a exceção é levantada.
+    """
+    from .models import User, UserSyncOutbox
+
+    now = timezone.now()
+    rows = list(
+        UserSyncOutbox.objects.filter(next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')[:settings.USERS_SYNC_BATCH_SIZE]
+    )
+    if not rows:
+        return 0
+
+    # O documento reflete o estado atual, não o de cada save
+    users = User.objects.in_bulk([row.user_id for row in rows])
+    requests, valid, invalid = [], [], []
+    for row in rows:
+        user = users.get(row.user_id)
+        try:
+            if user is None:
+                requests.append(DeleteOne({'_id': str(row.user_id)}))
+            else:
+                document = user_to_document(user)
+                requests.append(UpdateOne({'_id': document['_id']}, {'$set': document}, upsert=True))
+        except Exception:
+            # Uma linha com problema não pode travar as demais: só ela é adiada
+            logger.exception('Não foi possível montar o documento do usuário %s', row.user_id)
+            invalid.append(row)
+        else:
+            valid.append(row)
+    if invalid:
+        postpone(invalid, now)
+    rows = valid
+    if not rows:
+        return len(invalid)
+
+    try:
+        write_users(requests)
+    except Exception:
+        postpone(rows, now)
+        raise
+
+    # Linhas com revisão nova (save durante a gravação) ficam para o próximo lote
+    rows.sort(key=lambda row: row.revision)
+    for revision, group in groupby(rows, key=lambda row: row.revision):
+        UserSyncOutbox.objects.filter(
+            pk__in=[row.pk for row in group], revision=revision
+        ).delete()
+    return len(rows) + len(invalid)
+
+
+def drain():
+    """Grava todas as linhas vencidas; retorna False se algum lote falhou"""
+    while True:
+        try:
+            if not drain_batch():
+                return True
+        except PyMongoError as e:
+            logger.warning('Falha ao sincronizar usuários com o MongoDB: %s', e)
+            return False
+
+
+class UserOutboxWorker:
+    """
+    Thread (uma por processo) que esvazia a outbox. Acorda depois dos saves
+    do processo e a cada USERS_SYNC_POLL_INTERVAL, o que pega retentativas
+    e linhas deixadas por outros processos. O comando sync_users continua
+    sendo a rede de segurança para alterações feitas sem o post_save.
+    """
+
+    def __init__(self):
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # O filho de um fork não herda a thread: começa do zero
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def wake(self):
+        """Acorda a thread (iniciando-a se preciso) para gravar a fila"""
+        self.start()
+        self._wakeup.set()
+
+    def start(self):
+        """Inicia a thread, se ainda não roda neste processo; ela começa esvaziando a fila"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._wakeup.set()
+            thread = threading.Thread(target=self._run, name='user-outbox', daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.USERS_SYNC_POLL_INTERVAL)
+            # Espera um pouco para juntar os saves seguidos no mesmo lote
+            time.sleep(settings.USERS_SYNC_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                drain()
+            except Exception:
+                logger.exception('Erro ao esvaziar a outbox de usuários')
+            finally:
+                # A conexão desta thread não passa pelo ciclo de requisição
+                connection.close()
+
+
+worker = UserOutboxWorker()
+
+
+def start_worker(**kwargs):
+    """Receptor do request_started: garante a thread nos processos que atendem requisições"""
+    if settings.USERS_SYNC_WORKER_AUTOSTART:
+        worker.start()
+
+
+def wake_worker():
+    """Agenda o acordar da thread para depois do commit da transação atual"""
+    transaction.on_commit(worker.wake)
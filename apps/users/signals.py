@@ -1,36 +1,22 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.conf import settings
-from pymongo import MongoClient
 from .models import User
+from .outbox import enqueue, wake_worker
 
 @receiver(post_save, sender=User)
 def sync_user_to_mongodb(sender, instance, created, **kwargs):
     """
-    Signal para sincronizar usuários do Django com MongoDB
-    """
-    client = MongoClient(settings.MONGODB_URI)
-    db = client[settings.MONGODB_NAME]
-    users_collection = db['users']
+    Signal para sincronizar usuários do Django com MongoDB.
 
-    # Preparar dados do usuário para MongoDB
-    user_data = {
-        'email': instance.email,
-        'name': instance.name,
-        'is_active': instance.is_active,
-        'is_staff': instance.is_staff,
-        'is_superuser': instance.is_superuser,
-        'is_admin': instance.is_admin,
-        'date_joined': instance.date_joined.isoformat(),
-        'last_login': instance.last_login.isoformat() if instance.last_login else None,
-        '_id': str(instance.id)  # Usar o ID do Django como _id no MongoDB
-    }
+    Só registra o usuário na outbox, na mesma transação do save; a gravação
+    no MongoDB é feita em segundo plano, depois do commit.
+    """
+    enqueue(instance.id)
+    wake_worker()
 
-    # Atualizar ou inserir no MongoDB
-    users_collection.update_one(
-        {'_id': str(instance.id)},
-        {'$set': user_data},
-        upsert=True
-    )
 
-    client.close() 
\ No newline at end of file
+@receiver(post_delete, sender=User)
+def remove_user_from_mongodb(sender, instance, **kwargs):
+    """Registra a exclusão na outbox; a thread remove o documento do MongoDB"""
+    enqueue(instance.id)
+    wake_worker()
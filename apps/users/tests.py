@@ -0,0 +1,126 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from pymongo import DeleteOne
+from pymongo.errors import AutoReconnect
+
+from apps.users import outbox
+from apps.users.models import User, UserSyncOutbox
+
+
+class UserOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='ana@example.com', name='Ana')
+
+    def drain(self, side_effect=None):
+        """Roda um lote, capturando as escritas enviadas ao MongoDB"""
+        with mock.patch.object(outbox, 'write_users', side_effect=side_effect) as write:
+            count = outbox.drain_batch()
+        requests = write.call_args[0][0] if write.called else []
+        return count, requests
+
+    def test_saves_coalesce_into_one_row(self):
+        self.user.name = 'Ana Maria'
+        self.user.save()
+        self.user.save()
+        row = UserSyncOutbox.objects.get()
+        self.assertEqual(row.user_id, self.user.id)
+        self.assertEqual(row.revision, 3)
+
+    def test_drain_writes_current_state_once(self):
+        self.user.name = 'Ana Maria'
+        self.user.save()
+
+        count, requests = self.drain()
+        self.assertEqual(count, 1)
+        self.assertEqual(len(requests), 1)
+        document = requests[0]._doc['$set']
+        self.assertEqual(document['_id'], str(self.user.id))
+        self.assertEqual(document['name'], 'Ana Maria')
+        self.assertFalse(UserSyncOutbox.objects.exists())
+
+    def test_deleted_user_removes_document(self):
+        user_id = self.user.id
+        self.user.delete()
+
+        _, requests = self.drain()
+        self.assertEqual(requests, [DeleteOne({'_id': str(user_id)})])
+        self.assertFalse(UserSyncOutbox.objects.exists())
+
+    def test_failure_keeps_row_with_backoff(self):
+        with self.assertRaises(AutoReconnect):
+            self.drain(side_effect=AutoReconnect('fora do ar'))
+
+        row = UserSyncOutbox.objects.get()
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, timezone.now())
+        # Ainda não venceu: o próximo lote não tenta de novo
+        self.assertEqual(self.drain(), (0, []))
+
+        UserSyncOutbox.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        before = timezone.now()
+        with self.assertRaises(AutoReconnect):
+            self.drain(side_effect=AutoReconnect('fora do ar'))
+        row.refresh_from_db()
+        self.assertEqual(row.attempts, 2)
+        self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=2))
+
+        UserSyncOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(self.drain()[0], 1)
+        self.assertFalse(UserSyncOutbox.objects.exists())
+
+    def test_save_during_write_stays_queued(self):
+        def save_again(requests):
+            self.user.name = 'Ana Maria'
+            self.user.save()
+
+        self.drain(side_effect=save_again)
+        row = UserSyncOutbox.objects.get()
+        self.assertEqual(row.revision, 2)
+        self.assertEqual(row.attempts, 0)
+
+        _, requests = self.drain()
+        self.assertEqual(requests[0]._doc['$set']['name'], 'Ana Maria')
+        self.assertFalse(UserSyncOutbox.objects.exists())
+
+    def test_retry_delay_is_capped(self):
+        self.assertEqual(outbox.retry_delay(1), 1)
+        self.assertEqual(outbox.retry_delay(3), 4)
+        with self.settings(USERS_SYNC_MAX_RETRY_DELAY=60):
+            self.assertEqual(outbox.retry_delay(20), 60)
+
+    def test_invalid_row_is_postponed_without_blocking_others(self):
+        other = User.objects.create(email='bia@example.com', name='Bia')
+
+        def to_document(user):
+            if user.id == self.user.id:
+                raise ValueError('dado inválido')
+            return {'_id': str(user.id)}
+
+        with mock.patch.object(outbox, 'user_to_document', side_effect=to_document), \
+                self.assertLogs(outbox.logger, 'ERROR'):
+            count, requests = self.drain()
+        self.assertEqual(count, 2)
+        self.assertEqual([request._filter for request in requests], [{'_id': str(other.id)}])
+        row = UserSyncOutbox.objects.get()
+        self.assertEqual(row.user_id, self.user.id)
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, timezone.now())
+
+    def test_unexpected_write_error_gets_backoff(self):
+        with self.assertRaises(TypeError):
+            self.drain(side_effect=TypeError('documento inválido'))
+        row = UserSyncOutbox.objects.get()
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, timezone.now())
+
+    def test_first_request_starts_worker(self):
+        with mock.patch.object(outbox.worker, 'start') as start:
+            with self.settings(USERS_SYNC_WORKER_AUTOSTART=False):
+                self.client.get('/health/')
+            start.assert_not_called()
+            with self.settings(USERS_SYNC_WORKER_AUTOSTART=True):
+                self.client.get('/health/')
+            start.assert_called()
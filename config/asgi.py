@@ -2,5 +2,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+# As rotas assíncronas (api/async/) só são montadas quando servidas por ASGI
+os.environ.setdefault('ASYNC_API_ENABLED', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,188 @@
+"""Gerenciador de conexão com o MongoDB compartilhado por todo o processo."""
+import asyncio
+import os
+import threading
+import weakref
+
+from django.conf import settings
+from pymongo import AsyncMongoClient, MongoClient, monitoring
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Coleta estatísticas dos pools de conexão do cliente"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pools = 0
+            self.created = 0
+            self.closed = 0
+            self.checked_out = 0
+            self.checked_in = 0
+            self.checkout_failed = 0
+            self.cleared = 0
+
+    def _incr(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def pool_created(self, event):
+        self._incr('pools')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr('cleared')
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools = max(self.pools - 1, 0)
+
+    def connection_created(self, event):
+        self._incr('created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failed')
+
+    def connection_checked_out(self, event):
+        self._incr('checked_out')
+
+    def connection_checked_in(self, event):
+        self._incr('checked_in')
+
+    def snapshot(self):
+        """Retorna um dicionário com as estatísticas atuais"""
+        with self._lock:
+            return {
+                'pools': self.pools,
+                'connections_open': self.created - self.closed,
+                'connections_in_use': self.checked_out - self.checked_in,
+                'connections_created': self.created,
+                'connections_closed': self.closed,
+                'checkouts': self.checked_out,
+                'checkout_failures': self.checkout_failed,
+                'pool_clears': self.cleared,
+            }
+
+
+class MongoConnectionManager:
+    """
+    Cria e mantém um único MongoClient por processo, recriado depois de um
+    fork (gunicorn com pre-fork). O AsyncMongoClient fica preso ao event loop
+    em que foi criado, então há um por loop (no uvicorn, um por worker).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> cliente
+        self.stats = PoolStatsListener()
+
+    def get_client_options(self):
+        """Monta as opções do MongoClient a partir das configurações"""
+        options = {
+            'maxPoolSize': settings.MONGODB_MAX_POOL_SIZE,
+            'minPoolSize': settings.MONGODB_MIN_POOL_SIZE,
+            'maxIdleTimeMS': settings.MONGODB_MAX_IDLE_TIME_MS,
+            'connectTimeoutMS': settings.MONGODB_CONNECT_TIMEOUT_MS,
+            'serverSelectionTimeoutMS': settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            'waitQueueTimeoutMS': settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            'event_listeners': [self.stats],
+        }
+        if settings.MONGODB_SOCKET_TIMEOUT_MS:
+            options['socketTimeoutMS'] = settings.MONGODB_SOCKET_TIMEOUT_MS
+        if settings.MONGODB_COMPRESSORS:
+            options['compressors'] = settings.MONGODB_COMPRESSORS
+        return options
+
+    @property
+    def client(self):
+        """Retorna o cliente do processo atual, criando-o se necessário"""
+        client = self._client
+        if client is not None and self._pid == os.getpid():
+            return client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                # Um cliente herdado do processo pai não pode ser reutilizado
+                self._client = MongoClient(settings.MONGODB_URI, **self.get_client_options())
+                self._pid = os.getpid()
+            return self._client
+
+    @property
+    def db(self):
+        """Retorna o banco de dados configurado em MONGODB_NAME"""
+        return self.client[settings.MONGODB_NAME]
+
+    @property
+    def async_client(self):
+        """Retorna o AsyncMongoClient do event loop atual, criando-o se necessário"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncMongoClient(settings.MONGODB_URI, **self.get_client_options())
+            self._async_clients[loop] = client
+        return client
+
+    @property
+    def async_db(self):
+        return self.async_client[settings.MONGODB_NAME]
+
+    def close(self):
+        """Fecha o cliente do processo atual"""
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    def _after_fork(self):
+        # O lock e o cliente do processo pai não são válidos no filho
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+        self._async_clients = weakref.WeakKeyDictionary()
+        self.stats = PoolStatsListener()
+
+    def pool_stats(self):
+        """Retorna as estatísticas do pool de conexões do processo"""
+        return {
+            'pid': os.getpid(),
+            'connected': self._client is not None and self._pid == os.getpid(),
+            'max_pool_size': settings.MONGODB_MAX_POOL_SIZE,
+            **self.stats.snapshot(),
+        }
+
+
+connection = MongoConnectionManager()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=connection._after_fork)
+
+
+def get_client():
+    """Retorna o MongoClient compartilhado"""
+    return connection.client
+
+
+def get_db():
+    """Retorna o banco de dados MongoDB compartilhado"""
+    return connection.db
+
+
+def get_async_db():
+    """Retorna o banco de dados MongoDB para uso com await"""
+    return connection.async_db
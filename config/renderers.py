@@ -0,0 +1,81 @@
+"""Renderer e parser JSON da API (orjson quando instalado), com suporte aos tipos do BSON."""
+import json
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+
+class MongoJSONEncoder(encoders.JSONEncoder):
+    """JSONEncoder do DRF com os tipos do BSON"""
+
+    def default(self, obj):
+        if isinstance(obj, ObjectId):
+            return str(obj)
+        if isinstance(obj, Decimal128):
+            obj = obj.to_decimal()
+        return super().default(obj)
+
+
+_encoder = MongoJSONEncoder()
+
+
+def _orjson_default(obj):
+    # Chamado para os tipos que o orjson não conhece e para as datas, que
+    # passam pelo encoder do DRF para manter o mesmo formato (milissegundos, Z)
+    return _encoder.default(obj)
+
+
+def dumps(data, indent=False):
+    """Serializa para bytes UTF-8 no formato compacto do JSONRenderer"""
+    if orjson is not None:
+        # Chaves não string aparecem nos erros de validação de ListField ({0: [...]})
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_orjson_default, option=option)
+    return json.dumps(
+        data, cls=MongoJSONEncoder, ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (',', ':')
+    ).encode('utf-8')
+
+
+class MongoJSONRenderer(JSONRenderer):
+    """JSONRenderer que usa o orjson e aceita ObjectId, datetime e Decimal128"""
+    encoder_class = MongoJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # O orjson só indenta com 2 espaços (usado pela API navegável e ?indent)
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        return dumps(data, indent=bool(indent))
+
+
+class MongoJSONParser(JSONParser):
+    """JSONParser que usa o orjson quando disponível"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            content = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -1,7 +1,7 @@
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
-import pymongo
 from urllib.parse import quote_plus
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -11,9 +11,65 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 SECRET_KEY = os.environ.get('SECRET_KEY')
 
 # MongoDB Connection
+# O cliente é criado sob demanda por config.mongodb (um por processo)
 MONGODB_URI = os.environ.get('MONGODB_URI')
-MONGODB_CLIENT = pymongo.MongoClient(MONGODB_URI)
-MONGODB_DB = MONGODB_CLIENT[os.environ.get('MONGODB_NAME')]
+MONGODB_NAME = os.environ.get('MONGODB_NAME')
+MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 50))
+MONGODB_MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE', 0))
+MONGODB_MAX_IDLE_TIME_MS = int(os.environ.get('MONGODB_MAX_IDLE_TIME_MS', 60000))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS', 10000))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 10000))
+MONGODB_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGODB_SOCKET_TIMEOUT_MS', 0))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 5000))
+# Ex.: "zstd,snappy,zlib" (zstd e snappy exigem pacotes extras)
+MONGODB_COMPRESSORS = os.environ.get('MONGODB_COMPRESSORS', 'zlib')
+# Checagem de índices em manage.py check --deploy
+MONGODB_CHECK_INDEXES = os.environ.get('MONGODB_CHECK_INDEXES', 'True') == 'True'
+MONGODB_CHECK_TIMEOUT = float(os.environ.get('MONGODB_CHECK_TIMEOUT', 3))
+
+# Cache em memória e versões das coleções MongoDB
+# Tempo máximo (s) que um worker confia na versão local sem reler o banco
+MONGODB_CACHE_TTL = float(os.environ.get('MONGODB_CACHE_TTL', 30))
+# Canal que avisa os outros workers sobre escritas
+# (apps.drinks.cache.RedisInvalidationChannel usa REDIS_URL)
+MONGODB_CACHE_INVALIDATION_CHANNEL = os.environ.get(
+    'MONGODB_CACHE_INVALIDATION_CHANNEL', 'apps.drinks.cache.LocalInvalidationChannel'
+)
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+# Opções de leitura/escrita por modelo/ação (ver apps.drinks.models.mongo_options)
+# Leituras do catálogo (listagem, detalhes e busca de drinks, ingredientes e
+# utensílios). secondaryPreferred ou nearest distribuem a carga pelo replica set,
+# mas os secundários podem estar alguns instantes atrás da última escrita
+MONGODB_CATALOG_READ_PREFERENCE = os.environ.get('MONGODB_CATALOG_READ_PREFERENCE', 'primary')
+# Tempo máximo (ms) dessas leituras no servidor; 0 desativa
+MONGODB_CATALOG_MAX_TIME_MS = int(os.environ.get('MONGODB_CATALOG_MAX_TIME_MS', 0))
+# Confirmação exigida nas escritas feitas pelo admin
+MONGODB_ADMIN_WRITE_CONCERN = os.environ.get('MONGODB_ADMIN_WRITE_CONCERN', 'majority')
+
+# Rotas assíncronas (api/async/). Ligadas por config/asgi.py: só fazem sentido
+# com um servidor ASGI (uvicorn), em que o event loop é reaproveitado
+ASYNC_API_ENABLED = os.environ.get('ASYNC_API_ENABLED', 'False') == 'True'
+
+# Sincronização dos usuários Django -> MongoDB (outbox em segundo plano).
+# Espera antes de gravar, para juntar saves seguidos do mesmo usuário
+USERS_SYNC_FLUSH_INTERVAL = float(os.environ.get('USERS_SYNC_FLUSH_INTERVAL', 1))
+# Intervalo em que a thread confere a tabela mesmo sem saves (retentativas e
+# linhas deixadas por outros processos)
+USERS_SYNC_POLL_INTERVAL = float(os.environ.get('USERS_SYNC_POLL_INTERVAL', 30))
+USERS_SYNC_BATCH_SIZE = int(os.environ.get('USERS_SYNC_BATCH_SIZE', 500))
+# Espera máxima entre novas tentativas quando o MongoDB falha (segundos)
+USERS_SYNC_MAX_RETRY_DELAY = float(os.environ.get('USERS_SYNC_MAX_RETRY_DELAY', 60))
+# Inicia a thread na primeira requisição de cada processo (desligado nos testes,
+# em que o banco é o de teste e as gravações são simuladas)
+USERS_SYNC_WORKER_AUTOSTART = os.environ.get(
+    'USERS_SYNC_WORKER_AUTOSTART', 'False' if sys.argv[1:2] == ['test'] else 'True'
+) == 'True'
+
+# Drinks parecidos (MinHash/LSH): assinaturas com NUM_PERM hashes divididas em
+# BANDS faixas. Mais faixas encontram mais vizinhos, com mais candidatos a conferir
+SIMILAR_DRINKS_NUM_PERM = int(os.environ.get('SIMILAR_DRINKS_NUM_PERM', 64))
+SIMILAR_DRINKS_BANDS = int(os.environ.get('SIMILAR_DRINKS_BANDS', 32))
 
 # Application definition
 INSTALLED_APPS = [
@@ -72,6 +128,16 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # JSON com orjson (se instalado) e suporte a ObjectId/datetime/Decimal128
+    'DEFAULT_RENDERER_CLASSES': (
+        'config.renderers.MongoJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'config.renderers.MongoJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 # JWT Settings
@@ -20,8 +20,4 @@ DATABASES = {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
-}
-
-# MongoDB settings (connection will be established when needed)
-MONGODB_URI = os.environ.get('MONGODB_URI')
-MONGODB_NAME = os.environ.get('MONGODB_NAME')
\ No newline at end of file
+}
\ No newline at end of file
@@ -1,14 +1,21 @@
+from django.conf import settings
 from django.urls import path, include
 from django.http import JsonResponse
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
 from apps.drinks.admin import admin_site
+from config.mongodb import connection
 
 def health_check(request):
-    return JsonResponse({
+    data = {
         'status': 'healthy',
-        'message': 'MixMaster API is running'
-    })
+        'message': 'MixMaster API is running',
+    }
+    # Estatísticas do pool (com o pid do worker) só em debug ou para a equipe
+    user = request.user
+    if settings.DEBUG or (user.is_active and user.is_staff):
+        data['mongodb_pool'] = connection.pool_stats()
+    return JsonResponse(data)
 
 urlpatterns = [
     # Health Check
@@ -25,3 +32,9 @@ urlpatterns = [
     # Apps
     path('api/drinks/', include('apps.drinks.urls')),
 ]
+
+if settings.ASYNC_API_ENABLED:
+    # Leitura assíncrona (ASGI): list/retrieve/search sem bloquear o event loop.
+    # Sob WSGI cada view assíncrona roda em um event loop novo, o que criaria
+    # um AsyncMongoClient (pool e handshake) por requisição
+    urlpatterns.append(path('api/async/drinks/', include('apps.drinks.async_urls')))
@@ -0,0 +1,135 @@
+"""
+Compara as rotas síncronas (api/drinks/) com as assíncronas (api/async/drinks/)
+sob concorrência, em um único worker do uvicorn.
+
+Uso:
+    python scripts/benchmark_async.py                  # sobe o uvicorn na porta 8765
+    python scripts/benchmark_async.py --url http://localhost:8000   # servidor ASGI
+    python scripts/benchmark_async.py --path drinks/search/?q=gin -c 1 10 50
+
+Nas rotas síncronas cada requisição ocupa uma thread do executor do Django
+enquanto espera o MongoDB; nas assíncronas todas ficam no event loop.
+As rotas assíncronas só existem quando a aplicação é servida por
+config.asgi (ASYNC_API_ENABLED); com --url o servidor precisa ser ASGI.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PREFIXES = {
+    'sync': '/api/drinks/',
+    'async': '/api/async/drinks/',
+}
+
+
+async def fetch(host, port, path):
+    """GET mínimo em HTTP/1.1 (sem dependências); retorna o status"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode('ascii')
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(status_line.split()[1])
+
+
+async def run(host, port, path, concurrency, total):
+    """Dispara total requisições com no máximo concurrency simultâneas"""
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                status = await fetch(host, port, path)
+            except OSError:
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'errors': errors,
+    }
+
+
+def start_server(port):
+    """Sobe o uvicorn com um único worker e espera o health check"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+         '--port', str(port), '--workers', '1', '--log-level', 'warning'],
+        cwd=BASE_DIR
+    )
+    for _ in range(50):
+        try:
+            urlopen(f'http://127.0.0.1:{port}/health/', timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('O uvicorn não respondeu ao health check')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', help='Servidor já em execução (senão sobe o uvicorn)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--path', default='drinks/', help='Rota relativa a api/drinks/')
+    parser.add_argument('-c', '--concurrency', type=int, nargs='+', default=[1, 10, 50, 100])
+    parser.add_argument('-n', '--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+        host, port = '127.0.0.1', args.port
+        process = start_server(port)
+
+    try:
+        print(f'{"rota":<6} {"conc.":>6} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"erros":>6}')
+        for concurrency in args.concurrency:
+            for name, prefix in PREFIXES.items():
+                path = prefix + args.path
+                # Aquecimento: conexões do pool e índices em memória
+                asyncio.run(run(host, port, path, concurrency, concurrency))
+                result = asyncio.run(run(host, port, path, concurrency, args.requests))
+                print(
+                    f'{name:<6} {concurrency:>6} {result["rps"]:>9.1f} {result["p50"]:>8.1f} '
+                    f'{result["p95"]:>8.1f} {result["errors"]:>6}'
+                )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
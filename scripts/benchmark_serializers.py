@@ -0,0 +1,112 @@
+"""
+Mede a serialização de documentos com o plano compilado (CompiledReadMixin)
+contra o to_representation padrão do DRF, e a renderização do JSON com o
+MongoJSONRenderer contra o JSONRenderer do DRF.
+
+Uso:
+    python scripts/benchmark_serializers.py            # 10.000 drinks
+    python scripts/benchmark_serializers.py -n 50000 -r 5
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from bson import ObjectId
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+django.setup()
+
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import MongoJSONRenderer
+
+from apps.drinks.serializers import DrinkSerializer, IngredienteSerializer
+
+
+def make_drinks(count):
+    return [
+        {
+            '_id': ObjectId(),
+            'nome': f'Drink {i}',
+            'nome_en': f'Drink {i}',
+            'nivel_dificuldade': ('facil', 'medio', 'dificil')[i % 3],
+            'teor_alcoolico': ('zero', 'baixo', 'medio', 'alto')[i % 4],
+            'descricao': 'Descrição do drink ' * 3,
+            'modo_preparo': '1. Misture tudo. 2. Sirva gelado.',
+            'ingredientes': [f'Ingrediente {j}' for j in range(i % 5 + 3)],
+            'utensilios': ['Coqueteleira', 'Copo alto'],
+        }
+        for i in range(count)
+    ]
+
+
+def make_ingredientes(count):
+    return [
+        {
+            '_id': ObjectId(),
+            'nome': f'Ingrediente {i}',
+            'nome_en': f'Ingredient {i}',
+            'tipo': 'destilado',
+            'unidades_permitidas': ['ml', 'oz'],
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compare(name, serializer_class, documents, repeat):
+    serializer = serializer_class()
+    drf = best_of(repeat, lambda: [
+        serializers.Serializer.to_representation(serializer, document) for document in documents
+    ])
+    compiled = best_of(repeat, lambda: serializer_class(documents, many=True).data)
+    print(
+        f'{name:<22} {len(documents):>7} {drf * 1000:>10.1f} {compiled * 1000:>12.1f} '
+        f'{drf / compiled:>7.1f}x'
+    )
+
+
+def compare_renderers(documents, repeat):
+    data = DrinkSerializer(documents, many=True).data
+    drf = best_of(repeat, lambda: JSONRenderer().render(data))
+    fast = best_of(repeat, lambda: MongoJSONRenderer().render(data))
+    print(
+        f'{"JSON (DrinkSerializer)":<22} {len(documents):>7} {drf * 1000:>10.1f} {fast * 1000:>12.1f} '
+        f'{drf / fast:>7.1f}x'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-n', '--documents', type=int, default=10000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"serializer":<22} {"docs":>7} {"DRF ms":>10} {"compilado ms":>12} {"ganho":>8}')
+    compare('DrinkSerializer', DrinkSerializer, make_drinks(args.documents), args.repeat)
+    compare('IngredienteSerializer', IngredienteSerializer, make_ingredientes(args.documents), args.repeat)
+
+    print(f'\n{"renderer":<22} {"docs":>7} {"DRF ms":>10} {"orjson ms":>12} {"ganho":>8}')
+    compare_renderers(make_drinks(args.documents), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,33 @@
-from pymongo import MongoClient
+import os
+import sys
+from pathlib import Path
 from bson import ObjectId
+from pymongo import UpdateOne
 from typing import List, Dict
-import os
 from dotenv import load_dotenv
 
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR))
+
 # Carrega as variáveis de ambiente
 load_dotenv()
 
-# Conecta ao MongoDB Atlas
-client = MongoClient(os.getenv('MONGODB_URI'))
-db = client[os.getenv('MONGODB_NAME')]
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+django.setup()
+
+from config.mongodb import get_db
+from apps.drinks.cache import collection_versions
+from apps.drinks.models import MONGO_MODELS
+
+# Modelo de cada coleção: as remoções passam por ele para avançar a versão
+# da coleção e invalidar os caches e índices em memória dos workers
+MODELS = {model.collection_name: model for model in MONGO_MODELS}
+
+# Usa a conexão compartilhada do projeto
+db = get_db()
 
 def get_duplicates(collection_name: str) -> List[Dict]:
     """
@@ -59,7 +77,9 @@ def remove_duplicates(collection_name: str) -> None:
     print(f"\nDuplicatas encontradas em {collection_name}:")
     for doc in duplicates:
         print(f"- {doc['nome']} (ID: {doc['_id']})")
-        db[collection_name].delete_one({'_id': ObjectId(doc['_id'])})
+    MODELS[collection_name].delete_many(
+        {'_id': {'$in': [ObjectId(doc['_id']) for doc in duplicates]}}
+    )
     
     print(f"Total de {len(duplicates)} duplicata(s) removida(s) de {collection_name}")
 
@@ -83,17 +103,28 @@ def update_references(collection_name: str, field_name: str) -> None:
         for doc in db[collection_name].aggregate(pipeline)
     }
     
-    # Atualiza referências em drinks
-    drinks = db['drinks'].find()
-    for drink in drinks:
-        if field_name in drink:
-            # Mantém a ordem original dos itens
-            updated_items = [name_to_id.get(name, name) for name in drink[field_name]]
-            if updated_items != drink[field_name]:
-                db['drinks'].update_one(
-                    {'_id': drink['_id']},
-                    {'$set': {field_name: updated_items}}
-                )
+    # Só os nomes que mudam precisam ser atualizados
+    renamed = {name: new for name, new in name_to_id.items() if new != name}
+    if not renamed:
+        return
+
+    # Busca apenas os drinks que usam algum desses nomes e atualiza todos
+    # em uma única operação em lote
+    drinks = db['drinks'].find(
+        {field_name: {'$in': list(renamed)}},
+        {field_name: 1}
+    )
+    updates = [
+        # Mantém a ordem original dos itens
+        UpdateOne(
+            {'_id': drink['_id']},
+            {'$set': {field_name: [renamed.get(name, name) for name in drink[field_name]]}}
+        )
+        for drink in drinks
+    ]
+    if updates:
+        db['drinks'].bulk_write(updates, ordered=False)
+        collection_versions.bump('drinks')
 
 def main():
     """Função principal que coordena a remoção de duplicatas."""